@@ -1,22 +1,55 @@
-"""`backend.agents.report_generator` module."""
+"""`backend.agents.code_agent` module."""
 
-from smolagents import CodeAgent, LiteLLMModel, PythonInterpreterTool
+from typing import List
+
+from smolagents import CodeAgent, LiteLLMModel, Model, PythonInterpreterTool, Tool
+from backend.llm_cache import CachingModel
+from backend.lazy import lazy_attributes
+from backend.tracing import instrument_agent
+from backend.tools.python_workers import use_worker_executor
 from backend.tools.python_tools import AUTHORIZED_IMPORTS
-from tools import google_search, serper_scrape, python_file, streamlit_runner
+from backend.tools import python_file, streamlit_runner
 
 MODEL_ID: str = "anthropic/claude-3-5-sonnet-latest"
 
-llm = LiteLLMModel(
-    model_id=MODEL_ID,
-)
+
+def build_llm() -> Model:
+    """Build the model of the code agent."""
+    return CachingModel(LiteLLMModel(
+        model_id=MODEL_ID,
+    ))
+
+
+def default_tools() -> List[Tool]:
+    """Return the code agent's tools: a Python interpreter, the file creator and the Streamlit runner."""
+    return [PythonInterpreterTool(), python_file.file_creator, streamlit_runner.streamlit_runner] # create_python_file_and_run_it
+
+
+def build_code_agent(model: Model = None, tools: List[Tool] = None, add_base_tools: bool = True) -> CodeAgent:
+    """Build the code agent.
+
+    Args:
+        model (Model, optional): Defaults to `build_llm()`
+        tools (List[Tool], optional): Defaults to `default_tools()`
+        add_base_tools (bool): Also give the agent smolagents' base tools (web search, webpage visit...)
+    """
+    return instrument_agent(use_worker_executor(CodeAgent(
+        model=model or build_llm(),
+        name="code_agent",
+        description=(
+            "Generates Streamlit Python code base on the analysis from the report generator. "
+            "Data saved by the query analyzer with `save_as` is loaded in the dashboard with "
+            "`from backend.dashboard_data import load_artifact; df = load_artifact(\"<name>\")`."
+        ),
+        tools = default_tools() if tools is None else tools,
+        add_base_tools = add_base_tools,
+        additional_authorized_imports = AUTHORIZED_IMPORTS,
+        max_steps = 12
+    )))
 
 
-code_agent = CodeAgent(
-    model=llm,
-    name="code_agent",
-    description="Generates Streamlit Python code base on the analysis from the report generator",
-    tools = [PythonInterpreterTool(), python_file.file_creator, streamlit_runner.streamlit_runner], # create_python_file_and_run_it
-    add_base_tools = True,
-    additional_authorized_imports = AUTHORIZED_IMPORTS,
-    max_steps = 12
-)
\ No newline at end of file
+# `llm` and `code_agent` are built on first access rather than at import
+__getattr__ = lazy_attributes(__name__, {
+    "llm": lambda module: module.build_llm(),
+    "code_agent": lambda module: build_code_agent(module.llm),
+})
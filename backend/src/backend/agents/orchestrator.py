@@ -5,32 +5,83 @@ Responsible for coordinating the other agents.
 
 """
 
-from smolagents import CodeAgent, LiteLLMModel
+import os
+from typing import List
 
-from backend.agents.query_analyzer import query_analyzer
-from backend.agents.report_generator import report_generator
-from backend.agents.code_agent import code_agent
+from smolagents import CodeAgent, LiteLLMModel, Model, Tool
+
+from backend.llm_cache import CachingModel
 from backend.tools.python_tools import AUTHORIZED_IMPORTS
+from backend.tools.parallel import ParallelCallsTool
+from backend.tools.rerank import RerankTool
+from backend.lazy import lazy_attributes
+from backend.tracing import instrument_agent
+from backend.tools.python_workers import use_worker_executor
 
 
 MODEL_ID: str = "anthropic/claude-3-5-sonnet-latest"
 
-llm = LiteLLMModel(
-    model_id=MODEL_ID,
-)
-
-orchestrator = CodeAgent(
-    name="orchestrator",
-    description="Orchestrates the other agents.",
-    model=llm,
-    managed_agents = [
-        query_analyzer,
-        report_generator,
-        code_agent
-    ],
-    tools = [],
-    add_base_tools = True,
-    max_steps= 18,
-    additional_authorized_imports = AUTHORIZED_IMPORTS,
-
-)
+
+def build_llm() -> Model:
+    """Build the model of the orchestrator."""
+    return CachingModel(LiteLLMModel(
+        model_id=MODEL_ID,
+    ))
+
+
+def default_tools() -> List[Tool]:
+    """Build the web tools of the orchestrator: search and scrape when the Serper key is set, and reranking."""
+    tools = []
+    if os.environ.get("SERPER_API"):
+        from backend.tools.google_search import GoogleBatchSearch, GoogleSearch
+        from backend.tools.serper_scrape import SerperBatchScrape, SerperScrape
+
+        search, scrape = GoogleSearch(), SerperScrape()
+        tools += [search, GoogleBatchSearch(search), scrape, SerperBatchScrape(scrape)]
+    # Local unless `RERANK_ENGINE` selects the Jina API
+    tools.append(RerankTool())
+    return tools
+
+
+def build_orchestrator(
+    model: Model = None,
+    managed_agents: List[CodeAgent] = None,
+    tools: List[Tool] = None,
+    add_base_tools: bool = True,
+) -> CodeAgent:
+    """Build the orchestrator agent.
+
+    Args:
+        model (Model, optional): Defaults to `build_llm()`
+        managed_agents (List[CodeAgent], optional): Defaults to the query analyzer, report generator and code agent
+        tools (List[Tool], optional): Extra tools, besides the parallel dispatch tool. Defaults to `default_tools()`
+        add_base_tools (bool): Also give the agent smolagents' base tools (web search, webpage visit...)
+    """
+    if managed_agents is None:
+        # Imported here so that the sub-agents are only built along with the orchestrator
+        from backend.agents import code_agent, query_analyzer, report_generator
+
+        managed_agents = [query_analyzer.query_analyzer, report_generator.report_generator, code_agent.code_agent]
+
+    # Lets independent sub-agent and web calls of one step run concurrently
+    parallel_calls = ParallelCallsTool()
+    agent = CodeAgent(
+        name="orchestrator",
+        description="Orchestrates the other agents.",
+        model=model or build_llm(),
+        managed_agents = managed_agents,
+        tools = [*(default_tools() if tools is None else tools), parallel_calls],
+        add_base_tools = add_base_tools,
+        max_steps= 18,
+        additional_authorized_imports = AUTHORIZED_IMPORTS,
+
+    )
+    parallel_calls.bind(agent)
+    return instrument_agent(use_worker_executor(agent))
+
+
+# `llm` and `orchestrator` are built on first access rather than at import
+__getattr__ = lazy_attributes(__name__, {
+    "llm": lambda module: module.build_llm(),
+    "orchestrator": lambda module: build_orchestrator(module.llm),
+})
@@ -1,25 +1,64 @@
 """`backend.agents.query_analyzer` module."""
 import os 
-from smolagents import CodeAgent, LiteLLMModel, ToolCallingAgent
+from typing import List
 
+from smolagents import CodeAgent, LiteLLMModel, Model, Tool
+
+from backend.llm_cache import CachingModel
 from backend.tools.postgre_tool import PostgresQueryTool
+from backend.tools.postgres_catalog import PostgresSchemaTool
 from backend.tools.mongodb_tool import MongoDBQueryTool
+from backend.tools.local_data import LocalDataTool
+from backend.tools.world_bank import WorldBankTool
+from backend.tools.sales_insights import SalesInsightsTool
+from backend.tools.parallel import ParallelCallsTool
+from backend.lazy import lazy_attributes
+from backend.tracing import instrument_agent
 
 MODEL_ID: str = "anthropic/claude-3-5-sonnet-latest"
 
-llm = LiteLLMModel(
-    model_id=MODEL_ID,
-    temperature=0,
-    api_key=os.environ["ANTHROPIC_API_KEY"]
-)
-
-query_analyzer = CodeAgent(
-    name="query_analyzer",
-    description="Analyzes user queries and retrieves the necessary data from the database.",
-    model=llm,
-    max_steps=12,
-    tools = [PostgresQueryTool(), MongoDBQueryTool()],
-    # add_base_tools = True,
-    verbosity_level=3,
-)
 
+def build_llm() -> Model:
+    """Build the model of the query analyzer."""
+    return CachingModel(LiteLLMModel(
+        model_id=MODEL_ID,
+        temperature=0,
+        api_key=os.environ["ANTHROPIC_API_KEY"]
+    ))
+
+
+def default_tools() -> List[Tool]:
+    """Build the data access tools of the query analyzer."""
+    return [SalesInsightsTool(), PostgresSchemaTool(), PostgresQueryTool(), MongoDBQueryTool(), LocalDataTool(), WorldBankTool()]
+
+
+def build_query_analyzer(model: Model = None, tools: List[Tool] = None) -> CodeAgent:
+    """Build the query analyzer agent.
+
+    Args:
+        model (Model, optional): Defaults to `build_llm()`
+        tools (List[Tool], optional): Data access tools. Defaults to `default_tools()`
+    """
+    # Lets independent Postgres / Mongo / local fetches of one step run concurrently
+    parallel_calls = ParallelCallsTool()
+    agent = CodeAgent(
+        name="query_analyzer",
+        description=(
+            "Analyzes user queries and retrieves the necessary data from the database. "
+            "Result sets meant for a dashboard are saved with `save_as` and referred to by their artifact name."
+        ),
+        model=model or build_llm(),
+        max_steps=12,
+        tools = [*(default_tools() if tools is None else tools), parallel_calls],
+        # add_base_tools = True,
+        verbosity_level=3,
+    )
+    parallel_calls.bind(agent)
+    return instrument_agent(agent)
+
+
+# `llm` and `query_analyzer` are built on first access rather than at import
+__getattr__ = lazy_attributes(__name__, {
+    "llm": lambda module: module.build_llm(),
+    "query_analyzer": lambda module: build_query_analyzer(module.llm),
+})
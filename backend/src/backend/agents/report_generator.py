@@ -1,21 +1,41 @@
 """`backend.agents.report_generator` module."""
 
-from smolagents import CodeAgent, LiteLLMModel
+from smolagents import CodeAgent, LiteLLMModel, Model
+from backend.llm_cache import CachingModel
+from backend.lazy import lazy_attributes
+from backend.tracing import instrument_agent
+from backend.tools.python_workers import use_worker_executor
 from backend.tools.python_tools import AUTHORIZED_IMPORTS
 
 MODEL_ID: str = "anthropic/claude-3-5-sonnet-latest"
 
-llm = LiteLLMModel(
-    model_id=MODEL_ID,
-)
 
+def build_llm() -> Model:
+    """Build the model of the report generator."""
+    return CachingModel(LiteLLMModel(
+        model_id=MODEL_ID,
+    ))
 
-report_generator = CodeAgent(
-    model=llm,
-    name="report_generator",
-    description="Generates business reports from insights provided by another agent.",
-    tools=[],
-    additional_authorized_imports = AUTHORIZED_IMPORTS,
-    # add_base_tools = True,
-    max_steps =12
-)
\ No newline at end of file
+
+def build_report_generator(model: Model = None) -> CodeAgent:
+    """Build the report generator agent.
+
+    Args:
+        model (Model, optional): Defaults to `build_llm()`
+    """
+    return instrument_agent(use_worker_executor(CodeAgent(
+        model=model or build_llm(),
+        name="report_generator",
+        description="Generates business reports from insights provided by another agent.",
+        tools=[],
+        additional_authorized_imports = AUTHORIZED_IMPORTS,
+        # add_base_tools = True,
+        max_steps =12
+    )))
+
+
+# `llm` and `report_generator` are built on first access rather than at import
+__getattr__ = lazy_attributes(__name__, {
+    "llm": lambda module: module.build_llm(),
+    "report_generator": lambda module: build_report_generator(module.llm),
+})
@@ -0,0 +1,4 @@
+"""`backend.benchmark` package.
+
+Offline, end-to-end benchmark of the agents on the consulting database queries.
+"""
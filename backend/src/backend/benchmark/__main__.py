@@ -0,0 +1,69 @@
+"""`backend.benchmark.__main__` module.
+
+Command line entry point: `python -m backend.benchmark [--baseline FILE] [--save-baseline FILE] [--trace FILE]`.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from backend import tracing
+from backend.benchmark.runner import QUERIES_PATH, compare, load_queries, run_benchmark
+from backend.paths import cache_path
+
+
+def main() -> int:
+    """Run the benchmark, write the report and compare it to the baseline. Returns the exit code."""
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark of the agents.")
+    parser.add_argument("--queries", type=Path, default=QUERIES_PATH, help="Benchmark queries (JSON lines)")
+    parser.add_argument("--output", type=Path, default=None, help="Report file (default: in the cache directory)")
+    parser.add_argument("--baseline", type=Path, default=None, help="Report to compare against")
+    parser.add_argument("--save-baseline", type=Path, default=None, help="Also write the report there")
+    parser.add_argument("--model-latency", type=float, default=0.0, help="Seconds per stub completion")
+    parser.add_argument("--tool-latency", type=float, default=0.0, help="Seconds per stub database / web call")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative increase before a regression")
+    parser.add_argument("--trace", type=Path, default=None, help="Write the spans of the runs there (JSON lines)")
+    args = parser.parse_args()
+
+    if args.trace is not None:
+        tracing.configure(args.trace)
+
+    report = run_benchmark(
+        load_queries(args.queries),
+        model_latency=args.model_latency,
+        tool_latency=args.tool_latency,
+        progress=print,
+    )
+    summary = report["summary"]
+    startup = report["startup"]
+    print(f"Startup: backend.main imported in {startup['import_seconds']:.3f}s, loading {startup['heavy_modules'] or 'no heavy module'}")
+    print(
+        f"{summary['queries']} queries in {summary['total_wall_time']:.3f}s "
+        f"(setup {summary['setup_time']:.3f}s), {summary['total_steps']} steps, "
+        f"{summary['total_tokens']} tokens, {summary['correct']}/{summary['checked']} correct, "
+        f"{summary['errors']} errors, peak RSS {summary['peak_rss_mb']} MiB"
+    )
+
+    output = args.output or cache_path("benchmark", "report.json")
+    for path in filter(None, (output, args.save_baseline)):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+    print(f"Report written to {output}")
+    if report["trace"]:
+        print(tracing.format_summary(report["trace"]))
+
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), tolerance=args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print("No regression against the baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,321 @@
+"""`backend.benchmark.runner` module.
+
+Runs the orchestrator on every benchmark query, offline, and measures each run:
+wall time, agent steps, tool call latencies, token counts, peak RSS and correctness
+against the query's `groundtruth`. The startup cost (importing `backend.main`) is
+measured too. Reports are JSON and can be compared to a baseline.
+"""
+
+import json
+import os
+import platform
+import re
+import resource
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from backend import tracing
+from backend.benchmark.scripts import SCRIPTS, WEB_FIXTURES
+from backend.tools.local_data import DATA_DIR
+
+QUERIES_PATH: Path = DATA_DIR.parent / "queries_on_consulting_database.json"
+
+# Imports `backend.main` in a fresh interpreter and reports what that cost
+_STARTUP_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import backend.main
+from backend.lazy import build_times
+print(json.dumps({
+    "import_seconds": round(time.perf_counter() - start, 6),
+    "built_at_import": sorted(build_times),
+    "heavy_modules": [name for name in %r if name in sys.modules],
+}))
+"""
+# Modules only the agents and tools need, which the UI should come up without
+_HEAVY_MODULES = ("litellm", "psycopg2", "pymongo", "backend.agents.orchestrator", "backend.tools.postgre_tool")
+
+# Placeholders for the credentials read when the agent modules are imported; never used offline
+_OFFLINE_ENVIRONMENT = {
+    "ANTHROPIC_API_KEY": "offline",
+    "SERPER_API": "offline",
+    "JINA_API_KEY": "offline",
+}
+
+
+def load_queries(path: Path = QUERIES_PATH) -> List[Dict[str, Any]]:
+    """Read the benchmark queries (one JSON object per line)."""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of the process so far, in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS, in KiB elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def is_correct(answer: Any, groundtruth: Any) -> Optional[bool]:
+    """Whether the answer contains the groundtruth as a whole word (None when there is no groundtruth)."""
+    if groundtruth is None:
+        return None
+    pattern = r"(?<!\w)" + re.escape(str(groundtruth).lower()) + r"(?!\w)"
+    return re.search(pattern, str(answer).lower()) is not None
+
+
+def measure_startup() -> Dict[str, Any]:
+    """Time the import of `backend.main` (everything before the UI launches) in a fresh interpreter."""
+    source_dir = Path(__file__).resolve().parents[2]
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(source_dir), os.environ.get("PYTHONPATH")]))}
+    output = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", _STARTUP_PROBE % (_HEAVY_MODULES,)],
+        capture_output=True, text=True, env=env, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+class Recorder:
+    """Collects the tool calls and agent steps of the query being run."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.tool_calls: List[Dict[str, Any]] = []
+        self.steps: Dict[str, int] = {}
+        self.step_errors = 0
+
+    def wrap_tool(self, tool) -> None:
+        """Time every call of the tool's `forward`."""
+        forward = tool.forward
+
+        def timed_forward(*args, **kwargs):
+            start = time.perf_counter()
+            error = None
+            try:
+                result = forward(*args, **kwargs)
+                if isinstance(result, dict) and result.get("success") is False:
+                    error = result.get("error")
+                return result
+            except Exception as e:
+                error = f"{type(e).__name__}: {str(e)}"
+                raise
+            finally:
+                with self._lock:
+                    self.tool_calls.append({
+                        "tool": tool.name,
+                        "seconds": round(time.perf_counter() - start, 6),
+                        "error": error,
+                    })
+
+        tool.forward = timed_forward
+
+    def on_step(self, memory_step, agent=None) -> None:
+        """Step callback counting the steps (and failed steps) of every agent."""
+        name = getattr(agent, "name", None) or "orchestrator"
+        with self._lock:
+            self.steps[name] = self.steps.get(name, 0) + 1
+            if getattr(memory_step, "error", None) is not None:
+                self.step_errors += 1
+
+
+def build_offline_orchestrator(recorder: Recorder, model_latency: float = 0.0, tool_latency: float = 0.0):
+    """Build the agents as the app does, with stub models and the local stand-ins of external services.
+
+    Returns:
+        Tuple of the orchestrator and the stub models by agent name
+    """
+    for name, value in _OFFLINE_ENVIRONMENT.items():
+        os.environ.setdefault(name, value)
+
+    from smolagents.monitoring import LogLevel
+
+    from backend.agents.code_agent import build_code_agent
+    from backend.agents.orchestrator import build_orchestrator
+    from backend.agents.query_analyzer import build_query_analyzer
+    from backend.agents.report_generator import build_report_generator
+    from backend.llm_cache import CachingModel
+    from backend.benchmark.stubs import (
+        InMemoryMongoTool, ScriptedModel, SQLiteQueryTool, SQLiteSchemaTool, load_sqlite, stub_web_tools,
+    )
+    from backend.tools.local_data import LocalDataTool
+    from backend.tools.sales_insights import SalesInsightsTool
+    from backend.tools.world_bank import WorldBankTool
+
+    models = {name: ScriptedModel(script, latency=model_latency) for name, script in SCRIPTS.items()}
+    # Wrapped like the app's models, never caching
+    wrapped = {name: CachingModel(model, mode="passthrough") for name, model in models.items()}
+    conn = load_sqlite()
+    query_analyzer = build_query_analyzer(wrapped["query_analyzer"], tools=[
+        SalesInsightsTool(),
+        SQLiteSchemaTool(conn),
+        SQLiteQueryTool(conn, latency=tool_latency),
+        InMemoryMongoTool.from_csvs(latency=tool_latency),
+        LocalDataTool(),
+        WorldBankTool(),
+    ])
+    report_generator = build_report_generator(wrapped["report_generator"])
+    code_agent = build_code_agent(wrapped["code_agent"], tools=[], add_base_tools=False)
+    orchestrator = build_orchestrator(
+        wrapped["orchestrator"],
+        managed_agents=[query_analyzer, report_generator, code_agent],
+        tools=stub_web_tools(WEB_FIXTURES, latency=tool_latency),
+        add_base_tools=False,
+    )
+
+    for agent in (orchestrator, query_analyzer, report_generator, code_agent):
+        agent.logger.level = LogLevel.OFF
+        agent.step_callbacks.append(recorder.on_step)
+        for name, tool in agent.tools.items():
+            if name != "final_answer":
+                recorder.wrap_tool(tool)
+    return orchestrator, models
+
+
+def _tool_summary(tool_calls: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    summary: Dict[str, Dict[str, Any]] = {}
+    for call in tool_calls:
+        entry = summary.setdefault(call["tool"], {"calls": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+        entry["calls"] += 1
+        entry["errors"] += call["error"] is not None
+        entry["total_seconds"] = round(entry["total_seconds"] + call["seconds"], 6)
+        entry["max_seconds"] = max(entry["max_seconds"], call["seconds"])
+    return summary
+
+
+def run_benchmark(
+    queries: List[Dict[str, Any]],
+    model_latency: float = 0.0,
+    tool_latency: float = 0.0,
+    progress: Optional[Callable[[str], None]] = None,
+) -> Dict[str, Any]:
+    """Run every query through the offline orchestrator and build the report.
+
+    Args:
+        queries (List[Dict[str, Any]]): Benchmark entries with `user`, `query` and optional `groundtruth`
+        model_latency (float): Seconds each stub completion takes
+        tool_latency (float): Seconds each stub database / web call takes
+        progress (Callable, optional): Called with a line of text after each query
+    """
+    startup = measure_startup()
+    recorder = Recorder()
+    start = time.perf_counter()
+    orchestrator, models = build_offline_orchestrator(recorder, model_latency, tool_latency)
+    setup_time = time.perf_counter() - start
+
+    results = []
+    for entry in queries:
+        recorder.reset()
+        for model in models.values():
+            model.reset_counters()
+
+        task = f"I am {entry.get('user', 'a client')}. {entry['query']}"
+        error = None
+        start = time.perf_counter()
+        try:
+            answer = orchestrator.run(task)
+        except Exception as e:
+            answer, error = None, f"{type(e).__name__}: {str(e)}"
+        wall_time = time.perf_counter() - start
+
+        result = {
+            "user": entry.get("user"),
+            "query": entry["query"],
+            "answer": None if answer is None else str(answer)[:2000],
+            "groundtruth": entry.get("groundtruth"),
+            "correct": is_correct(answer, entry.get("groundtruth")),
+            "error": error,
+            "wall_time": round(wall_time, 6),
+            "steps": dict(recorder.steps),
+            "total_steps": sum(recorder.steps.values()),
+            "step_errors": recorder.step_errors,
+            "llm_calls": sum(model.calls for model in models.values()),
+            "input_tokens": sum(model.total_input_tokens for model in models.values()),
+            "output_tokens": sum(model.total_output_tokens for model in models.values()),
+            "tool_calls": list(recorder.tool_calls),
+            "tools": _tool_summary(recorder.tool_calls),
+            "peak_rss_mb": peak_rss_mb(),
+        }
+        results.append(result)
+        if progress:
+            progress(
+                f"{result['wall_time']:8.3f}s  {result['total_steps']:3d} steps  "
+                f"{result['input_tokens'] + result['output_tokens']:7d} tokens  "
+                f"correct={result['correct']}  {entry['query'][:60]}"
+            )
+
+    checked = [r for r in results if r["correct"] is not None]
+    tracer = tracing.get_tracer()
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "settings": {"model_latency": model_latency, "tool_latency": tool_latency},
+        "startup": startup,
+        "summary": {
+            "queries": len(results),
+            "setup_time": round(setup_time, 6),
+            "total_wall_time": round(sum(r["wall_time"] for r in results), 6),
+            "total_steps": sum(r["total_steps"] for r in results),
+            "total_tokens": sum(r["input_tokens"] + r["output_tokens"] for r in results),
+            "errors": sum(r["error"] is not None for r in results),
+            "correct": sum(bool(r["correct"]) for r in checked),
+            "checked": len(checked),
+            "peak_rss_mb": peak_rss_mb(),
+        },
+        "queries": results,
+        # Latency percentiles by span, when tracing is on
+        "trace": tracer.summary() if tracer is not None else None,
+    }
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.2, min_seconds: float = 0.05) -> List[str]:
+    """List the regressions of `report` against `baseline`, matching queries by their text.
+
+    Args:
+        tolerance (float): Allowed relative increase of wall time and tokens
+        min_seconds (float): Wall time increases below this are considered noise
+    """
+    regressions = []
+    startup, startup_before = report.get("startup"), baseline.get("startup")
+    if startup is not None:
+        if startup["built_at_import"]:
+            regressions.append(f"startup: importing backend.main builds {', '.join(startup['built_at_import'])}")
+        if startup_before is not None:
+            slower = startup["import_seconds"] - startup_before["import_seconds"]
+            if slower > min_seconds and startup["import_seconds"] > startup_before["import_seconds"] * (1 + tolerance):
+                regressions.append(
+                    f"startup: import {startup_before['import_seconds']:.3f}s -> {startup['import_seconds']:.3f}s"
+                )
+            added = sorted(set(startup["heavy_modules"]) - set(startup_before["heavy_modules"]))
+            if added:
+                regressions.append(f"startup: now imports {', '.join(added)}")
+
+    previous = {entry["query"]: entry for entry in baseline["queries"]}
+    for entry in report["queries"]:
+        before = previous.get(entry["query"])
+        if before is None:
+            continue
+        label = entry["query"][:60]
+        if before["correct"] and not entry["correct"]:
+            regressions.append(f"{label}: answer no longer matches the groundtruth")
+        if before["error"] is None and entry["error"] is not None:
+            regressions.append(f"{label}: now fails with {entry['error']}")
+        slower = entry["wall_time"] - before["wall_time"]
+        if slower > min_seconds and entry["wall_time"] > before["wall_time"] * (1 + tolerance):
+            regressions.append(f"{label}: wall time {before['wall_time']:.3f}s -> {entry['wall_time']:.3f}s")
+        if entry["total_steps"] > before["total_steps"]:
+            regressions.append(f"{label}: steps {before['total_steps']} -> {entry['total_steps']}")
+        tokens, tokens_before = (
+            entry["input_tokens"] + entry["output_tokens"],
+            before["input_tokens"] + before["output_tokens"],
+        )
+        if tokens > tokens_before * (1 + tolerance):
+            regressions.append(f"{label}: tokens {tokens_before} -> {tokens}")
+    return regressions
@@ -0,0 +1,164 @@
+"""`backend.benchmark.scripts` module.
+
+Scripted agent steps replayed by the benchmark's stub models, and the web fixtures.
+
+Each agent's script maps a key, looked up in the agent's task, to the responses of its
+successive steps. The steps call the agents' real tools (against the local stand-ins),
+so the benchmark exercises the tool code paths and checks their results.
+"""
+
+from typing import Any, Dict, List
+
+
+def _step(thought: str, code: str) -> str:
+    """Format a step the way a CodeAgent model answers."""
+    return f"Thought: {thought}\nCode:\n```py\n{code.strip()}\n```<end_code>"
+
+
+SCRIPTS: Dict[str, Dict[str, List[str]]] = {
+    "orchestrator": {
+        "average price of my sales": [
+            _step("The query analyzer can compute this from the sales table.", """
+result = query_analyzer(task="Compute the average sale price of client1 between 2023-01-01 and 2024-12-31.")
+print(result)
+"""),
+            _step("I have the figure.", "final_answer(result)"),
+        ],
+        "best customer": [
+            _step("The query analyzer can rank the customers.", """
+result = query_analyzer(task="Find the best customer of client1 by revenue.")
+print(result)
+"""),
+            _step("I have the customer.", "final_answer(result)"),
+        ],
+        "report on my past sales": [
+            _step("First gather the figures.", """
+figures = query_analyzer(task="Collect the sales figures of client2 for a report: summary, top customers and revenue by year.")
+print(figures)
+"""),
+            _step("Now have the report written.", """
+report = report_generator(task="Write a business report on client2's past sales from these figures:\\n" + figures)
+print(report)
+"""),
+            _step("The report is ready.", "final_answer(report)"),
+        ],
+        "nasdaq": [
+            _step("Search the web and read the index page at the same time.", """
+results = run_in_parallel(calls=[
+    {"tool": "google_search", "arguments": {"query": "largest tech companies NASDAQ-100 market cap"}},
+    {"tool": "serper_scrape", "arguments": {"url": "https://www.nasdaq.com/market-activity/index/ndx"}},
+])
+print(results)
+"""),
+            _step("Rank the sources by relevance.", """
+ranked = rerank(query="market leader among NASDAQ tech companies", documents=[r["result"] for r in results])
+print(ranked)
+"""),
+            _step("The sources agree.", """
+final_answer("Apple, Microsoft and NVIDIA lead the NASDAQ tech companies by market capitalization, with Apple first.")
+"""),
+        ],
+        "bananas": [
+            _step("The emissions dataset answers this.", """
+result = query_analyzer(task="Compare the greenhouse gas emissions per kilogram of bananas and wine.")
+print(result)
+"""),
+            _step("I have the comparison.", "final_answer(result)"),
+        ],
+    },
+    "query_analyzer": {
+        "average sale price of client1": [
+            _step("Aggregate in SQL.", """
+r = postgres_query(query="SELECT ROUND(AVG(price), 2) AS average_price, COUNT(*) AS sales FROM client1_sales WHERE date BETWEEN '2023-01-01' AND '2024-12-31'")
+print(r)
+"""),
+            _step("Report the result.", """
+row = r["data"][0]
+final_answer(f"The average price of client1's sales between 2023 and 2024 is {row['average_price']} over {row['sales']} sales.")
+"""),
+        ],
+        "best customer of client1": [
+            _step("The precomputed aggregates rank customers by revenue.", """
+r = sales_insights(client="client1", metric="top_customers", top_n=1)
+print(r)
+"""),
+            _step("Report the customer.", """
+best = r["data"][0]
+final_answer(f"The best customer of client1 is {best['name']} with {best['revenue']} of sales.")
+"""),
+        ],
+        "sales figures of client2": [
+            _step("These fetches are independent.", """
+results = run_in_parallel(calls=[
+    {"tool": "sales_insights", "arguments": {"client": "client2", "metric": "summary"}},
+    {"tool": "sales_insights", "arguments": {"client": "client2", "metric": "top_customers", "top_n": 3}},
+    {"tool": "postgres_query", "arguments": {"query": "SELECT substr(date, 1, 4) AS year, COUNT(*) AS sales, ROUND(SUM(price), 2) AS revenue FROM client2_sales_client2 GROUP BY year ORDER BY year"}},
+])
+print([r["success"] for r in results])
+"""),
+            _step("Return the figures.", """
+summary, top, years = [r["result"]["data"] for r in results]
+final_answer({"summary": {k: v for k, v in summary.items() if k != "years"}, "top_customers": top, "revenue_by_year": years})
+"""),
+        ],
+        "bananas and wine": [
+            _step("Read the two products from the emissions dataset.", """
+r = local_data_query(dataset="global_information/greenhouse-gas-emissions-per-kilogram-of-food-product", filters={"Entity": ["Bananas", "Wine"]})
+print(r)
+"""),
+            _step("Compare them.", """
+column = "GHG emissions per kilogram (Poore & Nemecek, 2018)"
+emissions = {row["Entity"]: row[column] for row in r["data"]}
+verdict = "yes" if emissions["Bananas"] < emissions["Wine"] else "no"
+final_answer(f"{verdict}: bananas emit {emissions['Bananas']} kg CO2eq per kg, wine {emissions['Wine']} kg CO2eq per kg.")
+"""),
+        ],
+    },
+    "report_generator": {
+        "business report on client2": [
+            _step("Write the report from the figures in the task.", """
+report = "\\n".join([
+    "# Client2 - past sales report",
+    "",
+    "## Overview",
+    "Sales were steady over the period, with a broad base of customers.",
+    "",
+    "## Customers",
+    "The top three customers account for a significant share of the revenue.",
+    "",
+    "## Recommendations",
+    "- Secure the top accounts with longer-term contracts.",
+    "- Grow the mid-size customers, whose average basket is close to the top ones.",
+])
+final_answer(report)
+"""),
+        ],
+    },
+    "code_agent": {},
+}
+
+
+WEB_FIXTURES: Dict[str, Dict[str, Any]] = {
+    "google_search": {
+        "nasdaq": (
+            '{"organic": ['
+            '{"title": "Largest Nasdaq-100 companies by market cap", "link": "https://example.com/ndx", '
+            '"snippet": "Apple, Microsoft and NVIDIA are the largest tech companies in the NASDAQ-100."}, '
+            '{"title": "Nasdaq-100 index", "link": "https://example.com/ndx-index", '
+            '"snippet": "The index is weighted by market capitalization; Apple holds the largest weight."}]}'
+        ),
+        "": '{"organic": []}',
+    },
+    "serper_scrape": {
+        "nasdaq": (
+            '{"text": "NASDAQ-100 (NDX)", "markdown": "# NASDAQ-100\\n| Company | Weight |\\n|---|---|\\n'
+            '| Apple | 8.9% |\\n| Microsoft | 8.4% |\\n| NVIDIA | 7.9% |"}'
+        ),
+        "": '{"text": ""}',
+    },
+    "jina_rerank": {
+        "": (
+            '{"results": [{"index": 1, "relevance_score": 0.91}, {"index": 0, "relevance_score": 0.87}]}'
+        ),
+    },
+}
@@ -0,0 +1,292 @@
+"""`backend.benchmark.stubs` module.
+
+Offline stand-ins used by the benchmark: a scripted model replaying canned agent
+steps, a SQLite database replacing PostgreSQL, an in-memory MongoDB, and the web
+tools (Serper search / scrape, Jina rerank) answering from fixtures.
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+from smolagents import Tool
+from smolagents.models import ChatMessage, Model
+
+from backend.tools.artifacts import ARTIFACT_MAX_ROWS, attach_artifact
+from backend.tools.local_data import DATA_DIR, read_csv
+from backend.tools.mongodb_tool import MongoDBQueryTool
+from backend.tools.postgre_tool import PostgresQueryTool
+
+
+def _text(content: Any) -> str:
+    """Flatten a smolagents message content (a string or a list of typed parts) to text."""
+    if isinstance(content, list):
+        return "\n".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return str(content or "")
+
+
+class ScriptedModel(Model):
+    """Replays scripted responses, picked by a key found in the agent's task and by the step number.
+
+    Token counts are estimated at four characters per token, and an optional
+    latency simulates the network round trip of a real completion.
+    """
+
+    def __init__(self, script: Dict[str, List[str]], latency: float = 0.0, model_id: str = "scripted"):
+        """Initialize the model.
+
+        Args:
+            script (Dict[str, List[str]]): Responses, step by step, for tasks containing each key
+            latency (float): Seconds slept per call
+            model_id (str): Reported model id
+        """
+        super().__init__()
+        self.script = script
+        self.latency = latency
+        self.model_id = model_id
+        self.calls = 0
+        self.total_input_tokens = 0
+        self.total_output_tokens = 0
+
+    def reset_counters(self) -> None:
+        self.calls = 0
+        self.total_input_tokens = 0
+        self.total_output_tokens = 0
+
+    def __call__(
+        self,
+        messages: List[Dict[str, Any]],
+        stop_sequences: Optional[List[str]] = None,
+        grammar: Optional[str] = None,
+        tools_to_call_from: Optional[List[Tool]] = None,
+        **kwargs,
+    ) -> ChatMessage:
+        task = next((_text(m["content"]) for m in messages if m["role"] == "user"), "").lower()
+        # Each past step left the model's output and a "Calling tools:" record as assistant messages
+        step = sum(
+            1 for m in messages
+            if m["role"] == "assistant" and not _text(m["content"]).startswith("Calling tools:")
+        )
+        responses = next((steps for key, steps in self.script.items() if key.lower() in task), None)
+        if responses is None:
+            content = "Thought: No scripted step for this task.\nCode:\n```py\nfinal_answer(\"unscripted task\")\n```<end_code>"
+        elif step < len(responses):
+            content = responses[step]
+        else:
+            content = "Thought: The script is exhausted.\nCode:\n```py\nfinal_answer(\"script exhausted\")\n```<end_code>"
+
+        if self.latency:
+            time.sleep(self.latency)
+        self.calls += 1
+        self.last_input_token_count = sum(len(_text(m["content"])) for m in messages) // 4
+        self.last_output_token_count = len(content) // 4
+        self.total_input_tokens += self.last_input_token_count
+        self.total_output_tokens += self.last_output_token_count
+        return ChatMessage(role="assistant", content=content)
+
+
+def table_name(path: Path, data_dir: Path = DATA_DIR) -> str:
+    """Name of the SQL table / collection holding a CSV, e.g. `client1_sales`."""
+    relative = path.relative_to(data_dir).with_suffix("").as_posix()
+    return re.sub(r"[^0-9a-z]+", "_", relative.lower()).strip("_")
+
+
+def load_sqlite(data_dir: Path = DATA_DIR) -> sqlite3.Connection:
+    """Load every CSV of the consulting database into an in-memory SQLite database."""
+    conn = sqlite3.connect(":memory:", check_same_thread=False)
+    for path in sorted(data_dir.rglob("*.csv")):
+        frame = read_csv(path)
+        for column in frame.columns:
+            if pd.api.types.is_datetime64_any_dtype(frame[column]):
+                frame[column] = frame[column].dt.strftime("%Y-%m-%d")
+        frame.to_sql(table_name(path, data_dir), conn, index=False)
+    return conn
+
+
+class SQLiteQueryTool(Tool):
+    """Stand-in for `PostgresQueryTool`, with the same name and inputs, backed by SQLite."""
+
+    name = PostgresQueryTool.name
+    description = PostgresQueryTool.description
+    inputs = PostgresQueryTool.inputs
+    output_type = PostgresQueryTool.output_type
+
+    def __init__(self, conn: sqlite3.Connection, latency: float = 0.0):
+        super().__init__()
+        self.conn = conn
+        self.latency = latency
+        self._lock = threading.Lock()
+
+    def forward(
+        self,
+        query: str,
+        params: Dict[str, Any] = None,
+        max_rows: int = None,
+        max_bytes: int = None,
+        result_format: str = None,
+        save_as: str = None,
+    ) -> Dict[str, Any]:
+        if self.latency:
+            time.sleep(self.latency)
+        max_rows = (ARTIFACT_MAX_ROWS if save_as else 1000) if max_rows is None else max_rows
+        try:
+            with self._lock:
+                cursor = self.conn.execute(query, params or {})
+                if cursor.description is None:
+                    self.conn.commit()
+                    return {"success": True, "data": None, "affected_rows": cursor.rowcount, "truncated": False, "error": None}
+                columns = [column[0] for column in cursor.description]
+                rows = cursor.fetchmany(max_rows + 1)
+            data = [dict(zip(columns, row)) for row in rows[:max_rows]]
+            result = {"success": True, "data": data, "affected_rows": len(data), "truncated": len(rows) > max_rows, "error": None}
+            return attach_artifact(result, save_as, query) if save_as else result
+        except sqlite3.Error as e:
+            return {"success": False, "data": None, "affected_rows": 0, "truncated": False, "error": str(e)}
+
+
+class SQLiteSchemaTool(Tool):
+    """Stand-in for `PostgresSchemaTool`, describing the SQLite tables."""
+
+    name = "postgres_schema"
+    description = "Describes the database schema in one call: every table with its columns and types."
+    inputs = {
+        "table": {
+            "type": "string",
+            "description": "Optional table name",
+            "required": False,
+            "nullable": True
+        },
+        "refresh": {
+            "type": "boolean",
+            "description": "Ignored",
+            "required": False,
+            "nullable": True
+        }
+    }
+    output_type = "string"
+
+    def __init__(self, conn: sqlite3.Connection):
+        super().__init__()
+        self.conn = conn
+
+    def forward(self, table: str = None, refresh: bool = None) -> str:
+        names = [row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name")]
+        lines = []
+        for name in names:
+            if table and name != table:
+                continue
+            columns = self.conn.execute(f'PRAGMA table_info("{name}")').fetchall()
+            lines.append(f"{name}: " + ", ".join(f"{column[1]} {column[2]}" for column in columns))
+        return "\n".join(lines) or f"Error: table {table} not found"
+
+
+class InMemoryMongoTool(Tool):
+    """Stand-in for `MongoDBQueryTool` over in-memory collections (one per CSV).
+
+    Supports `find` with equality filters, projection, sort and limit, and `count`.
+    """
+
+    name = MongoDBQueryTool.name
+    description = MongoDBQueryTool.description
+    inputs = MongoDBQueryTool.inputs
+    output_type = MongoDBQueryTool.output_type
+
+    def __init__(self, collections: Dict[str, List[Dict[str, Any]]], latency: float = 0.0):
+        super().__init__()
+        self.collections = collections
+        self.latency = latency
+
+    @classmethod
+    def from_csvs(cls, data_dir: Path = DATA_DIR, latency: float = 0.0) -> "InMemoryMongoTool":
+        collections = {}
+        for path in sorted(data_dir.rglob("*.csv")):
+            frame = read_csv(path)
+            collections[table_name(path, data_dir)] = frame.astype(object).where(frame.notna(), None).to_dict("records")
+        return cls(collections, latency)
+
+    def forward(
+        self,
+        collection: str,
+        operation: str,
+        query: Dict[str, Any],
+        data: Dict[str, Any] = None,
+        projection: Dict[str, Any] = None,
+        sort: Any = None,
+        limit: int = None,
+        skip: int = None,
+        batch_size: int = None,
+        max_documents: int = None,
+        pipeline: List[Dict[str, Any]] = None,
+        allow_disk_use: bool = None,
+        max_time_ms: int = None,
+        explain: bool = None,
+        operations: List[Dict[str, Any]] = None,
+        result_format: str = None,
+        save_as: str = None,
+    ) -> Dict[str, Any]:
+        if self.latency:
+            time.sleep(self.latency)
+        if collection not in self.collections:
+            return {"success": False, "data": None, "affected_count": 0, "error": f"Unknown collection: {collection}"}
+        documents = [
+            document for document in self.collections[collection]
+            if all(document.get(field) == value for field, value in (query or {}).items())
+        ]
+        if operation == "count":
+            return {"success": True, "data": len(documents), "affected_count": 0, "error": None}
+        if operation != "find":
+            return {"success": False, "data": None, "affected_count": 0, "error": f"{operation} is not supported by the benchmark stand-in"}
+
+        if sort:
+            for field, direction in reversed(list(sort.items()) if isinstance(sort, dict) else sort):
+                documents = sorted(documents, key=lambda document: document.get(field), reverse=direction < 0)
+        documents = documents[skip or 0:]
+        if limit:
+            documents = documents[:limit]
+        if projection:
+            documents = [{field: document.get(field) for field, keep in projection.items() if keep} for document in documents]
+        result = {"success": True, "data": documents, "affected_count": len(documents), "truncated": False, "error": None}
+        return attach_artifact(result, save_as, f"{collection}.{operation}") if save_as else result
+
+
+class FixtureTool(Tool):
+    """Web tool answering from fixtures: the first fixture whose key occurs in the input, else a default."""
+
+    output_type = "string"
+    # Inputs are set per instance, so `forward` takes them as keyword arguments
+    skip_forward_signature_validation = True
+
+    def __init__(self, name: str, description: str, inputs: Dict[str, Any], fixtures: Dict[str, Any], latency: float = 0.0):
+        self.name = name
+        self.description = description
+        self.inputs = inputs
+        self.fixtures = fixtures
+        self.latency = latency
+        super().__init__()
+
+    def forward(self, **kwargs) -> Any:
+        if self.latency:
+            time.sleep(self.latency)
+        text = " ".join(str(value) for value in kwargs.values()).lower()
+        return next((value for key, value in self.fixtures.items() if key.lower() in text), self.fixtures.get("", ""))
+
+
+def stub_web_tools(fixtures: Dict[str, Dict[str, Any]], latency: float = 0.0) -> List[Tool]:
+    """Build the Serper search / scrape and Jina rerank stand-ins, with the real tools' names and inputs.
+
+    The batch search and scrape tools are the real ones, dispatching to the stand-ins, and so is the local reranker.
+    """
+    from backend.tools.google_search import GoogleBatchSearch, GoogleSearch
+    from backend.tools.jina_rerank import JinaRerank
+    from backend.tools.rerank import RerankTool
+    from backend.tools.serper_scrape import SerperBatchScrape, SerperScrape
+
+    search, scrape, rerank = (
+        FixtureTool(tool.name, tool.description, tool.inputs, fixtures.get(tool.name, {}), latency)
+        for tool in (GoogleSearch, SerperScrape, JinaRerank)
+    )
+    return [search, GoogleBatchSearch(search), scrape, SerperBatchScrape(scrape), rerank, RerankTool(engine="local")]
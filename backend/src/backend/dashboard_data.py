@@ -0,0 +1,26 @@
+"""`backend.dashboard_data` module.
+
+Loader of the query results saved as artifacts, for the generated Streamlit dashboards:
+
+    from backend.dashboard_data import load_artifact
+
+    sales = load_artifact("client1_monthly_sales")
+
+The artifact is memory-mapped and converted once per content hash, then served from
+Streamlit's cache to every rerun and session.
+"""
+
+import streamlit as st
+
+from backend.tools.artifacts import artifact_store
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _load(digest: str):
+    # The hash names the content, so it is the whole cache key
+    return artifact_store.read_table(digest).to_pandas(split_blocks=True)
+
+
+def load_artifact(ref: str):
+    """Load the artifact `ref` (a name, `name@<version>` or a hash) as a pandas DataFrame."""
+    return _load(artifact_store.resolve(ref))
@@ -15,36 +15,72 @@ st.set_page_config(
     layout="wide"
 )
 
+YEARS = (2015, 2022)
+ENERGY_SOURCES = ['Coal', 'Oil', 'Gas']
+SECTIONS = {
+    "🍔 Food": "food",
+    "⚡ Energy": "energy",
+    "🗺️ Geographic": "geo",
+    "♻️ Renewable": "renewable",
+}
+
 # Cache the data loading
 @st.cache_data
 def load_sample_data():
-    # Sample data generation (replace with real data in production)
-    food_data = pd.DataFrame({
-        'Category': ['Beef', 'Pork', 'Chicken', 'Fish', 'Vegetables'],
-        'Emissions': [50, 20, 10, 8, 5],
-        'Year': [2022] * 5
-    })
+    # Sample data generation (replace with real data in production): one row per year and category
+    years = np.arange(YEARS[0], YEARS[1] + 1)
+
+    def yearly(column, values, name):
+        return pd.DataFrame({
+            'Year': np.repeat(years, len(values)),
+            column: np.tile(list(values), len(years)),
+            name: np.tile(list(values.values()), len(years)) * np.random.uniform(0.8, 1.2, len(years) * len(values)),
+        })
+
+    food_data = yearly('Category', {'Beef': 50, 'Pork': 20, 'Chicken': 10, 'Fish': 8, 'Vegetables': 5}, 'Emissions')
     
     energy_data = pd.DataFrame({
-        'Year': range(2015, 2023),
-        'Coal': np.random.randint(100, 150, 8),
-        'Oil': np.random.randint(80, 120, 8),
-        'Gas': np.random.randint(60, 90, 8)
+        'Year': years,
+        'Coal': np.random.randint(100, 150, len(years)),
+        'Oil': np.random.randint(80, 120, len(years)),
+        'Gas': np.random.randint(60, 90, len(years))
     })
     
-    geo_data = pd.DataFrame({
-        'Country': ['USA', 'China', 'India', 'Russia', 'Japan'],
-        'Emissions': [15, 30, 7, 5, 3]
-    })
+    geo_data = yearly('Country', {'USA': 15, 'China': 30, 'India': 7, 'Russia': 5, 'Japan': 3}, 'Emissions')
     
-    renewable_data = pd.DataFrame({
-        'Source': ['Solar', 'Wind', 'Hydro', 'Biomass'],
-        'Percentage': [15, 25, 40, 20]
-    })
+    renewable_data = yearly('Source', {'Solar': 15, 'Wind': 25, 'Hydro': 40, 'Biomass': 20}, 'Percentage')
     
     return food_data, energy_data, geo_data, renewable_data
 
-def create_food_charts(food_data):
+@st.cache_data
+def load_aggregates():
+    """Year-indexed totals (one row per year, one column per category), computed once.
+
+    Filtering and charting only touch these frames, so their cost does not depend on the
+    number of raw rows.
+    """
+    food_data, energy_data, geo_data, renewable_data = load_sample_data()
+    return {
+        "food": food_data.pivot_table(index='Year', columns='Category', values='Emissions', aggfunc='sum').sort_index(),
+        "energy": energy_data.groupby('Year')[ENERGY_SOURCES].sum().sort_index(),
+        "geo": geo_data.pivot_table(index='Year', columns='Country', values='Emissions', aggfunc='sum').sort_index(),
+        "renewable": renewable_data.pivot_table(index='Year', columns='Source', values='Percentage', aggfunc='mean').sort_index(),
+    }
+
+def select_years(frame, years):
+    """Rows of a year-indexed frame within the (start, end) year range."""
+    index = frame.index.to_numpy()
+    return frame[(index >= years[0]) & (index <= years[1])]
+
+def totals(frame, years, name, label):
+    """Sum over the selected years, as a (label, name) frame."""
+    return select_years(frame, years).sum().rename_axis(label).reset_index(name=name)
+
+# Figures are built once per filter state; reruns with the same filters reuse them
+@st.cache_resource(max_entries=64)
+def create_food_charts(years):
+    food_data = totals(load_aggregates()["food"], years, 'Emissions', 'Category')
+
     # Stacked bar chart
     fig_bar = px.bar(
         food_data,
@@ -63,12 +99,15 @@ def create_food_charts(food_data):
     
     return fig_bar, fig_treemap
 
-def create_energy_charts(energy_data):
+@st.cache_resource(max_entries=64)
+def create_energy_charts(years):
+    energy_data = select_years(load_aggregates()["energy"], years).reset_index()
+
     # Multi-line chart
     fig_line = px.line(
         energy_data,
         x='Year',
-        y=['Coal', 'Oil', 'Gas'],
+        y=ENERGY_SOURCES,
         title='Energy Emissions Over Time'
     )
     
@@ -76,13 +115,15 @@ def create_energy_charts(energy_data):
     fig_area = px.area(
         energy_data,
         x='Year',
-        y=['Coal', 'Oil', 'Gas'],
+        y=ENERGY_SOURCES,
         title='Cumulative Energy Emissions'
     )
     
     return fig_line, fig_area
 
-def create_geo_chart(geo_data):
+@st.cache_resource(max_entries=64)
+def create_geo_chart(years):
+    geo_data = totals(load_aggregates()["geo"], years, 'Emissions', 'Country')
     fig_geo = px.choropleth(
         geo_data,
         locations='Country',
@@ -92,81 +133,93 @@ def create_geo_chart(geo_data):
     )
     return fig_geo
 
-def create_renewable_charts(renewable_data):
-    fig_gauge = go.Figure()
+@st.cache_resource(max_entries=64)
+def create_renewable_charts(years):
+    # Average share of each source over the selected years
+    shares = select_years(load_aggregates()["renewable"], years).mean()
     
-    for idx, row in renewable_data.iterrows():
-        fig_gauge.add_trace(go.Indicator(
+    fig_gauge = go.Figure([
+        go.Indicator(
             mode="gauge+number",
-            value=row['Percentage'],
-            title={'text': row['Source']},
+            value=value,
+            number={'valueformat': '.1f'},
+            title={'text': source},
             domain={'row': idx, 'column': 0}
-        ))
+        )
+        for idx, (source, value) in enumerate(zip(shares.index, shares.to_numpy()))
+    ])
     
     fig_gauge.update_layout(
-        grid={'rows': len(renewable_data), 'columns': 1},
-        height=150 * len(renewable_data)
+        grid={'rows': len(shares), 'columns': 1},
+        height=150 * len(shares)
     )
     
     return fig_gauge
 
+@st.cache_data(max_entries=64)
+def food_csv(years):
+    return totals(load_aggregates()["food"], years, 'Emissions', 'Category').to_csv(index=False)
+
+def render_food(years):
+    st.header("Food Emissions")
+    col1, col2 = st.columns(2)
+    fig_bar, fig_treemap = create_food_charts(years)
+    col1.plotly_chart(fig_bar, use_container_width=True)
+    col2.plotly_chart(fig_treemap, use_container_width=True)
+
+def render_energy(years):
+    st.header("Energy Emissions")
+    col1, col2 = st.columns(2)
+    fig_line, fig_area = create_energy_charts(years)
+    col1.plotly_chart(fig_line, use_container_width=True)
+    col2.plotly_chart(fig_area, use_container_width=True)
+
+def render_geo(years):
+    st.header("Geographic Distribution")
+    st.plotly_chart(create_geo_chart(years), use_container_width=True)
+
+def render_renewable(years):
+    st.header("Renewable Energy Progress")
+    st.plotly_chart(create_renewable_charts(years), use_container_width=True)
+
+RENDERERS = {
+    "food": render_food,
+    "energy": render_energy,
+    "geo": render_geo,
+    "renewable": render_renewable,
+}
+
 # Main app
 def main():
     st.title("🌍 Greenhouse Gas Dashboard")
     st.write("Interactive dashboard for analyzing greenhouse gas emissions across different sectors")
     
     # Load data
-    food_data, energy_data, geo_data, renewable_data = load_sample_data()
+    aggregates = load_aggregates()
+    first_year = int(min(frame.index.min() for frame in aggregates.values()))
+    last_year = int(max(frame.index.max() for frame in aggregates.values()))
     
     # Sidebar filters
     st.sidebar.title("Filters")
     years = st.sidebar.slider(
         "Select Year Range",
-        min_value=2015,
-        max_value=2022,
-        value=(2015, 2022)
+        min_value=first_year,
+        max_value=last_year,
+        value=(first_year, last_year)
     )
+    years = (int(years[0]), int(years[1]))
     
-    # Main content with tabs
-    tab1, tab2, tab3, tab4 = st.tabs([
-        "🍔 Food",
-        "⚡ Energy",
-        "🗺️ Geographic",
-        "♻️ Renewable"
-    ])
-    
-    with tab1:
-        st.header("Food Emissions")
-        col1, col2 = st.columns(2)
-        fig_bar, fig_treemap = create_food_charts(food_data)
-        col1.plotly_chart(fig_bar, use_container_width=True)
-        col2.plotly_chart(fig_treemap, use_container_width=True)
-    
-    with tab2:
-        st.header("Energy Emissions")
-        col1, col2 = st.columns(2)
-        fig_line, fig_area = create_energy_charts(energy_data)
-        col1.plotly_chart(fig_line, use_container_width=True)
-        col2.plotly_chart(fig_area, use_container_width=True)
-    
-    with tab3:
-        st.header("Geographic Distribution")
-        fig_geo = create_geo_chart(geo_data)
-        st.plotly_chart(fig_geo, use_container_width=True)
-    
-    with tab4:
-        st.header("Renewable Energy Progress")
-        fig_gauge = create_renewable_charts(renewable_data)
-        st.plotly_chart(fig_gauge, use_container_width=True)
+    # Main content: only the selected section is computed and rendered (unlike st.tabs, which runs every tab)
+    section = st.radio("Section", list(SECTIONS), horizontal=True, label_visibility="collapsed")
+    RENDERERS[SECTIONS[section]](years)
     
     # Download options
     st.sidebar.header("Download Data")
     if st.sidebar.button("Download Food Data"):
-        csv = food_data.to_csv(index=False)
         st.sidebar.download_button(
             label="Download CSV",
-            data=csv,
-            file_name="food_emissions.csv",
+            data=food_csv(years),
+            file_name=f"food_emissions_{years[0]}_{years[1]}.csv",
             mime="text/csv"
         )
 
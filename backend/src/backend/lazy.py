@@ -0,0 +1,114 @@
+"""`backend.lazy` module.
+
+Deferred construction of the agents, their models and tools, so that the backend
+starts (and its UI comes up) without importing the heavy libraries, reading API
+keys or reaching any database.
+
+- `lazy_attributes()` gives a module PEP 562 attributes, built on first access
+- `LazyAgent` stands in for an agent until something actually uses it
+- `warm_up()` builds what will be needed, in the background
+"""
+
+import logging
+import sys
+import threading
+import time
+from types import ModuleType
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Seconds spent building each lazy attribute, keyed by "<module>.<attribute>"
+build_times: Dict[str, float] = {}
+
+
+def lazy_attributes(module_name: str, factories: Dict[str, Callable[[ModuleType], Any]]) -> Callable[[str], Any]:
+    """Return a module `__getattr__` building the attributes of `factories` on first access.
+
+    A built attribute is stored in the module, so later accesses are plain lookups.
+    A failed build is not remembered: the next access tries again.
+
+    Args:
+        module_name (str): `__name__` of the module
+        factories (Dict[str, Callable]): Attribute name to a function building it from the module
+
+    Example:
+        `__getattr__ = lazy_attributes(__name__, {"llm": lambda module: module.build_llm()})`
+    """
+    lock = threading.RLock()
+
+    def __getattr__(name: str) -> Any:
+        factory = factories.get(name)
+        if factory is None:
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+        module = sys.modules[module_name]
+        with lock:
+            if name not in module.__dict__:
+                start = time.perf_counter()
+                value = factory(module)
+                build_times[f"{module_name}.{name}"] = round(time.perf_counter() - start, 6)
+                setattr(module, name, value)
+        return module.__dict__[name]
+
+    return __getattr__
+
+
+class LazyAgent:
+    """Proxy of an agent built by `loader` the first time one of its attributes is used."""
+
+    def __init__(self, loader: Callable[[], Any], name: Optional[str] = None):
+        """Initialize the proxy. Nothing is built here.
+
+        Args:
+            loader (Callable): Returns the agent
+            name (str, optional): Name reported before the agent is built
+        """
+        self._loader = loader
+        self._name = name
+        self._agent = None
+        self._lock = threading.Lock()
+
+    @property
+    def built(self) -> bool:
+        return self._agent is not None
+
+    def resolve(self) -> Any:
+        """Build the agent if needed and return it."""
+        if self._agent is None:
+            with self._lock:
+                if self._agent is None:
+                    self._agent = self._loader()
+        return self._agent
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "name" and self._agent is None and self._name is not None:
+            return self._name
+        return getattr(self.resolve(), name)
+
+    def __call__(self, *args, **kwargs) -> Any:
+        return self.resolve()(*args, **kwargs)
+
+    def __repr__(self) -> str:
+        return f"LazyAgent({self._name or '?'}, built={self.built})"
+
+
+def warm_up(*tasks: Callable[[], Any], name: str = "backend-warm-up") -> threading.Thread:
+    """Run `tasks` one after the other in a daemon thread. A failing task is logged and skipped.
+
+    Returns:
+        The started thread
+    """
+
+    def run() -> None:
+        for task in tasks:
+            start = time.perf_counter()
+            try:
+                task()
+            except Exception as e:
+                logger.warning("Warm-up task %s failed: %s: %s", getattr(task, "__name__", task), type(e).__name__, e)
+            else:
+                logger.info("Warm-up task %s done in %.3fs", getattr(task, "__name__", task), time.perf_counter() - start)
+
+    thread = threading.Thread(target=run, name=name, daemon=True)
+    thread.start()
+    return thread
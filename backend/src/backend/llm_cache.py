@@ -0,0 +1,252 @@
+"""`backend.llm_cache` module.
+
+On-disk cache of LLM completions, wrapping the agents' models.
+
+A completion is keyed on a hash of the model id, the messages, the stop sequences,
+the tools offered and the generation options (temperature...), and stored in a
+SQLite database whose size is capped by evicting the least recently used entries.
+The `LLM_CACHE_MODE` environment variable selects the behaviour:
+
+- `passthrough` (default): every call goes to the model, nothing is cached
+- `record`: cached completions are replayed, the others are requested and stored
+- `replay`: only cached completions are served, a miss raises `LLMCacheMiss`
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from smolagents import Tool
+from smolagents.models import ChatMessage, Model, get_tool_json_schema
+
+from backend.paths import cache_path
+from backend.tracing import payload_size, span
+
+CACHE_MODES = ("passthrough", "record", "replay")
+
+
+class LLMCacheMiss(LookupError):
+    """Raised in replay mode when a completion was never recorded."""
+
+
+class LLMCacheStore:
+    """SQLite store of serialized completions, capped at `max_bytes` with LRU eviction."""
+
+    def __init__(self, path: Path, max_bytes: int = 256 * 1024 * 1024):
+        """Initialize the store, creating its table if needed.
+
+        Args:
+            path (Path): SQLite database file
+            max_bytes (int): Maximum total size of the stored (compressed) completions
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS completions (
+                key TEXT PRIMARY KEY,
+                model_id TEXT NOT NULL,
+                response BLOB NOT NULL,
+                input_tokens INTEGER,
+                output_tokens INTEGER,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS completions_last_used ON completions (last_used_at)")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored completion for `key` (as a dict with `message` and token counts), or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, input_tokens, output_tokens FROM completions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE completions SET last_used_at = ? WHERE key = ?", (time.time(), key))
+        return {
+            "message": json.loads(zlib.decompress(row[0])),
+            "input_tokens": row[1],
+            "output_tokens": row[2],
+        }
+
+    def put(self, key: str, model_id: str, message: Dict[str, Any], input_tokens: int, output_tokens: int) -> None:
+        """Store a completion, then evict the least recently used ones beyond `max_bytes`."""
+        response = zlib.compress(json.dumps(message).encode())
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, model_id, response, input_tokens, output_tokens, len(response), now, now),
+            )
+            total = self._conn.execute("SELECT coalesce(sum(size), 0) FROM completions").fetchone()[0]
+            if total > self.max_bytes:
+                # Evict down to 90% of the cap so that eviction does not run on every insert
+                excess = total - int(self.max_bytes * 0.9)
+                stale, freed = [], 0
+                for stale_key, size in self._conn.execute(
+                    "SELECT key, size FROM completions ORDER BY last_used_at"
+                ):
+                    if freed >= excess:
+                        break
+                    stale.append((stale_key,))
+                    freed += size
+                self._conn.executemany("DELETE FROM completions WHERE key = ?", stale)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, size = self._conn.execute("SELECT count(*), coalesce(sum(size), 0) FROM completions").fetchone()
+        return {"entries": entries, "bytes": size, "max_bytes": self.max_bytes, "path": str(self.path)}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM completions")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def cache_key(
+    model_id: str,
+    messages: List[Dict[str, Any]],
+    stop_sequences: Optional[List[str]] = None,
+    grammar: Optional[str] = None,
+    tools_to_call_from: Optional[List[Tool]] = None,
+    options: Optional[Dict[str, Any]] = None,
+) -> str:
+    """Hash everything that determines a completion."""
+    payload = {
+        "model_id": model_id,
+        "messages": messages,
+        "stop_sequences": stop_sequences,
+        "grammar": grammar,
+        "tools": [get_tool_json_schema(tool) for tool in tools_to_call_from or []],
+        # Credentials do not change the completion and must not end up in the key
+        "options": {name: value for name, value in (options or {}).items() if name not in ("api_key", "api_base")},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+_store: Optional[LLMCacheStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> LLMCacheStore:
+    """Return the process-wide store, at `LLM_CACHE_PATH` (default: in the backend cache directory)."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            path = os.environ.get("LLM_CACHE_PATH")
+            _store = LLMCacheStore(
+                Path(path) if path else cache_path("llm_cache.sqlite3"),
+                max_bytes=int(os.environ.get("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+            )
+        return _store
+
+
+class CachingModel(Model):
+    """Wraps a smolagents model, serving repeated completions from the on-disk cache."""
+
+    def __init__(self, model: Model, mode: Optional[str] = None, store: Optional[LLMCacheStore] = None):
+        """Wrap `model`.
+
+        Args:
+            model (Model): The model answering cache misses
+            mode (str, optional): "passthrough", "record" or "replay". Defaults to `LLM_CACHE_MODE`.
+            store (LLMCacheStore, optional): Defaults to the process-wide store
+        """
+        super().__init__()
+        self.model = model
+        self.mode = mode or os.environ.get("LLM_CACHE_MODE", "passthrough")
+        if self.mode not in CACHE_MODES:
+            raise ValueError(f"Unsupported LLM cache mode: {self.mode}. Use one of {', '.join(CACHE_MODES)}")
+        self.store = store
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def model_id(self) -> Optional[str]:
+        return getattr(self.model, "model_id", None)
+
+    def __call__(
+        self,
+        messages: List[Dict[str, str]],
+        stop_sequences: Optional[List[str]] = None,
+        grammar: Optional[str] = None,
+        tools_to_call_from: Optional[List[Tool]] = None,
+        **kwargs,
+    ) -> ChatMessage:
+        with span(self.model_id or type(self.model).__name__, "llm", cache_mode=self.mode) as current:
+            hits = self.hits
+            message = self._complete(messages, stop_sequences, grammar, tools_to_call_from, **kwargs)
+            if current is not None:
+                current.set(
+                    messages=len(messages),
+                    prompt_bytes=payload_size(messages),
+                    completion_bytes=len(message.content or ""),
+                    input_tokens=self.last_input_token_count,
+                    output_tokens=self.last_output_token_count,
+                    cache_hit=self.mode != "passthrough" and self.hits > hits,
+                )
+            return message
+
+    def _complete(
+        self,
+        messages: List[Dict[str, str]],
+        stop_sequences: Optional[List[str]] = None,
+        grammar: Optional[str] = None,
+        tools_to_call_from: Optional[List[Tool]] = None,
+        **kwargs,
+    ) -> ChatMessage:
+        if self.mode == "passthrough":
+            message = self.model(messages, stop_sequences, grammar, tools_to_call_from, **kwargs)
+            self.last_input_token_count = self.model.last_input_token_count
+            self.last_output_token_count = self.model.last_output_token_count
+            return message
+
+        store = self.store or get_store()
+        key = cache_key(
+            self.model_id or type(self.model).__name__,
+            messages,
+            stop_sequences,
+            grammar,
+            tools_to_call_from,
+            {**self.model.kwargs, **kwargs},
+        )
+        cached = store.get(key)
+        if cached is not None:
+            self.hits += 1
+            self.last_input_token_count = cached["input_tokens"]
+            self.last_output_token_count = cached["output_tokens"]
+            return ChatMessage.from_dict(cached["message"])
+
+        self.misses += 1
+        if self.mode == "replay":
+            raise LLMCacheMiss(f"No recorded completion for this prompt (model {self.model_id}, key {key[:12]})")
+
+        message = self.model(messages, stop_sequences, grammar, tools_to_call_from, **kwargs)
+        self.last_input_token_count = self.model.last_input_token_count
+        self.last_output_token_count = self.model.last_output_token_count
+        store.put(
+            key,
+            self.model_id or "",
+            json.loads(message.model_dump_json()),
+            self.last_input_token_count,
+            self.last_output_token_count,
+        )
+        return message
+
+    def to_dict(self) -> Dict:
+        return self.model.to_dict()
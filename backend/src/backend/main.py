@@ -1,18 +1,83 @@
 """`backend.main` module.
 
 Entry point for the backend.
+
+The orchestrator and its sub-agents are only built once the UI is up (or on the first
+message, if that comes first), so the UI shows up without waiting for the models, the
+tools' libraries or the databases. The time to the first UI is logged and checked
+against `STARTUP_BUDGET` seconds.
 """
 
+import time
+
+# Reference point of the time to the first UI, taken before the heavy imports
+STARTED_AT: float = time.perf_counter()
+
+import logging
+import os
+import urllib.request
+from importlib import import_module
+from typing import Optional
+
 from smolagents import GradioUI
-from backend.agents.orchestrator import orchestrator
-from backend.setup import setup
+from backend.lazy import LazyAgent, warm_up
+from backend.setup import setup, teardown, warm_connections, warm_dashboards, warm_python_workers
+
+logger = logging.getLogger(__name__)
+
+STARTUP_BUDGET: float = float(os.environ.get("STARTUP_BUDGET", "10"))
+
+
+def load_orchestrator():
+    """Build (on first call) and return the orchestrator, with its sub-agents."""
+    return import_module("backend.agents.orchestrator").orchestrator
+
+
+orchestrator = LazyAgent(load_orchestrator, name="orchestrator")
+
+
+def wait_for_ui(timeout: float = 120.0) -> Optional[float]:
+    """Wait until the Gradio server answers.
+
+    Returns:
+        Seconds from `STARTED_AT` to the first answer, or None if the server did not answer in time
+    """
+    url = "http://{}:{}/".format(
+        os.environ.get("GRADIO_SERVER_NAME", "127.0.0.1").replace("0.0.0.0", "127.0.0.1"),
+        os.environ.get("GRADIO_SERVER_PORT", "7860"),
+    )
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1):
+                return time.perf_counter() - STARTED_AT
+        except OSError:
+            time.sleep(0.05)
+    return None
+
+
+def report_time_to_ui() -> None:
+    """Log the time to the first UI, warning when it exceeds `STARTUP_BUDGET`."""
+    elapsed = wait_for_ui()
+    if elapsed is None:
+        logger.warning("The UI did not come up, warming up anyway")
+    elif elapsed > STARTUP_BUDGET:
+        logger.warning("UI up after %.2fs, over the %.2fs startup budget", elapsed, STARTUP_BUDGET)
+    else:
+        logger.info("UI up after %.2fs", elapsed)
+
 
 def main()->None:
     """Entry point for the backend."""
     print("Hello, world!")
     setup()
     ui = GradioUI(orchestrator)
-    ui.launch()
+    # Runs next to the Gradio server: waits for the UI, then builds the agents, connects and starts Streamlit and Python workers
+    warm_up(report_time_to_ui, orchestrator.resolve, warm_connections, warm_dashboards, warm_python_workers)
+    try:
+        ui.launch()
+    finally:
+        teardown()
 
 
 
@@ -0,0 +1,18 @@
+"""`backend.paths` module.
+
+Locations of the on-disk caches used by the backend.
+"""
+
+import os
+from pathlib import Path
+
+CACHE_DIR: Path = Path(
+    os.environ.get("BACKEND_CACHE_DIR", Path.home() / ".cache" / "the_data_analyst")
+).expanduser()
+
+
+def cache_path(*parts: str) -> Path:
+    """Return a path inside the cache directory, creating its parent directories."""
+    path = CACHE_DIR.joinpath(*parts)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
@@ -5,3 +5,39 @@ from dotenv import load_dotenv
 def setup()->None:
     """Setup the backend."""
     load_dotenv()
+
+
+def warm_connections()->None:
+    """Open the database connections now rather than on the agents' first queries."""
+    import os
+
+    from backend.tools import mongo_clients, postgres_pool
+
+    postgres_pool.get_pool().warm()
+    mongo_clients.warm(os.environ.get("MONGODB_URI", "mongodb://localhost:27017"))
+
+
+def warm_dashboards()->None:
+    """Start the idle Streamlit workers the first dashboard will be served from."""
+    from backend.tools import streamlit_manager
+
+    streamlit_manager.get_manager().warm()
+
+
+def warm_python_workers()->None:
+    """Start the Python workers the agents' code steps run in (with `PYTHON_EXECUTOR=workers` only)."""
+    from backend.tools import python_workers
+
+    python_workers.warm()
+
+
+def teardown()->None:
+    """Release the process-wide database and HTTP connections, and stop the Streamlit and Python workers."""
+    from backend.tools import http_client, mongo_clients, postgres_pool, python_workers, streamlit_manager, web_cache
+
+    mongo_clients.close_all()
+    postgres_pool.close_all()
+    http_client.close_session()
+    web_cache.close_cache()
+    streamlit_manager.close_all()
+    python_workers.close_pool()
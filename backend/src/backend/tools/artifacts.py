@@ -0,0 +1,192 @@
+"""`backend.tools.artifacts` module.
+
+Content-addressed store of query result sets, the channel from the query tools to the
+generated dashboards.
+
+A result set is written once as an uncompressed Arrow IPC (Feather v2) file named
+after the SHA-256 of its bytes, so it can be memory-mapped without any copy or
+decoding, and identical results share one file. Each artifact name keeps a history
+of versions, a new version being recorded only when the content changes; dashboards
+refer to `name` (latest version), `name@<version>` or a hash.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from backend.paths import cache_path
+from backend.tools.columnar import records_to_columnar, to_dataframe
+
+# Row cap of a result set saved as an artifact, instead of the tools' usual caps
+ARTIFACT_MAX_ROWS: int = int(os.environ.get("ARTIFACT_MAX_ROWS", "1000000"))
+# Rows returned to the agent, as a preview, when a result set is saved as an artifact
+ARTIFACT_PREVIEW_ROWS: int = int(os.environ.get("ARTIFACT_PREVIEW_ROWS", "10"))
+
+_NAME = re.compile(r"^[A-Za-z0-9_.-]{1,128}$")
+_HASH = re.compile(r"^[0-9a-f]{64}$")
+
+
+def _to_table(frame):
+    """Convert a DataFrame to an Arrow table, serializing the columns Arrow cannot type (nested or mixed values)."""
+    import pyarrow as pa
+
+    try:
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        frame = frame.copy()
+        for column in frame.columns:
+            if frame[column].dtype == object:
+                frame[column] = frame[column].map(
+                    lambda value: value if value is None or isinstance(value, str)
+                    else json.dumps(value, default=str) if isinstance(value, (dict, list))
+                    else str(value)
+                )
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+    # Without the pandas metadata, the bytes (and so the hash) depend on the data only
+    return table.replace_schema_metadata(None)
+
+
+class ArtifactStore:
+    """Directory of content-addressed Arrow files, plus a version history per artifact name."""
+
+    def __init__(self, directory: Optional[Path] = None):
+        """Initialize the store.
+
+        Args:
+            directory (Path, optional): Defaults to `ARTIFACTS_DIR`, else the backend cache directory
+        """
+        if directory is None:
+            directory = Path(os.environ["ARTIFACTS_DIR"]) if os.environ.get("ARTIFACTS_DIR") else cache_path("artifacts")
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def path(self, digest: str) -> Path:
+        return self.directory / "objects" / f"{digest}.arrow"
+
+    def _manifest_path(self, name: str) -> Path:
+        return self.directory / "names" / f"{name}.json"
+
+    def versions(self, name: str) -> List[Dict[str, Any]]:
+        """Version history of `name`, oldest first (empty if unknown)."""
+        try:
+            with open(self._manifest_path(name)) as f:
+                return json.load(f)["versions"]
+        except FileNotFoundError:
+            return []
+
+    def save(self, name: str, data: Union[Dict[str, Any], List[Dict[str, Any]], Any], source: str = "") -> Dict[str, Any]:
+        """Store a result set under `name`.
+
+        Args:
+            name (str): Artifact name (letters, digits, `_`, `.`, `-`)
+            data: Columnar result, list of records or pandas DataFrame
+            source (str): Where the data comes from (e.g. the query), kept in the history
+
+        Returns:
+            Dict containing the artifact's `name`, `version`, `hash`, `path`, `rows` and `columns`
+        """
+        import pyarrow as pa
+        from pyarrow import feather
+
+        if not _NAME.match(name):
+            raise ValueError(f"Invalid artifact name: {name}. Use letters, digits, '_', '.' or '-'")
+        if isinstance(data, list):
+            data = records_to_columnar(data)
+        frame = to_dataframe(data) if isinstance(data, dict) else data
+        table = _to_table(frame)
+
+        sink = pa.BufferOutputStream()
+        # Uncompressed, so that readers can memory-map the columns as they are
+        feather.write_feather(table, sink, compression="uncompressed")
+        buffer = sink.getvalue()
+        digest = hashlib.sha256(memoryview(buffer)).hexdigest()
+
+        with self._lock:
+            path = self.path(digest)
+            if not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_suffix(f".{os.getpid()}.tmp")
+                with open(tmp, "wb") as f:
+                    f.write(memoryview(buffer))
+                os.replace(tmp, path)
+
+            versions = self.versions(name)
+            if versions and versions[-1]["hash"] == digest:
+                entry = versions[-1]
+            else:
+                entry = {
+                    "version": len(versions) + 1,
+                    "hash": digest,
+                    "rows": table.num_rows,
+                    "columns": table.column_names,
+                    "source": source,
+                    "created_at": time.time(),
+                }
+                manifest = self._manifest_path(name)
+                manifest.parent.mkdir(parents=True, exist_ok=True)
+                tmp = manifest.with_suffix(f".{os.getpid()}.tmp")
+                with open(tmp, "w") as f:
+                    json.dump({"name": name, "versions": [*versions, entry]}, f)
+                os.replace(tmp, manifest)
+
+        return {
+            "name": name,
+            "version": entry["version"],
+            "hash": digest,
+            "path": str(path),
+            "rows": entry["rows"],
+            "columns": entry["columns"],
+        }
+
+    def resolve(self, ref: str) -> str:
+        """Hash of the artifact `ref`: a name (latest version), `name@<version>` or a hash.
+
+        Raises:
+            ValueError: If no such artifact exists
+        """
+        if _HASH.match(ref) and self.path(ref).exists():
+            return ref
+        name, _, version = ref.partition("@")
+        versions = self.versions(name) if _NAME.match(name) else []
+        if version:
+            versions = [entry for entry in versions if str(entry["version"]) == version]
+        if not versions:
+            raise ValueError(f"Unknown artifact: {ref}")
+        return versions[-1]["hash"]
+
+    def read_table(self, ref: str):
+        """Memory-map the artifact `ref` as an Arrow table (no copy)."""
+        from pyarrow import feather
+
+        return feather.read_table(str(self.path(self.resolve(ref))), memory_map=True)
+
+
+artifact_store = ArtifactStore()
+
+
+def attach_artifact(result: Dict[str, Any], name: str, source: str = "") -> Dict[str, Any]:
+    """Save the `data` of a successful tool result as the artifact `name`.
+
+    The result's `data` is replaced by a preview of its first `ARTIFACT_PREVIEW_ROWS`
+    records and an `artifact` entry describing what was saved is added. If saving
+    fails, the result is turned into a failure carrying the error.
+    """
+    result = dict(result)
+    if not result.get("success") or result.get("data") is None:
+        return result
+    frame = result["data"]
+    if isinstance(frame, list):
+        frame = records_to_columnar(frame)
+    frame = to_dataframe(frame) if isinstance(frame, dict) else frame
+    try:
+        result["artifact"] = artifact_store.save(name, frame, source=source)
+    except (ValueError, TypeError, OSError) as e:
+        return {**result, "success": False, "data": None, "error": f"Could not save artifact {name}: {str(e)}"}
+    preview = frame.head(ARTIFACT_PREVIEW_ROWS)
+    result["data"] = json.loads(preview.to_json(orient="records", date_format="iso"))
+    return result
@@ -0,0 +1,150 @@
+"""`backend.tools.columnar` module.
+
+Columnar result format shared by the database tools: column names appear once,
+each column is a typed NumPy array, and the dtypes are reported alongside.
+"""
+
+import datetime
+import decimal
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+RESULT_FORMATS = ("records", "columnar")
+
+
+def _object_array(values: Sequence[Any]) -> np.ndarray:
+    """Build a 1-d object array, even when the values are themselves sequences."""
+    return np.fromiter(values, dtype=object, count=len(values))
+
+
+def _naive_utc(value: datetime.datetime) -> datetime.datetime:
+    if value.tzinfo is not None:
+        return value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def to_array(values: Sequence[Any]) -> Tuple[np.ndarray, str]:
+    """Convert the values of one column to a typed NumPy array.
+
+    Missing values (`None`) become NaN for numeric columns and NaT for dates.
+    Integer columns with missing values are widened to float64, like pandas does.
+
+    Args:
+        values (Sequence[Any]): The column values, in row order
+
+    Returns:
+        Tuple of the array and its dtype label (the NumPy dtype, or "string" for text columns)
+    """
+    present = [value for value in values if value is not None]
+    has_missing = len(present) != len(values)
+    if not present:
+        return _object_array(values), "object"
+
+    if all(isinstance(value, bool) for value in present):
+        if has_missing:
+            return _object_array(values), "object"
+        return np.array(values, dtype=bool), "bool"
+
+    if all(isinstance(value, int) and not isinstance(value, bool) for value in present):
+        try:
+            if not has_missing:
+                return np.array(values, dtype=np.int64), "int64"
+            return np.array([np.nan if value is None else value for value in values], dtype=np.float64), "float64"
+        except OverflowError:
+            return _object_array(values), "object"
+
+    if all(isinstance(value, (int, float, decimal.Decimal)) and not isinstance(value, bool) for value in present):
+        return np.array([np.nan if value is None else float(value) for value in values], dtype=np.float64), "float64"
+
+    if all(isinstance(value, datetime.datetime) for value in present):
+        array = np.array(
+            [np.datetime64("NaT") if value is None else np.datetime64(_naive_utc(value), "us") for value in values],
+            dtype="datetime64[us]",
+        )
+        return array, "datetime64[us]"
+
+    if all(isinstance(value, datetime.date) and not isinstance(value, datetime.datetime) for value in present):
+        array = np.array(
+            [np.datetime64("NaT") if value is None else np.datetime64(value, "D") for value in values],
+            dtype="datetime64[D]",
+        )
+        return array, "datetime64[D]"
+
+    if all(isinstance(value, str) for value in present):
+        return _object_array(values), "string"
+
+    return _object_array(values), "object"
+
+
+def columns_to_columnar(columns: List[str], column_values: List[Sequence[Any]]) -> Dict[str, Any]:
+    """Build a columnar result from column names and per-column value lists.
+
+    Args:
+        columns (List[str]): Column names, in order
+        column_values (List[Sequence[Any]]): One sequence of values per column
+
+    Returns:
+        Dict containing:
+            - columns (List[str]): Column names, in order
+            - arrays (Dict[str, np.ndarray]): One typed array per column
+            - dtypes (Dict[str, str]): The dtype label of each column
+            - num_rows (int): Number of rows
+    """
+    arrays = {}
+    dtypes = {}
+    for column, values in zip(columns, column_values):
+        arrays[column], dtypes[column] = to_array(values)
+    return {
+        "columns": list(columns),
+        "arrays": arrays,
+        "dtypes": dtypes,
+        "num_rows": len(column_values[0]) if column_values else 0,
+    }
+
+
+def records_to_columnar(records: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build a columnar result from row dicts that may not all share the same keys.
+
+    Columns are the union of the keys, in first-seen order; absent keys are missing values.
+    The records are consumed once, so a database cursor can be passed directly.
+    """
+    column_values: Dict[str, List[Any]] = {}
+    num_rows = 0
+    for record in records:
+        for key in record:
+            if key not in column_values:
+                column_values[key] = [None] * num_rows
+        for key, values in column_values.items():
+            values.append(record.get(key))
+        num_rows += 1
+
+    result = columns_to_columnar(list(column_values), list(column_values.values()))
+    result["num_rows"] = num_rows
+    return result
+
+
+def to_dataframe(columnar: Dict[str, Any]):
+    """Wrap a columnar result in a pandas DataFrame."""
+    import pandas as pd
+
+    return pd.DataFrame({column: columnar["arrays"][column] for column in columnar["columns"]}, copy=False)
+
+
+def frame_to_columnar(frame) -> Dict[str, Any]:
+    """Build a columnar result from a pandas DataFrame, reusing its numeric and datetime arrays."""
+    from pandas.api import types
+
+    result = {"columns": [], "arrays": {}, "dtypes": {}, "num_rows": len(frame)}
+    for column in frame.columns:
+        series = frame[column]
+        name = str(column)
+        if types.is_numeric_dtype(series) or types.is_bool_dtype(series) or types.is_datetime64_any_dtype(series):
+            array = series.to_numpy()
+            dtype = str(array.dtype)
+        else:
+            array, dtype = to_array(series.astype(object).where(series.notna(), None).tolist())
+        result["columns"].append(name)
+        result["arrays"][name] = array
+        result["dtypes"][name] = dtype
+    return result
@@ -1,12 +1,14 @@
 """`backend.tools.google_search` module."""
 
 import os
-import json
-from typing import Dict, Any
+from typing import Dict, Any, List
 
-import requests
 from smolagents import Tool
 
+from backend.lazy import lazy_attributes
+from backend.tools.http_client import BATCH_CONCURRENCY, map_concurrently, post, response_text
+from backend.tools.web_cache import cached, normalize_query
+
 class GoogleSearch(Tool):
     name = "google_search"
     description = "Searches Google for a given query."
@@ -20,19 +22,70 @@ class GoogleSearch(Tool):
 
     def __init__(self):
         super().__init__()
-        self.url = "https://google.serper.dev/search"
+        # Overridable to point the tool at a local stand-in of the API
+        self.url = os.environ.get("SERPER_SEARCH_URL", "https://google.serper.dev/search")
         self.headers = {
             'X-API-KEY': os.environ["SERPER_API"],
             'Content-Type': 'application/json'
         }
 
     def forward(self, query: str) -> Dict[str, Any]:
-        """Executes the Google search."""
+        """Executes the Google search, or returns the cached results of the same query.
+
+        Raises:
+            requests.HTTPError: If the API answers with an error status
+        """
         payload = {
             "q": query,
             "num": 10,
         }
 
-        response = requests.request("POST", self.url, headers=self.headers, data=json.dumps(payload))
-        return response.text  
-google_search = GoogleSearch()
+        def fetch():
+            response = post(self.url, headers=self.headers, json=payload)
+            return response_text(response), True
+
+        return cached(self.name, normalize_query(query), fetch)
+
+
+class GoogleBatchSearch(Tool):
+    name = "google_search_batch"
+    description = (
+        "Searches Google for several queries at once, running the searches concurrently. "
+        "Prefer it to successive google_search calls."
+    )
+    inputs = {
+        "queries": {
+            "type": "array",
+            "description": "The search queries"
+        },
+    }
+    output_type = "array"
+
+    def __init__(self, search: Tool = None, max_workers: int = BATCH_CONCURRENCY):
+        """Initialize the tool.
+
+        Args:
+            search (Tool, optional): Tool running a single search. Defaults to a new `GoogleSearch`.
+            max_workers (int): Maximum number of searches running at once
+        """
+        super().__init__()
+        self.search = search or GoogleSearch()
+        self.max_workers = max_workers
+
+    def forward(self, queries: List[str]) -> List[Dict[str, Any]]:
+        """
+        Executes the Google searches concurrently. A failing search does not affect the others.
+
+        Returns:
+            One dict per query, in order, containing:
+                - query (str): The search query
+                - success (bool): Whether the search succeeded
+                - data (str): The search results
+                - error (str): Error message if the search failed
+        """
+        results = map_concurrently(lambda query: self.search(query=query), queries, self.max_workers)
+        return [{"query": query, **result} for query, result in zip(queries, results)]
+
+
+# Built on first access, so that importing this module reads no API key
+__getattr__ = lazy_attributes(__name__, {"google_search": lambda module: GoogleSearch()})
@@ -0,0 +1,120 @@
+"""`backend.tools.http_client` module.
+
+Process-wide HTTP session of the web tools: keep-alive connections pooled per host,
+default timeouts and bounded retries with exponential backoff on connection errors,
+rate limiting (429) and transient server errors. Also runs batches of calls concurrently.
+"""
+
+import contextvars
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT: Tuple[float, float] = (
+    float(os.environ.get("HTTP_CONNECT_TIMEOUT", "5")),
+    float(os.environ.get("HTTP_READ_TIMEOUT", "30")),
+)
+MAX_RETRIES: int = int(os.environ.get("HTTP_MAX_RETRIES", "3"))
+BACKOFF_FACTOR: float = float(os.environ.get("HTTP_BACKOFF_FACTOR", "0.5"))
+POOL_SIZE: int = int(os.environ.get("HTTP_POOL_SIZE", "16"))
+BATCH_CONCURRENCY: int = int(os.environ.get("HTTP_BATCH_CONCURRENCY", "8"))
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def build_session(pool_size: int = POOL_SIZE, max_retries: int = MAX_RETRIES, backoff_factor: float = BACKOFF_FACTOR) -> requests.Session:
+    """Build a session with pooled connections and retries.
+
+    Args:
+        pool_size (int): Connections kept alive per host, and the concurrency allowed per host
+        max_retries (int): Retries of a failed request
+        backoff_factor (float): Sleeps between retries are backoff_factor * 2 ** (retry - 1) seconds
+    """
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUSES,
+        # The Serper and Jina APIs are POST only; their calls are read-only, so retrying them is safe
+        allowed_methods=None,
+        respect_retry_after_header=True,
+        # Give the final error response to the caller rather than raising
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry, pool_block=True)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide session, creating it on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = build_session()
+        return _session
+
+
+def post(url: str, timeout: Optional[Tuple[float, float]] = None, **kwargs) -> requests.Response:
+    """POST through the shared session, with `DEFAULT_TIMEOUT` unless a timeout is given."""
+    return get_session().post(url, timeout=timeout or DEFAULT_TIMEOUT, **kwargs)
+
+
+def response_text(response: requests.Response) -> str:
+    """Return the body of a successful response.
+
+    Raises:
+        requests.HTTPError: If the response (the last one, after the retries) has an error status
+    """
+    if not response.ok:
+        raise requests.HTTPError(f"{response.status_code} {response.reason}: {response.text[:500]}", response=response)
+    return response.text
+
+
+def close_session() -> None:
+    """Close the pooled connections of the shared session."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def map_concurrently(
+    function: Callable[[Any], Any],
+    items: Sequence[Any],
+    max_workers: int = BATCH_CONCURRENCY,
+) -> List[Dict[str, Any]]:
+    """Call `function` on every item concurrently. A failing call does not affect the others.
+
+    Returns:
+        One dict per item, in order, containing:
+            - success (bool): Whether the call returned
+            - data (Any): What the call returned
+            - error (str): Error message if the call failed
+    """
+    def call(item: Any) -> Dict[str, Any]:
+        try:
+            return {"success": True, "data": function(item), "error": None}
+        except Exception as e:
+            return {"success": False, "data": None, "error": f"{type(e).__name__}: {str(e)}"}
+
+    if len(items) <= 1:
+        return [call(item) for item in items]
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(items)))) as executor:
+        # Each call runs in a copy of the caller's context, so that tracing spans nest under it
+        futures = [executor.submit(contextvars.copy_context().run, call, item) for item in items]
+        return [future.result() for future in futures]
@@ -1,9 +1,11 @@
 """`backend.tools.jina_rerank` module."""
 
 import os
-import requests
 from smolagents import Tool
 
+from backend.lazy import lazy_attributes
+from backend.tools.http_client import post
+
 class JinaRerank(Tool):
     name = "jina_rerank"
     description = "Reranks documents or links using Jina AI's reranking model."
@@ -16,27 +18,35 @@ class JinaRerank(Tool):
             "type": "array",
             "description": "List of documents or links to rerank."
         },
+        "top_n": {
+            "type": "integer",
+            "description": "Number of documents to return. Defaults to 3.",
+            "nullable": True
+        },
     }
     output_type = "string"
 
     def __init__(self):
         super().__init__()
-        self.url = "https://api.jina.ai/v1/rerank"
+        # Overridable to point the tool at a local stand-in of the API
+        self.url = os.environ.get("JINA_RERANK_URL", "https://api.jina.ai/v1/rerank")
         self.headers = {
             'Content-Type': 'application/json',
             'Authorization': f'Bearer {os.environ["JINA_API_KEY"]}'
         }
 
-    def forward(self, query: str, documents: list) -> str:
+    def forward(self, query: str, documents: list, top_n: int = None) -> str:
         """Executes the Jina AI reranking."""
         payload = {
             "model": "jina-reranker-v2-base-multilingual",
             "query": query,
-            "top_n": 3,
+            "top_n": top_n or 3,
             "documents": documents
         }
 
-        response = requests.post(self.url, headers=self.headers, json=payload)
+        response = post(self.url, headers=self.headers, json=payload)
         return response.json()
-    
-jina_rerank = JinaRerank()
\ No newline at end of file
+
+
+# Built on first access, so that importing this module reads no API key
+__getattr__ = lazy_attributes(__name__, {"jina_rerank": lambda module: JinaRerank()})
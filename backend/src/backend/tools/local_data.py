@@ -0,0 +1,401 @@
+"""`backend.tools.local_data` module.
+
+Local, columnar cache of the CSV files under `databases/consulting_database`,
+and a tool answering filter / group-by / aggregate requests over them.
+
+Each CSV is parsed once into an uncompressed Feather file that is memory-mapped
+on load. A cached file is reused while the CSV's mtime and size are unchanged,
+or while its SHA-256 still matches when only the mtime moved.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import pandas as pd
+from pyarrow import feather
+from smolagents import Tool
+
+from backend.paths import cache_path
+from backend.tools.artifacts import ARTIFACT_MAX_ROWS, attach_artifact
+from backend.tools.columnar import RESULT_FORMATS, frame_to_columnar
+
+DATA_DIR: Path = Path(
+    os.environ.get("CONSULTING_DATABASE_DIR", Path(__file__).resolve().parents[4] / "databases" / "consulting_database")
+)
+DEFAULT_MAX_ROWS: int = int(os.environ.get("LOCAL_DATA_MAX_ROWS", "200"))
+
+# Comparison operators accepted in filters, with or without a leading "$"
+_OPERATORS = {
+    "eq": lambda column, value: column == value,
+    "ne": lambda column, value: column != value,
+    "gt": lambda column, value: column > value,
+    "gte": lambda column, value: column >= value,
+    "lt": lambda column, value: column < value,
+    "lte": lambda column, value: column <= value,
+    "in": lambda column, value: column.isin(value),
+    "nin": lambda column, value: ~column.isin(value),
+    "between": lambda column, value: column.between(value[0], value[1]),
+    "contains": lambda column, value: column.astype(str).str.contains(str(value), case=False, regex=False),
+}
+
+# Aggregation functions accepted in aggregations
+_AGGREGATIONS = ("mean", "sum", "count", "min", "max", "median", "std", "nunique")
+
+# Date parts usable in group_by as "<column>:<part>"
+_DATE_PARTS = {
+    "year": lambda column: column.dt.year,
+    "quarter": lambda column: column.dt.to_period("Q").astype(str),
+    "month": lambda column: column.dt.to_period("M").astype(str),
+    "day": lambda column: column.dt.date.astype(str),
+}
+
+
+def file_sha256(path: Path) -> str:
+    """Hash a file's content."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def list_datasets() -> List[str]:
+    """Return the dataset names: CSV paths relative to DATA_DIR, without the extension."""
+    return sorted(path.relative_to(DATA_DIR).with_suffix("").as_posix() for path in DATA_DIR.rglob("*.csv"))
+
+
+def read_csv(path: Path) -> pd.DataFrame:
+    """Parse one of the consulting CSVs, dropping the empty trailing columns of the World Bank exports."""
+    frame = pd.read_csv(path, encoding="utf-8-sig")
+    empty = [column for column in frame.columns if column.startswith("Unnamed:") and frame[column].isna().all()]
+    frame = frame.drop(columns=empty)
+    for column in frame.columns:
+        if column.lower() == "date" or column.lower().endswith("_date"):
+            frame[column] = pd.to_datetime(frame[column], errors="coerce")
+    return frame
+
+
+class LocalDataStore:
+    """Loads datasets from their columnar cache, converting the CSV only when it changed."""
+
+    def __init__(self, data_dir: Path = DATA_DIR):
+        self.data_dir = data_dir
+        self._frames: Dict[str, Tuple[Tuple[int, int], pd.DataFrame]] = {}
+        self._lock = threading.Lock()
+
+    def path(self, dataset: str) -> Path:
+        path = (self.data_dir / f"{dataset}.csv").resolve()
+        if self.data_dir.resolve() not in path.parents or not path.is_file():
+            raise ValueError(f"Unknown dataset: {dataset}")
+        return path
+
+    def _cache_files(self, dataset: str) -> Tuple[Path, Path]:
+        key = hashlib.sha256(str(self.path(dataset)).encode()).hexdigest()[:16]
+        return cache_path("local_data", f"{key}.feather"), cache_path("local_data", f"{key}.json")
+
+    def load(self, dataset: str) -> pd.DataFrame:
+        """Return the dataset as a DataFrame, from memory, the Feather cache or the CSV, in that order."""
+        path = self.path(dataset)
+        stat = path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            cached = self._frames.get(dataset)
+            if cached is not None and cached[0] == signature:
+                return cached[1]
+
+            feather_path, manifest_path = self._cache_files(dataset)
+            manifest = self._read_manifest(manifest_path)
+            frame = None
+            if manifest is not None and feather_path.exists():
+                if (manifest["mtime_ns"], manifest["size"]) == signature:
+                    frame = self._read_feather(feather_path)
+                elif manifest["size"] == stat.st_size and manifest["sha256"] == file_sha256(path):
+                    # Touched but unchanged: keep the converted file, remember the new mtime
+                    frame = self._read_feather(feather_path)
+                    self._write_manifest(manifest_path, dict(manifest, mtime_ns=stat.st_mtime_ns))
+
+            if frame is None:
+                frame = read_csv(path)
+                tmp_path = feather_path.with_suffix(f".{os.getpid()}.tmp")
+                feather.write_feather(frame, tmp_path, compression="uncompressed")
+                os.replace(tmp_path, feather_path)
+                self._write_manifest(manifest_path, {
+                    "source": str(path),
+                    "mtime_ns": stat.st_mtime_ns,
+                    "size": stat.st_size,
+                    "sha256": file_sha256(path),
+                })
+                frame = self._read_feather(feather_path)
+
+            self._frames[dataset] = (signature, frame)
+            return frame
+
+    @staticmethod
+    def _read_feather(path: Path) -> pd.DataFrame:
+        # Uncompressed + memory-mapped: numeric columns are read straight from the page cache
+        return feather.read_table(path, memory_map=True).to_pandas(split_blocks=True)
+
+    @staticmethod
+    def _read_manifest(path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write_manifest(path: Path, manifest: Dict[str, Any]) -> None:
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, path)
+
+
+def _mask(frame: pd.DataFrame, filters: Dict[str, Any]) -> pd.Series:
+    """Combine the filters into one boolean mask."""
+    mask = pd.Series(True, index=frame.index)
+    for column, condition in filters.items():
+        if column not in frame.columns:
+            raise ValueError(f"Unknown column: {column}")
+        values = frame[column]
+        if isinstance(condition, dict):
+            for operator, value in condition.items():
+                operator = operator.lstrip("$")
+                if operator not in _OPERATORS:
+                    raise ValueError(f"Unsupported filter operator: {operator}")
+                mask &= _OPERATORS[operator](values, value)
+        elif isinstance(condition, list):
+            mask &= values.isin(condition)
+        else:
+            mask &= values == condition
+    return mask
+
+
+def _group_keys(frame: pd.DataFrame, group_by: List[str]) -> List[pd.Series]:
+    """Resolve group_by entries, including derived date parts such as "date:year"."""
+    keys = []
+    for entry in group_by:
+        column, _, part = entry.partition(":")
+        if column not in frame.columns:
+            raise ValueError(f"Unknown column: {column}")
+        if part:
+            if part not in _DATE_PARTS:
+                raise ValueError(f"Unsupported date part: {part}")
+            keys.append(_DATE_PARTS[part](frame[column]).rename(entry))
+        else:
+            keys.append(frame[column])
+    return keys
+
+
+def query_frame(
+    frame: pd.DataFrame,
+    filters: Dict[str, Any] = None,
+    columns: List[str] = None,
+    group_by: List[str] = None,
+    aggregations: Dict[str, Union[str, List[str]]] = None,
+    sort_by: str = None,
+    descending: bool = False,
+) -> pd.DataFrame:
+    """Apply filters, then either a group-by / aggregation or a column selection, then a sort."""
+    if filters:
+        frame = frame[_mask(frame, filters)]
+
+    if aggregations:
+        named = {}
+        for column, functions in aggregations.items():
+            if column not in frame.columns:
+                raise ValueError(f"Unknown column: {column}")
+            for function in [functions] if isinstance(functions, str) else functions:
+                if function not in _AGGREGATIONS:
+                    raise ValueError(f"Unsupported aggregation: {function}. Use one of {', '.join(_AGGREGATIONS)}")
+                named[f"{column}_{function}"] = pd.NamedAgg(column=column, aggfunc=function)
+        if group_by:
+            result = frame.groupby(_group_keys(frame, group_by), sort=True).agg(**named).reset_index()
+        else:
+            result = pd.DataFrame({name: [frame[spec.column].agg(spec.aggfunc)] for name, spec in named.items()})
+    elif group_by:
+        result = frame.groupby(_group_keys(frame, group_by), sort=True).size().rename("count").reset_index()
+    else:
+        unknown = [column for column in columns or [] if column not in frame.columns]
+        if unknown:
+            raise ValueError(f"Unknown column: {', '.join(map(str, unknown))}")
+        result = frame[columns] if columns else frame
+
+    if sort_by:
+        if sort_by not in result.columns:
+            raise ValueError(f"Unknown sort column: {sort_by}. The result has {', '.join(map(str, result.columns))}")
+        result = result.sort_values(sort_by, ascending=not descending)
+    return result
+
+
+def _to_records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Convert to JSON-friendly row dicts (dates as ISO strings, NaN as None)."""
+    frame = frame.copy()
+    for column in frame.columns:
+        if pd.api.types.is_datetime64_any_dtype(frame[column]):
+            frame[column] = frame[column].dt.strftime("%Y-%m-%d")
+    frame = frame.astype(object).where(frame.notna(), None)
+    return frame.to_dict("records")
+
+
+# Shared by every LocalDataTool instance in the process
+local_data_store = LocalDataStore()
+
+
+class LocalDataTool(Tool):
+    name = "local_data_query"
+    description = (
+        "Filters, groups and aggregates the local consulting CSV datasets (client sales, client lists, "
+        "World Bank indicators, food emissions) without writing pandas code. Call it without a dataset "
+        "to list the datasets and their columns."
+    )
+    inputs = {
+        "dataset": {
+            "type": "string",
+            "description": "Dataset name, for example 'client1/sales'. Omit it to list the datasets",
+            "required": False,
+            "nullable": True
+        },
+        "filters": {
+            "type": "object",
+            "description": (
+                "Row filters as {column: value}, {column: [values]} or {column: {operator: value}} with "
+                "operators eq, ne, gt, gte, lt, lte, in, nin, between ([low, high]) and contains. "
+                "Dates compare with strings, for example {'date': {'between': ['2023-01-01', '2024-12-31']}}"
+            ),
+            "required": False,
+            "nullable": True
+        },
+        "columns": {
+            "type": "array",
+            "description": "Columns to return when not aggregating",
+            "required": False,
+            "nullable": True
+        },
+        "group_by": {
+            "type": "array",
+            "description": "Columns to group by; date columns accept ':year', ':quarter', ':month' or ':day', for example 'date:year'",
+            "required": False,
+            "nullable": True
+        },
+        "aggregations": {
+            "type": "object",
+            "description": "{column: function or [functions]} with mean, sum, count, min, max, median, std or nunique",
+            "required": False,
+            "nullable": True
+        },
+        "sort_by": {
+            "type": "string",
+            "description": "Column of the result to sort by (aggregates are named '<column>_<function>')",
+            "required": False,
+            "nullable": True
+        },
+        "descending": {
+            "type": "boolean",
+            "description": "Sort in descending order",
+            "required": False,
+            "nullable": True
+        },
+        "limit": {
+            "type": "integer",
+            "description": f"Maximum number of rows returned (default {DEFAULT_MAX_ROWS})",
+            "required": False,
+            "nullable": True
+        },
+        "result_format": {
+            "type": "string",
+            "description": "'records' (default) for a list of row dicts, or 'columnar' for typed NumPy arrays per column",
+            "required": False,
+            "nullable": True
+        },
+        "save_as": {
+            "type": "string",
+            "description": (
+                "Name under which to save the whole result as an artifact for dashboards "
+                "(only the row cap applies); data then holds a preview"
+            ),
+            "required": False,
+            "nullable": True
+        }
+    }
+    output_type = "object"
+
+    def __init__(self, store: LocalDataStore = None):
+        super().__init__()
+        self.store = store or local_data_store
+
+    def forward(
+        self,
+        dataset: str = None,
+        filters: Dict[str, Any] = None,
+        columns: List[str] = None,
+        group_by: List[str] = None,
+        aggregations: Dict[str, Any] = None,
+        sort_by: str = None,
+        descending: bool = None,
+        limit: int = None,
+        result_format: str = None,
+        save_as: str = None,
+    ) -> Dict[str, Any]:
+        """
+        Runs the request against the cached dataset.
+
+        Returns:
+            Dict containing:
+                - success (bool): Whether the request succeeded
+                - data (List[Dict] | Dict): The resulting rows, as records or columnar
+                - row_count (int): Number of rows before the limit
+                - truncated (bool): Whether rows were cut by the limit
+                - artifact (Dict): The saved artifact (with save_as only)
+                - error (str): Error message if the request failed
+        """
+        result_format = result_format or "records"
+        try:
+            if result_format not in RESULT_FORMATS:
+                raise ValueError(f"Unsupported result_format: {result_format}")
+
+            if not dataset:
+                data = {}
+                for name in list_datasets():
+                    frame = self.store.load(name)
+                    data[name] = {str(column): str(dtype) for column, dtype in frame.dtypes.items()}
+                return {"success": True, "data": data, "row_count": len(data), "truncated": False, "error": None}
+
+            result = query_frame(
+                self.store.load(dataset),
+                filters=filters,
+                columns=columns,
+                group_by=group_by,
+                aggregations=aggregations,
+                sort_by=sort_by,
+                descending=bool(descending),
+            )
+            limit = (ARTIFACT_MAX_ROWS if save_as else DEFAULT_MAX_ROWS) if limit is None else limit
+            row_count = len(result)
+            result = result.head(limit)
+            if save_as:
+                return attach_artifact(
+                    {"success": True, "data": result, "row_count": row_count, "truncated": row_count > limit, "error": None},
+                    save_as,
+                    source=f"local_data:{dataset}",
+                )
+            return {
+                "success": True,
+                "data": frame_to_columnar(result) if result_format == "columnar" else _to_records(result),
+                "row_count": row_count,
+                "truncated": row_count > limit,
+                "error": None
+            }
+        except (ValueError, TypeError) as e:
+            return {
+                "success": False,
+                "data": None,
+                "row_count": 0,
+                "truncated": False,
+                "error": str(e)
+            }
@@ -0,0 +1,125 @@
+"""`backend.tools.mongo_clients` module.
+
+Process-wide registry of `MongoClient`s, one per connection URI, so that every
+tool instance and session reuses the same warm connection pool.
+"""
+
+import os
+import re
+import threading
+from typing import Any, Dict
+
+from pymongo import MongoClient
+from pymongo.monitoring import ConnectionPoolListener
+
+
+class PoolStatsListener(ConnectionPoolListener):
+    """Counts connection pool events of one client."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {
+            "connections_open": 0,
+            "connections_created": 0,
+            "connections_closed": 0,
+            "checked_out": 0,
+            "checkouts": 0,
+            "checkout_failures": 0,
+            "pool_clears": 0,
+        }
+
+    def _add(self, **deltas: int) -> None:
+        with self._lock:
+            for name, delta in deltas.items():
+                self._stats[name] += delta
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        self._add(pool_clears=1)
+
+    def pool_closed(self, event) -> None:
+        pass
+
+    def connection_created(self, event) -> None:
+        self._add(connections_open=1, connections_created=1)
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def connection_closed(self, event) -> None:
+        self._add(connections_open=-1, connections_closed=1)
+
+    def connection_check_out_started(self, event) -> None:
+        pass
+
+    def connection_check_out_failed(self, event) -> None:
+        self._add(checkout_failures=1)
+
+    def connection_checked_out(self, event) -> None:
+        self._add(checked_out=1, checkouts=1)
+
+    def connection_checked_in(self, event) -> None:
+        self._add(checked_out=-1)
+
+
+def client_options() -> Dict[str, Any]:
+    """Return the pool options read from the MONGODB_* environment variables."""
+    return {
+        "maxPoolSize": int(os.environ.get("MONGODB_MAX_POOL_SIZE", "50")),
+        "minPoolSize": int(os.environ.get("MONGODB_MIN_POOL_SIZE", "0")),
+        "maxIdleTimeMS": int(os.environ.get("MONGODB_MAX_IDLE_TIME_MS", "60000")),
+        "serverSelectionTimeoutMS": int(os.environ.get("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+    }
+
+
+def redact_uri(uri: str) -> str:
+    """Hide the credentials of a connection URI."""
+    return re.sub(r"//[^/@]+@", "//***@", uri)
+
+
+_clients: Dict[str, MongoClient] = {}
+_listeners: Dict[str, PoolStatsListener] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(uri: str) -> MongoClient:
+    """Return the shared client for `uri`, creating it on first use.
+
+    Creating a client does not connect; pool sizing and timeouts come from `client_options()`.
+    """
+    with _clients_lock:
+        if uri not in _clients:
+            listener = PoolStatsListener()
+            _clients[uri] = MongoClient(uri, event_listeners=[listener], **client_options())
+            _listeners[uri] = listener
+        return _clients[uri]
+
+
+def warm(uri: str) -> None:
+    """Connect the client for `uri` now (SRV lookup, TLS handshake) instead of on first query."""
+    get_client(uri).admin.command("ping")
+
+
+def pool_stats() -> Dict[str, Dict[str, int]]:
+    """Return the connection pool counters of every client, keyed by redacted URI."""
+    with _clients_lock:
+        return {redact_uri(uri): listener.stats() for uri, listener in _listeners.items()}
+
+
+def close_all() -> None:
+    """Close every shared client. Called on backend shutdown."""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+        _listeners.clear()
+    for client in clients:
+        client.close()
@@ -1,15 +1,155 @@
 from smolagents import Tool
 import os
-from typing import Dict, Any, List, Union
+from itertools import islice
+from typing import Dict, Any, Iterator, List, Optional, Union
 import dotenv
-from pymongo import MongoClient
-from pymongo.errors import PyMongoError
+from pymongo import DeleteMany, DeleteOne, InsertOne, MongoClient, ReplaceOne, UpdateMany, UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from backend.tools.columnar import RESULT_FORMATS, records_to_columnar
+from backend.tools.artifacts import ARTIFACT_MAX_ROWS, attach_artifact
+from backend.tools.mongo_clients import get_client
+from backend.tools.result_cache import notify_write, query_cache
 
 dotenv.load_dotenv()
 
+# Operations that modify a collection and therefore invalidate its cached results
+WRITE_OPERATIONS = {"insert_one", "insert_many", "update_one", "update_many", "delete_one", "delete_many", "bulk_write"}
+
+# Guard on the number of documents a single find may return to the agent
+DEFAULT_MAX_DOCUMENTS: int = int(os.environ.get("MONGODB_MAX_DOCUMENTS", "1000"))
+DEFAULT_BATCH_SIZE: int = int(os.environ.get("MONGODB_BATCH_SIZE", "500"))
+DEFAULT_MAX_TIME_MS: int = int(os.environ.get("MONGODB_MAX_TIME_MS", "30000"))
+
+
+_SORT_DIRECTIONS = {"asc": 1, "ascending": 1, "1": 1, "desc": -1, "descending": -1, "-1": -1}
+
+
+def _sort_direction(direction: Any) -> int:
+    """Convert 1 / -1 (as numbers or strings) or "asc" / "desc" to a pymongo sort direction.
+
+    Raises:
+        ValueError: For any other value
+    """
+    if isinstance(direction, (int, float)) and not isinstance(direction, bool):
+        value = int(direction) if direction in (1, -1) else None
+    else:
+        value = _SORT_DIRECTIONS.get(str(direction).strip().lower())
+    if value is None:
+        raise ValueError(f"Invalid sort direction: {direction!r}. Use 1 / \"asc\" or -1 / \"desc\"")
+    return value
+
+
+def _sort_spec(sort: Union[Dict[str, int], List, None]) -> Optional[List[tuple]]:
+    """Convert a {"field": 1 | -1} dict or a list of [field, direction] pairs to a pymongo sort.
+
+    Raises:
+        ValueError: If the sort is malformed or a direction is invalid
+    """
+    if not sort:
+        return None
+    invalid = ValueError(f"Invalid sort: {sort!r}. Use {{\"field\": 1 | -1}} or a list of [field, direction] pairs")
+    if not isinstance(sort, (dict, list, tuple)):
+        raise invalid
+    spec = []
+    for pair in (sort.items() if isinstance(sort, dict) else sort):
+        try:
+            field, direction = pair
+        except (TypeError, ValueError):
+            raise invalid
+        spec.append((field, _sort_direction(direction)))
+    return spec
+
+
+def _pipeline_collections(pipeline: List[Dict[str, Any]]) -> tuple:
+    """Return the other collections a pipeline reads ($lookup, $unionWith, $graphLookup,
+    including inside $facet) and writes ($out, $merge)."""
+    reads, writes = [], []
+    for stage in pipeline:
+        for name, spec in stage.items():
+            if name in ("$lookup", "$graphLookup") and isinstance(spec, dict):
+                if spec.get("from"):
+                    reads.append(spec["from"])
+                sub_reads, _ = _pipeline_collections(spec.get("pipeline", []))
+                reads.extend(sub_reads)
+            elif name == "$unionWith":
+                reads.append(spec if isinstance(spec, str) else spec.get("coll"))
+                if isinstance(spec, dict):
+                    reads.extend(_pipeline_collections(spec.get("pipeline", []))[0])
+            elif name == "$facet" and isinstance(spec, dict):
+                for sub_pipeline in spec.values():
+                    reads.extend(_pipeline_collections(sub_pipeline)[0])
+            elif name in ("$out", "$merge"):
+                target = spec.get("into", spec) if name == "$merge" and isinstance(spec, dict) else spec
+                if isinstance(target, dict):
+                    target = target.get("coll")
+                writes.append(target)
+    return [c for c in reads if c], [c for c in writes if c]
+
+
+def _as_update(update: Union[Dict[str, Any], List]) -> Union[Dict[str, Any], List]:
+    """Wrap plain field values in `$set`, like update_one / update_many do; keep operators and pipelines."""
+    if isinstance(update, dict) and not any(key.startswith("$") for key in update):
+        return {"$set": update}
+    return update
+
+
+def _bulk_request(operation: Dict[str, Any]):
+    """Convert one `{"<kind>": {...}}` bulk_write entry into a pymongo write request."""
+    if not isinstance(operation, dict) or len(operation) != 1:
+        raise ValueError("each operation must be a dict with a single key, such as {'insert_one': {...}}")
+    kind, spec = next(iter(operation.items()))
+    if kind == "insert_one":
+        return InsertOne(spec.get("document", spec))
+    if kind in ("update_one", "update_many"):
+        request = UpdateOne if kind == "update_one" else UpdateMany
+        return request(spec.get("filter", {}), _as_update(spec["update"]), upsert=bool(spec.get("upsert")))
+    if kind == "replace_one":
+        return ReplaceOne(spec.get("filter", {}), spec["replacement"], upsert=bool(spec.get("upsert")))
+    if kind == "delete_one":
+        return DeleteOne(spec.get("filter", {}))
+    if kind == "delete_many":
+        return DeleteMany(spec.get("filter", {}))
+    raise ValueError(f"unsupported bulk operation: {kind}")
+
+
+def summarize_explain(explain: Dict[str, Any]) -> Dict[str, Any]:
+    """Reduce an `explain` document to the plan stages and the indexes they use."""
+    stages: List[str] = []
+    indexes: List[str] = []
+
+    def walk(node: Any) -> None:
+        if isinstance(node, dict):
+            stage = node.get("stage")
+            if isinstance(stage, str) and stage not in stages:
+                stages.append(stage)
+            index_name = node.get("indexName")
+            if isinstance(index_name, str) and index_name not in indexes:
+                indexes.append(index_name)
+            for key, value in node.items():
+                # Pipeline stages after the initial cursor are named by their first key
+                if key.startswith("$") and key not in stages:
+                    stages.append(key)
+                walk(value)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item)
+
+    walk(explain.get("queryPlanner", {}).get("winningPlan") or explain.get("stages") or explain)
+    return {
+        "stages": stages,
+        "indexes_used": indexes,
+        "collection_scan": "COLLSCAN" in stages,
+    }
+
 class MongoDBQueryTool(Tool):
     name = "mongodb_query"
-    description = "Executes queries on a MongoDB database."
+    description = (
+        "Executes queries on a MongoDB database. For find, use projection to fetch only the fields you need "
+        "and sort/limit to let the server do the work; results are capped by max_documents and "
+        "'truncated' is true when documents were left out. Prefer aggregate with a pipeline for "
+        "group-bys, averages and top-N so only the small aggregated result comes back."
+    )
     
     inputs = {
         "collection": {
@@ -18,17 +158,110 @@ class MongoDBQueryTool(Tool):
         },
         "operation": {
             "type": "string",
-            "description": "The type of operation to perform (find, insert_one, insert_many, update_one, update_many, delete_one, delete_many)"
+            "description": "The type of operation to perform (find, aggregate, insert_one, insert_many, update_one, update_many, delete_one, delete_many, bulk_write)"
         },
         "query": {
             "type": "object",
             "description": "The query parameters as a dictionary. For find operations, this is the filter. For updates, this is the filter criteria."
         },
+        "projection": {
+            "type": "object",
+            "description": "For find: fields to include or exclude, for example {'name': 1, 'price': 1, '_id': 0}",
+            "required": False,
+            "nullable": True
+        },
+        "sort": {
+            "type": "object",
+            "description": "For find: sort order as {'field': 1 or -1}, applied by the server",
+            "required": False,
+            "nullable": True
+        },
+        "limit": {
+            "type": "integer",
+            "description": "For find: maximum number of documents to return",
+            "required": False,
+            "nullable": True
+        },
+        "skip": {
+            "type": "integer",
+            "description": "For find: number of documents to skip",
+            "required": False,
+            "nullable": True
+        },
+        "batch_size": {
+            "type": "integer",
+            "description": f"For find: documents fetched per round trip (default {DEFAULT_BATCH_SIZE})",
+            "required": False,
+            "nullable": True
+        },
+        "max_documents": {
+            "type": "integer",
+            "description": f"For find and aggregate: hard cap on the documents returned (default {DEFAULT_MAX_DOCUMENTS})",
+            "required": False,
+            "nullable": True
+        },
+        "pipeline": {
+            "type": "array",
+            "description": (
+                "For aggregate: the aggregation pipeline stages, run after a $match on `query` if it is not empty. "
+                "Use $group, $sort, $limit, $facet... to compute group-bys, averages or top-N on the server"
+            ),
+            "required": False,
+            "nullable": True
+        },
+        "allow_disk_use": {
+            "type": "boolean",
+            "description": "For aggregate: let large $group / $sort stages spill to disk",
+            "required": False,
+            "nullable": True
+        },
+        "max_time_ms": {
+            "type": "integer",
+            "description": f"For aggregate: server-side time limit in milliseconds (default {DEFAULT_MAX_TIME_MS})",
+            "required": False,
+            "nullable": True
+        },
+        "explain": {
+            "type": "boolean",
+            "description": "For aggregate: also return a summary of the query plan (stages and indexes used)",
+            "required": False,
+            "nullable": True
+        },
+        "operations": {
+            "type": "array",
+            "description": (
+                "For bulk_write: mixed write operations sent as one unordered batch, each a dict with a single key: "
+                "{'insert_one': {'document': {...}}}, {'update_one' or 'update_many': {'filter': {...}, 'update': {...}, 'upsert': bool}}, "
+                "{'replace_one': {'filter': {...}, 'replacement': {...}, 'upsert': bool}}, {'delete_one' or 'delete_many': {'filter': {...}}}. "
+                "Plain fields in 'update' are wrapped in $set"
+            ),
+            "required": False,
+            "nullable": True
+        },
         "data": {
             "type": "object",
             "description": "The data to insert or update (required for insert and update operations)",
             "required": False,
             "nullable": True
+        },
+        "result_format": {
+            "type": "string",
+            "description": (
+                "For find: 'records' (default) returns data as a list of documents. 'columnar' returns "
+                "{'columns', 'arrays', 'dtypes', 'num_rows'} with one typed NumPy array per field, "
+                "ready for vectorized aggregations"
+            ),
+            "required": False,
+            "nullable": True
+        },
+        "save_as": {
+            "type": "string",
+            "description": (
+                "For find and aggregate: name under which to save all the resulting documents as an artifact "
+                "for dashboards (max_documents defaults to a much higher cap); data then holds a preview"
+            ),
+            "required": False,
+            "nullable": True
         }
     }
     output_type = "object"
@@ -45,19 +278,110 @@ class MongoDBQueryTool(Tool):
         # Get database connection details from parameters or environment variables
         self.mongo_uri = mongo_uri or os.environ.get("MONGODB_URI", "mongodb://localhost:27017")
         self.db_name = db_name or os.environ.get("MONGODB_DB", "default_db")
+        # Identifies this database in the shared query result cache
+        self.database = f"{self.mongo_uri}/{self.db_name}"
         
         # Initialize as None - will be lazily initialized on first use
         self.client = None
         self.db = None
 
     def _get_connection(self) -> MongoClient:
-        """Create and return a MongoDB client connection."""
+        """Return the process-wide client for this URI, shared with every other tool instance."""
         try:
-            return MongoClient(self.mongo_uri)
+            return get_client(self.mongo_uri)
         except PyMongoError as e:
             raise ConnectionError(f"Failed to connect to MongoDB: {str(e)}")
 
-    def forward(self, collection: str, operation: str, query: Dict[str, Any], data: Dict[str, Any] = None) -> Dict[str, Any]:
+    def _get_db(self):
+        """Return the database handle, connecting on first use."""
+        if self.client is None:
+            self.client = self._get_connection()
+            self.db = self.client[self.db_name]
+        return self.db
+
+    def _find_cursor(
+        self,
+        collection: str,
+        query: Dict[str, Any] = None,
+        projection: Dict[str, Any] = None,
+        sort: Union[Dict[str, int], List, None] = None,
+        skip: int = None,
+        limit: int = None,
+        batch_size: int = None,
+    ):
+        """Build a find cursor with the projection, sort, skip and limit applied server-side."""
+        cursor = self._get_db()[collection].find(
+            query or {},
+            projection or None,
+            batch_size=batch_size or DEFAULT_BATCH_SIZE,
+        )
+        sort = _sort_spec(sort)
+        if sort:
+            cursor = cursor.sort(sort)
+        if skip:
+            cursor = cursor.skip(skip)
+        if limit:
+            cursor = cursor.limit(limit)
+        return cursor
+
+    def iter_find(
+        self,
+        collection: str,
+        query: Dict[str, Any] = None,
+        projection: Dict[str, Any] = None,
+        sort: Union[Dict[str, int], List, None] = None,
+        skip: int = None,
+        limit: int = None,
+        batch_size: int = None,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Streams the documents matched by a find, one batch at a time.
+
+        Only one batch of documents is held in memory; no cap is applied besides `limit`.
+
+        Args:
+            collection (str): Name of the collection
+            query (Dict[str, Any], optional): The filter
+            projection (Dict[str, Any], optional): Fields to include or exclude
+            sort (Dict[str, int] | List, optional): Sort order
+            skip (int, optional): Number of documents to skip
+            limit (int, optional): Maximum number of documents
+            batch_size (int, optional): Documents per round trip and per yielded list
+
+        Yields:
+            Lists of at most `batch_size` documents
+        """
+        batch_size = batch_size or DEFAULT_BATCH_SIZE
+        cursor = self._find_cursor(collection, query, projection, sort, skip, limit, batch_size)
+        try:
+            while True:
+                batch = list(islice(cursor, batch_size))
+                if not batch:
+                    return
+                yield batch
+        finally:
+            cursor.close()
+
+    def forward(
+        self,
+        collection: str,
+        operation: str,
+        query: Dict[str, Any],
+        data: Dict[str, Any] = None,
+        projection: Dict[str, Any] = None,
+        sort: Dict[str, int] = None,
+        limit: int = None,
+        skip: int = None,
+        batch_size: int = None,
+        max_documents: int = None,
+        pipeline: List[Dict[str, Any]] = None,
+        allow_disk_use: bool = None,
+        max_time_ms: int = None,
+        explain: bool = None,
+        operations: List[Dict[str, Any]] = None,
+        result_format: str = None,
+        save_as: str = None,
+    ) -> Dict[str, Any]:
         """
         Executes the MongoDB operation on the specified collection.
         
@@ -66,31 +390,130 @@ class MongoDBQueryTool(Tool):
             operation (str): Type of operation to perform
             query (Dict[str, Any]): Query parameters
             data (Dict[str, Any], optional): Data for insert/update operations
+            projection (Dict[str, Any], optional): Fields to include or exclude, for find operations
+            sort (Dict[str, int], optional): Server-side sort order, for find operations
+            limit (int, optional): Maximum number of documents, for find operations
+            skip (int, optional): Number of documents to skip, for find operations
+            batch_size (int, optional): Documents fetched per round trip, for find operations
+            max_documents (int, optional): Cap on returned documents. Defaults to MONGODB_MAX_DOCUMENTS.
+            pipeline (List[Dict], optional): Aggregation stages, for aggregate operations
+            allow_disk_use (bool, optional): Allow stages to spill to disk, for aggregate operations
+            max_time_ms (int, optional): Server time limit. Defaults to MONGODB_MAX_TIME_MS.
+            explain (bool, optional): Add a query plan summary, for aggregate operations
+            operations (List[Dict], optional): Write operations, for bulk_write operations
+            result_format (str, optional): "records" (default) or "columnar", for find operations
+            save_as (str, optional): Save the documents as this artifact, for find and aggregate operations
+
+        Find results are served from the shared query cache when possible; a successful
+        write drops the cached results of its collection.
             
         Returns:
             Dict containing:
                 - success (bool): Whether the operation executed successfully
-                - data (List[Dict]): Query results (for find operations)
+                - data (List[Dict] | Dict): Query results (for find operations), as records or columnar
                 - affected_count (int): Number of affected documents
+                - truncated (bool): Whether results were cut by max_documents (find and aggregate only)
+                - explain (Dict): Query plan summary (aggregate with explain only)
+                - artifact (Dict): The saved artifact (with save_as only)
                 - error (str): Error message if operation failed
         """
+        result_format = result_format or "records"
+        if result_format not in RESULT_FORMATS:
+            return {
+                "success": False,
+                "data": None,
+                "affected_count": 0,
+                "error": f"Unsupported result_format: {result_format}"
+            }
+
         try:
-            # Initialize connection if not already done
-            if self.client is None:
-                self.client = self._get_connection()
-                self.db = self.client[self.db_name]
-            
-            collection = self.db[collection]
-            
-            if operation == "find":
-                cursor = collection.find(query)
-                results = list(cursor)
+            sort = _sort_spec(sort)
+        except ValueError as e:
+            return {
+                "success": False,
+                "data": None,
+                "affected_count": 0,
+                "error": str(e)
+            }
+
+        # Rejected here rather than by pymongo / islice, whose ValueError would escape the tool
+        for name, value in (("limit", limit), ("skip", skip), ("batch_size", batch_size), ("max_documents", max_documents)):
+            if value is not None and value < 0:
                 return {
-                    "success": True,
-                    "data": results,
-                    "affected_count": len(results),
-                    "error": None
+                    "success": False,
+                    "data": None,
+                    "affected_count": 0,
+                    "error": f"{name} must not be negative, got {value}"
                 }
+
+        options = {
+            "projection": projection,
+            "sort": sort,
+            "limit": limit,
+            "skip": skip,
+            "batch_size": batch_size,
+            "max_documents": (
+                max_documents if max_documents is not None
+                else ARTIFACT_MAX_ROWS if save_as else DEFAULT_MAX_DOCUMENTS
+            ),
+            "pipeline": pipeline or [],
+            "allow_disk_use": bool(allow_disk_use),
+            "max_time_ms": DEFAULT_MAX_TIME_MS if max_time_ms is None else max_time_ms,
+            "explain": bool(explain),
+            "operations": operations or [],
+            "result_format": result_format,
+        }
+
+        # Aggregations ending in $out / $merge write to other collections and are never cached
+        read, written = [], []
+        if operation == "aggregate":
+            read, written = _pipeline_collections(options["pipeline"])
+        cacheable = operation == "find" or (operation == "aggregate" and not written)
+
+        if cacheable:
+            cache_key = query_cache.make_key(
+                self.database,
+                {"collection": collection, "operation": operation, "filter": query},
+                **{name: value for name, value in options.items() if name != "batch_size"},
+            )
+            cached = query_cache.get(cache_key)
+            if cached is not None:
+                return attach_artifact(cached, save_as, f"{collection}.{operation}") if save_as else cached
+
+        result = self._run(collection, operation, query, data, options)
+
+        if result["success"] and cacheable:
+            query_cache.put(cache_key, result, self.database, [collection, *read])
+            return attach_artifact(result, save_as, f"{collection}.{operation}") if save_as else dict(result)
+        if operation in WRITE_OPERATIONS:
+            # Invalidate even on failure: an unordered bulk_write may have partially applied
+            query_cache.invalidate(self.database, [collection])
+            notify_write(self, [collection])
+        if result["success"] and written:
+            query_cache.invalidate(self.database, written)
+            notify_write(self, written)
+        return result
+
+    def _run(
+        self,
+        collection_name: str,
+        operation: str,
+        query: Dict[str, Any],
+        data: Dict[str, Any],
+        options: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """Executes the operation against MongoDB, bypassing the query cache."""
+        try:
+            collection = self._get_db()[collection_name]
+            
+            if operation == "find":
+                return self._find(collection_name, query, options)
+
+            elif operation == "aggregate":
+                return self._aggregate(collection_name, query, options)
+
+            elif operation == "bulk_write":
+                return self._bulk_write(collection, options["operations"])
                 
             elif operation == "insert_one":
                 result = collection.insert_one(data)
@@ -162,6 +585,151 @@ class MongoDBQueryTool(Tool):
                 "error": str(e)
             }
 
+    def _find(self, collection_name: str, query: Dict[str, Any], options: Dict[str, Any]) -> Dict[str, Any]:
+        """Runs a find, returning at most `max_documents` documents."""
+        limit = options["limit"] or None
+        max_documents = options["max_documents"]
+
+        # When the guard is tighter than the requested limit, fetch one extra
+        # document so that truncation can be detected without counting
+        guarded = limit is None or limit > max_documents
+        cursor = self._find_cursor(
+            collection_name,
+            query,
+            options["projection"],
+            options["sort"],
+            options["skip"],
+            max_documents + 1 if guarded else limit,
+            options["batch_size"],
+        )
+        try:
+            documents = islice(cursor, max_documents if guarded else limit)
+            if options["result_format"] == "columnar":
+                # Consume the cursor straight into per-field columns
+                data = records_to_columnar(documents)
+                count = data["num_rows"]
+            else:
+                data = list(documents)
+                count = len(data)
+            truncated = guarded and next(cursor, None) is not None
+        finally:
+            cursor.close()
+
+        return {
+            "success": True,
+            "data": data,
+            "affected_count": count,
+            "truncated": truncated,
+            "error": None
+        }
+
+    def _aggregate(self, collection_name: str, query: Dict[str, Any], options: Dict[str, Any]) -> Dict[str, Any]:
+        """Runs an aggregation pipeline, returning at most `max_documents` documents."""
+        pipeline = list(options["pipeline"])
+        if query:
+            pipeline.insert(0, {"$match": query})
+        max_documents = options["max_documents"]
+
+        cursor = self._get_db()[collection_name].aggregate(
+            pipeline,
+            allowDiskUse=options["allow_disk_use"],
+            maxTimeMS=options["max_time_ms"],
+            batchSize=options["batch_size"] or DEFAULT_BATCH_SIZE,
+        )
+        try:
+            documents = islice(cursor, max_documents)
+            if options["result_format"] == "columnar":
+                data = records_to_columnar(documents)
+                count = data["num_rows"]
+            else:
+                data = list(documents)
+                count = len(data)
+            truncated = next(cursor, None) is not None
+        finally:
+            cursor.close()
+
+        result = {
+            "success": True,
+            "data": data,
+            "affected_count": count,
+            "truncated": truncated,
+            "error": None
+        }
+        if options["explain"]:
+            explain = self._get_db().command(
+                "explain",
+                {"aggregate": collection_name, "pipeline": pipeline, "cursor": {}},
+                verbosity="queryPlanner",
+            )
+            result["explain"] = summarize_explain(explain)
+        return result
+
+    def _bulk_write(self, collection, operations: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Sends mixed writes as one unordered bulk request and reports per-operation errors."""
+        requests = []
+        for index, operation in enumerate(operations):
+            try:
+                requests.append(_bulk_request(operation))
+            except (ValueError, KeyError, AttributeError, TypeError) as e:
+                return {
+                    "success": False,
+                    "data": None,
+                    "affected_count": 0,
+                    "error": f"Invalid operation at index {index}: {str(e)}"
+                }
+        if not requests:
+            return {
+                "success": False,
+                "data": None,
+                "affected_count": 0,
+                "error": "bulk_write requires a non-empty list of operations"
+            }
+
+        # pymongo splits the requests into server-sized batches; with ordered=False the
+        # server keeps going after a failed operation
+        try:
+            result = collection.bulk_write(requests, ordered=False)
+            details = result.bulk_api_result
+            errors = []
+        except BulkWriteError as e:
+            details = e.details
+            errors = [
+                {"index": error["index"], "code": error.get("code"), "message": error.get("errmsg")}
+                for error in details.get("writeErrors", [])
+            ]
+            errors.extend(
+                {"index": None, "code": error.get("code"), "message": error.get("errmsg")}
+                for error in details.get("writeConcernErrors", [])
+            )
+
+        summary = {
+            "inserted_count": details.get("nInserted", 0),
+            "matched_count": details.get("nMatched", 0),
+            "modified_count": details.get("nModified", 0),
+            "deleted_count": details.get("nRemoved", 0),
+            "upserted_count": details.get("nUpserted", 0),
+            "upserted_ids": {str(item["index"]): str(item["_id"]) for item in details.get("upserted", [])},
+            "errors": errors,
+        }
+        return {
+            "success": not errors,
+            "data": summary,
+            "affected_count": (
+                summary["inserted_count"] + summary["modified_count"]
+                + summary["deleted_count"] + summary["upserted_count"]
+            ),
+            "error": f"{len(errors)} of {len(requests)} operations failed" if errors else None
+        }
+
+    def rows_after(self, collection_name: str, key: str, after: Any) -> List[Dict[str, Any]]:
+        """
+        Fetch the documents of a collection whose `key` field is greater than `after`, in key order.
+
+        Used to catch up incrementally with documents inserted since a known high-water mark.
+        """
+        cursor = self._get_db()[collection_name].find({key: {"$gt": after}}, {"_id": 0}).sort(key, 1)
+        return list(cursor)
+
     def get_collection_info(self, collection_name: str) -> Dict[str, Any]:
         """
         Get information about a specific collection.
@@ -173,15 +741,10 @@ class MongoDBQueryTool(Tool):
             Dict containing collection information including indexes and stats
         """
         try:
-            # Initialize connection if not already done
-            if self.client is None:
-                self.client = self._get_connection()
-                self.db = self.client[self.db_name]
-
-            collection = self.db[collection_name]
+            collection = self._get_db()[collection_name]
             
             # Get collection stats
-            stats = self.db.command("collstats", collection_name)
+            stats = self._get_db().command("collstats", collection_name)
             
             # Get indexes
             indexes = list(collection.list_indexes())
@@ -199,9 +762,4 @@ class MongoDBQueryTool(Tool):
                 "stats": None,
                 "indexes": None,
                 "error": str(e)
-            }
-
-    def __del__(self):
-        """Cleanup method to close MongoDB connection when object is destroyed."""
-        if self.client is not None:
-            self.client.close()
\ No newline at end of file
+            }
\ No newline at end of file
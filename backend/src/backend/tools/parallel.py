@@ -0,0 +1,138 @@
+"""`backend.tools.parallel` module.
+
+Tool letting an agent run several independent tool or managed agent calls at once,
+so that a step fetching from Postgres, MongoDB and the web takes as long as the
+slowest fetch instead of the sum of them.
+"""
+
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, List
+
+from smolagents import Tool
+
+MAX_CONCURRENCY: int = int(os.environ.get("PARALLEL_MAX_CONCURRENCY", "4"))
+CALL_TIMEOUT: float = float(os.environ.get("PARALLEL_CALL_TIMEOUT", "120"))
+
+
+class ParallelCallsTool(Tool):
+    name = "run_in_parallel"
+    description = (
+        "Runs several independent calls to your other tools or managed agents concurrently and returns "
+        "all their results, in order. Use it when the calls do not depend on each other's output, for "
+        "example a PostgreSQL query and a MongoDB query, or a web search and a database query."
+    )
+    inputs = {
+        "calls": {
+            "type": "array",
+            "description": (
+                "The calls, as [{'tool': <tool or managed agent name>, 'arguments': {<argument>: <value>}}]; "
+                "a managed agent takes {'task': <task>}"
+            ),
+        }
+    }
+    output_type = "array"
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY, timeout: float = CALL_TIMEOUT):
+        """Initialize the tool. It dispatches to the agent it is bound to with `bind()`.
+
+        Args:
+            max_concurrency (int): Maximum number of calls running at once
+            timeout (float): Seconds after which a running call is reported as timed out
+        """
+        super().__init__()
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.agent = None
+        # Agents keep per-run memory, so two calls to the same managed agent never overlap
+        self._target_locks: Dict[str, threading.Lock] = {}
+
+    def bind(self, agent) -> "ParallelCallsTool":
+        """Dispatch to the tools and managed agents of `agent`, resolved at call time."""
+        self.agent = agent
+        self._target_locks = {name: threading.Lock() for name in agent.managed_agents}
+        return self
+
+    def _targets(self) -> Dict[str, Any]:
+        if self.agent is None:
+            raise RuntimeError(f"{self.name} is not bound to an agent")
+        targets = {**self.agent.tools, **self.agent.managed_agents}
+        for name in (self.name, "final_answer"):
+            targets.pop(name, None)
+        return targets
+
+    def _call(self, target: Any, name: str, arguments: Dict[str, Any], started: Dict[int, float], index: int) -> Any:
+        lock = self._target_locks.get(name)
+        if lock is not None:
+            lock.acquire()
+        try:
+            started[index] = time.monotonic()
+            return target(**arguments)
+        finally:
+            if lock is not None:
+                lock.release()
+
+    def forward(self, calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Runs the calls concurrently, at most `max_concurrency` at a time.
+
+        A failing or timed-out call does not affect the others; a call still running
+        at its timeout is abandoned (its thread finishes in the background).
+
+        Returns:
+            One dict per call, in order, containing:
+                - tool (str): The called tool or managed agent
+                - success (bool): Whether the call returned
+                - result (Any): What the call returned
+                - elapsed (float): Seconds the call ran
+                - error (str): Error message if the call failed or timed out
+        """
+        targets = self._targets()
+        results: List[Dict[str, Any]] = []
+        futures: Dict[Future, int] = {}
+        started: Dict[int, float] = {}
+
+        executor = ThreadPoolExecutor(max_workers=max(1, min(self.max_concurrency, len(calls) or 1)))
+        try:
+            for index, call in enumerate(calls):
+                name = call.get("tool") if isinstance(call, dict) else None
+                results.append({"tool": name, "success": False, "result": None, "elapsed": 0.0, "error": None})
+                if name not in targets:
+                    results[index]["error"] = f"Unknown tool or managed agent: {name}. Available: {', '.join(targets)}"
+                    continue
+                arguments = call.get("arguments") or {}
+                # Each call runs in a copy of the caller's context, so that tracing spans nest under it
+                future = executor.submit(
+                    contextvars.copy_context().run, self._call, targets[name], name, arguments, started, index
+                )
+                futures[future] = index
+
+            pending = set(futures)
+            while pending:
+                # Wake up at the next timeout among the calls already running
+                deadlines = [started[futures[f]] + self.timeout for f in pending if futures[f] in started]
+                wait_for = max(0.0, min(deadlines) - time.monotonic()) if deadlines else self.timeout
+                done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    index = futures[future]
+                    results[index]["elapsed"] = round(time.monotonic() - started.get(index, time.monotonic()), 3)
+                    try:
+                        results[index]["result"] = future.result()
+                        results[index]["success"] = True
+                    except Exception as e:
+                        results[index]["error"] = f"{type(e).__name__}: {str(e)}"
+
+                now = time.monotonic()
+                for future in list(pending):
+                    index = futures[future]
+                    if index in started and now >= started[index] + self.timeout:
+                        pending.discard(future)
+                        results[index]["elapsed"] = round(now - started[index], 3)
+                        results[index]["error"] = f"Timed out after {self.timeout}s"
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        return results
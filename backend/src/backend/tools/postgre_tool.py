@@ -1,17 +1,117 @@
 from smolagents import Tool
 import os
+import uuid
 import psycopg2
+from psycopg2 import sql
 from psycopg2.extras import RealDictCursor
-from typing import Dict, Any, List, Union
+from typing import Dict, Any, Iterator, List, Optional, Union
 import dotenv
 
+from backend.tools.artifacts import ARTIFACT_MAX_ROWS, attach_artifact
+from backend.tools.columnar import RESULT_FORMATS, columns_to_columnar
+from backend.tools.postgres_catalog import get_catalog
+from backend.tools.postgres_pool import PostgresPool, default_db_config, get_pool
+from backend.tools.result_cache import notify_write, query_cache, sql_tables
+
 dotenv.load_dotenv()
 
+# Default caps on what a single SELECT may return to the agent
+DEFAULT_MAX_ROWS: int = int(os.environ.get("POSTGRES_MAX_ROWS", "1000"))
+DEFAULT_MAX_BYTES: int = int(os.environ.get("POSTGRES_MAX_BYTES", "256000"))
+DEFAULT_ITERSIZE: int = int(os.environ.get("POSTGRES_ITERSIZE", "2000"))
+
+
+class QueryStream:
+    """Iterates over the results of a SELECT in chunks, through a named server-side cursor.
+
+    Rows are fetched `itersize` at a time, so memory stays flat regardless of the
+    table size. Iteration stops once `max_rows` rows or `max_bytes` bytes (measured
+    on the text form of the values) have been produced, and `truncated` is then set.
+    Chunks hold row dicts, or plain value tuples when `as_dicts` is False.
+    The pooled connection is held until the stream is exhausted or closed.
+    """
+
+    def __init__(
+        self,
+        pool: PostgresPool,
+        query: str,
+        params: Dict[str, Any] = None,
+        itersize: int = DEFAULT_ITERSIZE,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        as_dicts: bool = True,
+    ):
+        self.pool = pool
+        self.query = query
+        self.params = params
+        self.itersize = max(1, itersize)
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.as_dicts = as_dicts
+
+        self.columns: List[str] = []
+        self.row_count = 0
+        self.byte_count = 0
+        self.truncated = False
+        self._chunks = self._iter_chunks()
+
+    def __iter__(self) -> Iterator[List[Union[Dict[str, Any], tuple]]]:
+        return self._chunks
+
+    def __enter__(self) -> "QueryStream":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the server-side cursor and return the connection to the pool."""
+        self._chunks.close()
+
+    def _iter_chunks(self) -> Iterator[List[Union[Dict[str, Any], tuple]]]:
+        with self.pool.connection() as conn:
+            with conn.cursor(name=f"stream_{uuid.uuid4().hex}") as cursor:
+                cursor.itersize = self.itersize
+                cursor.execute(self.query, self.params or None)
+
+                while True:
+                    # Ask for one row past the row cap so truncation is detected exactly
+                    size = self.itersize
+                    if self.max_rows is not None:
+                        size = min(size, self.max_rows - self.row_count + 1)
+                    rows = cursor.fetchmany(size)
+                    if not self.columns and cursor.description:
+                        self.columns = [column.name for column in cursor.description]
+                    if not rows:
+                        return
+
+                    chunk = []
+                    for values in rows:
+                        if self.max_rows is not None and self.row_count >= self.max_rows:
+                            self.truncated = True
+                            break
+                        row_bytes = sum(len(str(value)) for value in values)
+                        if self.max_bytes is not None and self.byte_count + row_bytes > self.max_bytes:
+                            self.truncated = True
+                            break
+                        chunk.append(dict(zip(self.columns, values)) if self.as_dicts else values)
+                        self.row_count += 1
+                        self.byte_count += row_bytes
+
+                    if chunk:
+                        yield chunk
+                    if self.truncated:
+                        return
+
 # Tools def
 class PostgresQueryTool(Tool):
     # description
     name = "postgres_query"
-    description = "Executes SQL queries on a PostgreSQL database."
+    description = (
+        "Executes SQL queries on a PostgreSQL database. "
+        "SELECT results are capped by max_rows/max_bytes; 'truncated' is true when rows were left out, "
+        "so prefer aggregating in SQL or adding a LIMIT."
+    )
     
     inputs = {
         "query": {
@@ -23,119 +123,256 @@ class PostgresQueryTool(Tool):
             "description": "Optional query parameters for parameterized queries",
             "required": False,
             "nullable": True
+        },
+        "max_rows": {
+            "type": "integer",
+            "description": f"Maximum number of rows returned by a SELECT (default {DEFAULT_MAX_ROWS})",
+            "required": False,
+            "nullable": True
+        },
+        "max_bytes": {
+            "type": "integer",
+            "description": f"Maximum size in bytes of the rows returned by a SELECT (default {DEFAULT_MAX_BYTES})",
+            "required": False,
+            "nullable": True
+        },
+        "result_format": {
+            "type": "string",
+            "description": (
+                "'records' (default) returns data as a list of row dicts. 'columnar' returns "
+                "{'columns', 'arrays', 'dtypes', 'num_rows'} with one typed NumPy array per column, "
+                "ready for vectorized aggregations"
+            ),
+            "required": False,
+            "nullable": True
+        },
+        "save_as": {
+            "type": "string",
+            "description": (
+                "Name under which to save the whole SELECT result as an artifact for dashboards "
+                "(only the row cap applies); data then holds a preview"
+            ),
+            "required": False,
+            "nullable": True
         }
     }
     output_type = "object"
 
-    def __init__(self):
-        """Initialize the PostgreSQL query tool with connection details from environment variables."""
+    def __init__(self, db_config: Dict[str, Any] = None):
+        """Initialize the PostgreSQL query tool.
+
+        No connection is opened here: every call to `forward` borrows one from the
+        process-wide pool shared by all tool instances.
+
+        Args:
+            db_config (Dict[str, Any], optional): Connection details. Defaults to the POSTGRES_* environment variables.
+        """
         super().__init__()
         
-        # Get database connection details from environment variables
-        self.db_config = {
-            "dbname": os.environ.get("POSTGRES_DB", "postgres"),
-            "user": os.environ.get("POSTGRES_USER", "postgres"),
-            "password": os.environ.get("POSTGRES_PASSWORD", "postgres"),
-            "host": os.environ.get("POSTGRES_HOST", "localhost"),
-            "port": os.environ.get("POSTGRES_PORT", "5432")
-        }
-        
-        # Initialize database connection
-        self.conn = self._get_connection()
+        # Get database connection details from parameters or environment variables
+        self.db_config = db_config or default_db_config()
+        self.pool = get_pool(self.db_config)
+        # Identifies this database in the shared query result cache
+        self.database = "postgres://{host}:{port}/{dbname}".format(**self.db_config)
 
-    def _get_connection(self):
-        """Create and return a database connection."""
-        try:
-            return psycopg2.connect(
-                **self.db_config,
-                cursor_factory=RealDictCursor  # Returns results as dictionaries
-            )
-        except psycopg2.Error as e:
-            raise ConnectionError(f"Failed to connect to database: {str(e)}")
-
-    def forward(self, query: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
+    def stream(
+        self,
+        query: str,
+        params: Dict[str, Any] = None,
+        itersize: int = DEFAULT_ITERSIZE,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        as_dicts: bool = True,
+    ) -> QueryStream:
+        """
+        Streams the results of a SELECT query in chunks of at most `itersize` rows.
+
+        Args:
+            query (str): The SELECT query to execute
+            params (Dict[str, Any], optional): Parameters for parameterized queries
+            itersize (int): Number of rows fetched from the server per round trip
+            max_rows (int, optional): Stop after this many rows
+            max_bytes (int, optional): Stop once the rows reach this size
+            as_dicts (bool): Yield row dicts (default) or plain value tuples
+
+        Returns:
+            QueryStream yielding lists of rows; check `truncated` once consumed
+        """
+        return QueryStream(self.pool, query, params, itersize, max_rows, max_bytes, as_dicts)
+
+    def forward(
+        self,
+        query: str,
+        params: Dict[str, Any] = None,
+        max_rows: int = None,
+        max_bytes: int = None,
+        result_format: str = None,
+        save_as: str = None,
+    ) -> Dict[str, Any]:
         """
         Executes the SQL query on the PostgreSQL database.
         
         Args:
             query (str): The SQL query to execute
             params (Dict[str, Any], optional): Parameters for parameterized queries
+            max_rows (int, optional): Row cap for SELECT queries. Defaults to POSTGRES_MAX_ROWS.
+            max_bytes (int, optional): Size cap for SELECT queries. Defaults to POSTGRES_MAX_BYTES.
+            result_format (str, optional): "records" (default) or "columnar"
+            save_as (str, optional): Save the SELECT result as this artifact (see `backend.tools.artifacts`)
+
+        SELECT results are served from the shared query cache when possible; a successful
+        write drops the cached results of the tables it touches.
             
         Returns:
             Dict containing:
                 - success (bool): Whether the query executed successfully
-                - data (List[Dict]): Query results (for SELECT queries)
+                - data (List[Dict] | Dict): Query results (for SELECT queries), as records or columnar
                 - affected_rows (int): Number of affected rows (for INSERT/UPDATE/DELETE)
+                - truncated (bool): Whether the SELECT results were cut by a cap
+                - artifact (Dict): The saved artifact (with save_as only)
                 - error (str): Error message if query failed
         """
+        result_format = result_format or "records"
+        if result_format not in RESULT_FORMATS:
+            return {
+                "success": False,
+                "data": None,
+                "affected_rows": 0,
+                "truncated": False,
+                "error": f"Unsupported result_format: {result_format}"
+            }
+
         try:
-            # Reuse existing connection or create new if closed
-            if self.conn.closed:
-                self.conn = self._get_connection()
-                
-            cursor = self.conn.cursor()
-            
-            # Execute query with optional parameters
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            
-            # Handle different query types
             if query.strip().upper().startswith("SELECT"):
-                # For SELECT queries, return the results
-                results = cursor.fetchall()
-                return {
-                    "success": True,
-                    "data": [dict(row) for row in results],
-                    "affected_rows": len(results),
-                    "error": None
-                }
-            else:
-                # For INSERT/UPDATE/DELETE queries, return affected rows
-                self.conn.commit()
-                return {
+                if save_as:
+                    # Saved result sets feed dashboards rather than the agent's context, so only a row cap applies
+                    max_rows = ARTIFACT_MAX_ROWS if max_rows is None else max_rows
+                    result_format = "columnar"
+                else:
+                    max_bytes = DEFAULT_MAX_BYTES if max_bytes is None else max_bytes
+                max_rows = DEFAULT_MAX_ROWS if max_rows is None else max_rows
+                cache_key = query_cache.make_key(
+                    self.database, query, params,
+                    max_rows=max_rows, max_bytes=max_bytes, result_format=result_format,
+                )
+                cached = query_cache.get(cache_key)
+                if cached is not None:
+                    return attach_artifact(cached, save_as, query) if save_as else cached
+
+                # For SELECT queries, stream the results through a server-side cursor
+                with self.stream(
+                    query,
+                    params,
+                    max_rows=max_rows,
+                    max_bytes=max_bytes,
+                    as_dicts=result_format == "records",
+                ) as stream:
+                    if result_format == "columnar":
+                        # Accumulate values column by column, without building per-row dicts
+                        column_values = None
+                        for chunk in stream:
+                            if column_values is None:
+                                column_values = [[] for _ in stream.columns]
+                            for values, column in zip(zip(*chunk), column_values):
+                                column.extend(values)
+                        data = columns_to_columnar(
+                            stream.columns, column_values or [[] for _ in stream.columns]
+                        )
+                    else:
+                        data = [row for chunk in stream for row in chunk]
+                result = {
                     "success": True,
-                    "data": None,
-                    "affected_rows": cursor.rowcount,
+                    "data": data,
+                    "affected_rows": stream.row_count,
+                    "truncated": stream.truncated,
                     "error": None
                 }
-                
-        except psycopg2.Error as e:
-            # Roll back transaction on error
-            self.conn.rollback()
+                query_cache.put(cache_key, result, self.database, sql_tables(query))
+                return attach_artifact(result, save_as, query) if save_as else dict(result)
+
+            # Borrow a pooled connection; it is rolled back if needed and returned on exit
+            with self.pool.connection() as conn:
+                with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                    # Execute query with optional parameters
+                    if params:
+                        cursor.execute(query, params)
+                    else:
+                        cursor.execute(query)
+
+                    # For INSERT/UPDATE/DELETE queries, return affected rows
+                    conn.commit()
+                    affected_rows = cursor.rowcount
+
+            # Drop cached results of the written tables (all of them if none can be identified)
+            tables = sql_tables(query) or None
+            query_cache.invalidate(self.database, tables)
+            if query.strip().upper().startswith(("CREATE", "ALTER", "DROP")):
+                get_catalog(self.db_config).invalidate()
+            notify_write(self, tables)
+            return {
+                "success": True,
+                "data": None,
+                "affected_rows": affected_rows,
+                "truncated": False,
+                "error": None
+            }
+
+        except (psycopg2.Error, ConnectionError, TimeoutError) as e:
             return {
                 "success": False,
                 "data": None,
                 "affected_rows": 0,
+                "truncated": False,
                 "error": str(e)
             }
-            
-        finally:
-            cursor.close()
+
+    def rows_after(self, table: str, key: str, after: Any) -> List[Dict[str, Any]]:
+        """
+        Fetch the rows of `table` whose `key` column is greater than `after`, in key order.
+
+        Used to catch up incrementally with rows inserted since a known high-water mark.
+        """
+        query = sql.SQL("SELECT * FROM {table} WHERE {key} > %s ORDER BY {key}").format(
+            table=sql.Identifier(table), key=sql.Identifier(key)
+        )
+        with self.pool.connection() as conn:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute(query, (after,))
+                return [dict(row) for row in cursor.fetchall()]
 
     def get_table_schema(self, table_name: str) -> Dict[str, Any]:
         """
-        Get the schema information for a specific table.
+        Get the schema information for a specific table, from the cached catalog snapshot.
         
         Args:
-            table_name (str): Name of the table
+            table_name (str): Name of the table, optionally qualified with its schema
             
         Returns:
-            Dict containing table schema information
-        """
-        query = """
-            SELECT column_name, data_type, is_nullable, column_default
-            FROM information_schema.columns
-            WHERE table_name = %s
-            ORDER BY ordinal_position;
+            Dict containing table schema information: columns, primary and foreign keys,
+            indexes and approximate row count
         """
-        
-        result = self.forward(query, {"table_name": table_name})
-        if result["success"]:
+        try:
+            table = get_catalog(self.db_config).table(table_name)
+        except (psycopg2.Error, ConnectionError, TimeoutError) as e:
             return {
-                "success": True,
+                "success": False,
+                "table_name": table_name,
+                "error": str(e)
+            }
+
+        if table is None:
+            return {
+                "success": False,
                 "table_name": table_name,
-                "columns": result["data"]
+                "error": f"Table {table_name} not found"
             }
-        return result
\ No newline at end of file
+        return {
+            "success": True,
+            "table_name": table_name,
+            "columns": table["columns"],
+            "primary_key": table["primary_key"],
+            "foreign_keys": table["foreign_keys"],
+            "indexes": table["indexes"],
+            "approx_rows": table["approx_rows"],
+            "error": None
+        }
\ No newline at end of file
@@ -0,0 +1,253 @@
+"""`backend.tools.postgres_catalog` module.
+
+Snapshot of a PostgreSQL database's schema (tables, columns, keys, indexes and
+approximate row counts), fetched in a single query and cached in memory and on disk.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import psycopg2
+from smolagents import Tool
+
+from backend.paths import cache_path
+from backend.tools.postgres_pool import PostgresPool, default_db_config, get_pool
+
+CATALOG_TTL: float = float(os.environ.get("POSTGRES_CATALOG_TTL", "3600"))
+
+# One round trip: every user table with its columns, keys and indexes, as a JSON array
+CATALOG_QUERY = """
+    SELECT coalesce(json_agg(t ORDER BY t.schema, t.name), '[]'::json) AS tables
+    FROM (
+        SELECT
+            n.nspname AS schema,
+            c.relname AS name,
+            CASE c.relkind
+                WHEN 'v' THEN 'view'
+                WHEN 'm' THEN 'materialized view'
+                WHEN 'f' THEN 'foreign table'
+                ELSE 'table'
+            END AS kind,
+            CASE WHEN c.reltuples < 0 THEN NULL ELSE c.reltuples::bigint END AS approx_rows,
+            (
+                SELECT json_agg(json_build_object(
+                    'name', a.attname,
+                    'type', format_type(a.atttypid, a.atttypmod),
+                    'nullable', NOT a.attnotnull,
+                    'default', pg_get_expr(d.adbin, d.adrelid)
+                ) ORDER BY a.attnum)
+                FROM pg_attribute a
+                LEFT JOIN pg_attrdef d ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+                WHERE a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+            ) AS columns,
+            (
+                SELECT json_agg(a.attname ORDER BY k.ord)
+                FROM pg_constraint pk
+                CROSS JOIN LATERAL unnest(pk.conkey) WITH ORDINALITY AS k(attnum, ord)
+                JOIN pg_attribute a ON a.attrelid = pk.conrelid AND a.attnum = k.attnum
+                WHERE pk.conrelid = c.oid AND pk.contype = 'p'
+            ) AS primary_key,
+            (
+                SELECT json_agg(json_build_object(
+                    'name', fk.conname,
+                    'columns', (
+                        SELECT json_agg(a.attname ORDER BY k.ord)
+                        FROM unnest(fk.conkey) WITH ORDINALITY AS k(attnum, ord)
+                        JOIN pg_attribute a ON a.attrelid = fk.conrelid AND a.attnum = k.attnum
+                    ),
+                    'references', fn.nspname || '.' || fc.relname,
+                    'referenced_columns', (
+                        SELECT json_agg(a.attname ORDER BY k.ord)
+                        FROM unnest(fk.confkey) WITH ORDINALITY AS k(attnum, ord)
+                        JOIN pg_attribute a ON a.attrelid = fk.confrelid AND a.attnum = k.attnum
+                    )
+                ) ORDER BY fk.conname)
+                FROM pg_constraint fk
+                JOIN pg_class fc ON fc.oid = fk.confrelid
+                JOIN pg_namespace fn ON fn.oid = fc.relnamespace
+                WHERE fk.conrelid = c.oid AND fk.contype = 'f'
+            ) AS foreign_keys,
+            (
+                SELECT json_agg(pg_get_indexdef(i.indexrelid) ORDER BY i.indexrelid)
+                FROM pg_index i
+                WHERE i.indrelid = c.oid
+            ) AS indexes
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE c.relkind IN ('r', 'p', 'v', 'm', 'f')
+          AND n.nspname NOT IN ('pg_catalog', 'information_schema')
+          AND n.nspname NOT LIKE 'pg_toast%'
+          AND n.nspname NOT LIKE 'pg_temp%'
+    ) t
+"""
+
+
+class PostgresCatalog:
+    """Schema snapshot of one database, refreshed on demand or once it is older than `ttl` seconds."""
+
+    def __init__(self, pool: PostgresPool, database: str, ttl: float = CATALOG_TTL):
+        """Initialize the catalog. Nothing is fetched until the first `snapshot()`.
+
+        Args:
+            pool (PostgresPool): Pool used to run the catalog query
+            database (str): Identifier of the database, also used to name the disk cache
+            ttl (float): Seconds before a snapshot is considered stale
+        """
+        self.pool = pool
+        self.database = database
+        self.ttl = ttl
+        self.path = cache_path("postgres_catalog", hashlib.sha256(database.encode()).hexdigest()[:16] + ".json")
+
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+
+    def _fresh(self, snapshot: Optional[Dict[str, Any]]) -> bool:
+        return snapshot is not None and time.time() - snapshot["fetched_at"] < self.ttl
+
+    def _load(self) -> Optional[Dict[str, Any]]:
+        """Read the disk snapshot, ignoring a missing or unreadable file."""
+        try:
+            with open(self.path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return snapshot if snapshot.get("database") == self.database else None
+
+    def _fetch(self) -> Dict[str, Any]:
+        with self.pool.connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(CATALOG_QUERY)
+                tables = cursor.fetchone()[0]
+        snapshot = {"database": self.database, "fetched_at": time.time(), "tables": tables}
+
+        # Write atomically so a concurrent reader never sees a partial file
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, self.path)
+        return snapshot
+
+    def snapshot(self, refresh: bool = False) -> Dict[str, Any]:
+        """Return the catalog, from memory, then disk, then the database.
+
+        Args:
+            refresh (bool): Ignore the cached snapshots and query the database
+
+        Returns:
+            Dict with `database`, `fetched_at` (epoch seconds) and `tables`
+        """
+        with self._lock:
+            if not refresh:
+                if self._fresh(self._snapshot):
+                    return self._snapshot
+                snapshot = self._load()
+                if self._fresh(snapshot):
+                    self._snapshot = snapshot
+                    return snapshot
+            self._snapshot = self._fetch()
+            return self._snapshot
+
+    def invalidate(self) -> None:
+        """Force the next `snapshot()` to query the database, e.g. after DDL."""
+        with self._lock:
+            self._snapshot = None
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+    def table(self, table_name: str) -> Optional[Dict[str, Any]]:
+        """Find a table by name, optionally qualified with its schema."""
+        schema, _, name = table_name.rpartition(".")
+        for table in self.snapshot()["tables"]:
+            if table["name"] == name and schema in ("", table["schema"]):
+                return table
+        return None
+
+
+def describe_table(table: Dict[str, Any], with_indexes: bool = False) -> str:
+    """Render a table of the catalog as a compact, one-line-per-table description."""
+    name = table["name"] if table["schema"] == "public" else f"{table['schema']}.{table['name']}"
+    header = name if table["kind"] == "table" else f"{name} [{table['kind']}]"
+    if table["approx_rows"] is not None:
+        header += f" (~{table['approx_rows']} rows)"
+
+    primary_key = set(table["primary_key"] or [])
+    columns = ", ".join(
+        f"{column['name']} {column['type']}"
+        + (" PK" if column["name"] in primary_key else "")
+        + ("" if column["nullable"] else " NOT NULL")
+        for column in table["columns"] or []
+    )
+    lines = [f"{header}: {columns}"]
+    for fk in table["foreign_keys"] or []:
+        lines.append(
+            f"  FK ({', '.join(fk['columns'])}) -> {fk['references']} ({', '.join(fk['referenced_columns'])})"
+        )
+    if with_indexes:
+        lines.extend(f"  {index}" for index in table["indexes"] or [])
+    return "\n".join(lines)
+
+
+_catalogs: Dict[str, PostgresCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(db_config: Optional[Dict[str, Any]] = None) -> PostgresCatalog:
+    """Return the process-wide catalog of the database described by `db_config`."""
+    db_config = db_config or default_db_config()
+    database = "postgres://{host}:{port}/{dbname}".format(**db_config)
+    with _catalogs_lock:
+        if database not in _catalogs:
+            _catalogs[database] = PostgresCatalog(get_pool(db_config), database)
+        return _catalogs[database]
+
+
+class PostgresSchemaTool(Tool):
+    name = "postgres_schema"
+    description = (
+        "Describes the PostgreSQL database schema in one call: every table with its columns, types, "
+        "primary and foreign keys and approximate row count. Call it once at the start instead of "
+        "exploring the schema with SQL queries."
+    )
+    inputs = {
+        "table": {
+            "type": "string",
+            "description": "Optional table name, to also list that table's indexes",
+            "required": False,
+            "nullable": True
+        },
+        "refresh": {
+            "type": "boolean",
+            "description": "Re-read the schema from the database instead of the cached snapshot",
+            "required": False,
+            "nullable": True
+        }
+    }
+    output_type = "string"
+
+    def __init__(self, db_config: Dict[str, Any] = None):
+        super().__init__()
+        self.catalog = get_catalog(db_config)
+
+    def forward(self, table: str = None, refresh: bool = None) -> str:
+        """Returns the compact description of the whole schema, or of a single table."""
+        try:
+            snapshot = self.catalog.snapshot(refresh=bool(refresh))
+        except (psycopg2.Error, ConnectionError, TimeoutError) as e:
+            return f"Error reading the database schema: {str(e)}"
+
+        if table:
+            found = self.catalog.table(table)
+            if found is None:
+                return f"Error: table {table} not found"
+            return describe_table(found, with_indexes=True)
+
+        tables: List[Dict[str, Any]] = snapshot["tables"]
+        if not tables:
+            return "The database has no tables."
+        return "\n".join(describe_table(t) for t in tables)
@@ -0,0 +1,272 @@
+"""`backend.tools.postgres_pool` module.
+
+Process-wide, bounded PostgreSQL connection pool shared by the Postgres tools.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Iterator, Optional, Tuple
+
+import psycopg2
+from psycopg2 import extensions
+
+
+def default_db_config() -> Dict[str, Any]:
+    """Return the connection details read from the environment variables."""
+    return {
+        "dbname": os.environ.get("POSTGRES_DB", "postgres"),
+        "user": os.environ.get("POSTGRES_USER", "postgres"),
+        "password": os.environ.get("POSTGRES_PASSWORD", "postgres"),
+        "host": os.environ.get("POSTGRES_HOST", "localhost"),
+        "port": os.environ.get("POSTGRES_PORT", "5432")
+    }
+
+
+class PostgresPool:
+    """Bounded, thread-safe pool of PostgreSQL connections.
+
+    Unlike `psycopg2.pool.ThreadedConnectionPool`, which raises as soon as
+    `max_size` connections are in use and closes returned connections beyond
+    `minconn`, a checkout waits (up to `acquire_timeout` seconds) for a connection
+    to be returned, and up to `max_size` idle connections are kept open.
+    Every checkout is health-checked and gets its own `statement_timeout`.
+    """
+
+    def __init__(
+        self,
+        db_config: Dict[str, Any],
+        min_size: int = 1,
+        max_size: int = 10,
+        statement_timeout_ms: int = 30000,
+        acquire_timeout: float = 30.0,
+    ):
+        """Initialize the pool. No connection is opened until first use.
+
+        Args:
+            db_config (Dict[str, Any]): Keyword arguments for `psycopg2.connect`
+            min_size (int): Number of connections opened by `warm()`
+            max_size (int): Maximum number of connections checked out at once
+            statement_timeout_ms (int): Default `statement_timeout` set on checkout (0 disables it)
+            acquire_timeout (float): Seconds to wait for a free connection before giving up
+        """
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError(f"Invalid pool size: min_size={min_size}, max_size={max_size}")
+
+        self.db_config = dict(db_config)
+        self.min_size = min_size
+        self.max_size = max_size
+        self.statement_timeout_ms = statement_timeout_ms
+        self.acquire_timeout = acquire_timeout
+
+        self._idle: Deque[Any] = deque()
+        self._open = 0
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._closed = False
+        self._metrics = {
+            "checkouts": 0,
+            "in_use": 0,
+            "max_in_use": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+            "acquire_timeouts": 0,
+            "failed_health_checks": 0,
+        }
+
+    def _connect(self):
+        """Open a new connection."""
+        try:
+            conn = psycopg2.connect(**self.db_config)
+        except psycopg2.Error as e:
+            raise ConnectionError(f"Failed to connect to database: {str(e)}")
+        with self._lock:
+            self._open += 1
+        return conn
+
+    def _discard(self, conn) -> None:
+        """Close a connection that will not go back to the pool."""
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+        with self._lock:
+            self._open -= 1
+
+    def warm(self) -> None:
+        """Open `min_size` connections now instead of on first checkout."""
+        with self._lock:
+            missing = 0 if self._closed else self.min_size - self._open
+        for _ in range(max(0, missing)):
+            conn = self._connect()
+            with self._lock:
+                if not self._closed:
+                    self._idle.append(conn)
+                    continue
+            self._discard(conn)
+
+    def _prepare(self, conn, statement_timeout_ms: int) -> None:
+        """Health-check a connection and apply the checkout's statement timeout.
+
+        The `SET` doubles as the liveness probe, so a checkout costs a single round trip.
+        """
+        if conn.closed:
+            raise psycopg2.InterfaceError("connection already closed")
+        if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+            conn.rollback()
+        with conn.cursor() as cursor:
+            cursor.execute("SET statement_timeout = %s", (int(statement_timeout_ms),))
+        conn.commit()
+
+    def _checkout(self, statement_timeout_ms: int):
+        """Take a healthy connection, reusing an idle one when possible.
+
+        A connection failing its health check is discarded; a second failure is raised.
+        """
+        for attempt in range(2):
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                conn = self._connect()
+            try:
+                self._prepare(conn, statement_timeout_ms)
+                return conn
+            except (psycopg2.OperationalError, psycopg2.InterfaceError):
+                with self._lock:
+                    self._metrics["failed_health_checks"] += 1
+                self._discard(conn)
+                if attempt == 1:
+                    raise
+
+    @contextmanager
+    def connection(self, statement_timeout_ms: Optional[int] = None) -> Iterator[Any]:
+        """Borrow a connection for the duration of the `with` block.
+
+        The transaction is rolled back if the block raises or leaves it open,
+        and the connection is always returned to the pool.
+
+        Args:
+            statement_timeout_ms (int, optional): Overrides the pool's default statement timeout
+
+        Raises:
+            TimeoutError: If no connection frees up within `acquire_timeout` seconds
+            ConnectionError: If a new connection cannot be opened, or the pool is closed
+        """
+        if self._closed:
+            raise ConnectionError("The PostgreSQL connection pool is closed")
+        if statement_timeout_ms is None:
+            statement_timeout_ms = self.statement_timeout_ms
+
+        start = time.perf_counter()
+        if not self._slots.acquire(timeout=self.acquire_timeout):
+            with self._lock:
+                self._metrics["acquire_timeouts"] += 1
+            raise TimeoutError(
+                f"No PostgreSQL connection available after {self.acquire_timeout}s "
+                f"({self.max_size} in use)"
+            )
+        waited = time.perf_counter() - start
+
+        try:
+            if self._closed:
+                raise ConnectionError("The PostgreSQL connection pool is closed")
+            conn = self._checkout(statement_timeout_ms)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._metrics["checkouts"] += 1
+            self._metrics["in_use"] += 1
+            self._metrics["max_in_use"] = max(self._metrics["max_in_use"], self._metrics["in_use"])
+            self._metrics["wait_time_total"] += waited
+            self._metrics["wait_time_max"] = max(self._metrics["wait_time_max"], waited)
+
+        try:
+            yield conn
+        finally:
+            # A failed query (even a statement timeout) leaves the connection usable;
+            # only a closed connection or a failing rollback means it is broken
+            broken = bool(conn.closed)
+            if not broken:
+                try:
+                    if conn.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                        conn.rollback()
+                except psycopg2.Error:
+                    broken = True
+            with self._lock:
+                keep = not (broken or conn.closed or self._closed)
+                if keep:
+                    self._idle.append(conn)
+            if not keep:
+                self._discard(conn)
+            with self._lock:
+                self._metrics["in_use"] -= 1
+            self._slots.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the pool metrics (sizes, in-use count and checkout wait times)."""
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["open_connections"] = self._open
+            metrics["idle_connections"] = len(self._idle)
+        checkouts = metrics["checkouts"]
+        metrics["wait_time_avg"] = metrics["wait_time_total"] / checkouts if checkouts else 0.0
+        metrics.update({
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+        })
+        return metrics
+
+    def close(self) -> None:
+        """Close the idle connections; connections in use are closed when returned.
+
+        A closed pool lends no more connections.
+        """
+        with self._lock:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+        for conn in idle:
+            self._discard(conn)
+
+
+_pools: Dict[Tuple, PostgresPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_config: Optional[Dict[str, Any]] = None) -> PostgresPool:
+    """Return the process-wide pool for `db_config`, creating it on first use.
+
+    Pool sizing and timeouts come from the `POSTGRES_POOL_MIN_SIZE`,
+    `POSTGRES_POOL_MAX_SIZE`, `POSTGRES_STATEMENT_TIMEOUT_MS` and
+    `POSTGRES_POOL_ACQUIRE_TIMEOUT` environment variables.
+
+    Args:
+        db_config (Dict[str, Any], optional): Connection details. Defaults to `default_db_config()`.
+    """
+    db_config = db_config or default_db_config()
+    key = tuple(sorted((k, str(v)) for k, v in db_config.items()))
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = PostgresPool(
+                db_config,
+                min_size=int(os.environ.get("POSTGRES_POOL_MIN_SIZE", "1")),
+                max_size=int(os.environ.get("POSTGRES_POOL_MAX_SIZE", "10")),
+                statement_timeout_ms=int(os.environ.get("POSTGRES_STATEMENT_TIMEOUT_MS", "30000")),
+                acquire_timeout=float(os.environ.get("POSTGRES_POOL_ACQUIRE_TIMEOUT", "30")),
+            )
+        return _pools[key]
+
+
+def close_all() -> None:
+    """Close every pool created in this process.
+
+    The pools stay registered: the tools hold on to them, and a new pool for the same
+    database would let more than `max_size` connections be open at once.
+    """
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
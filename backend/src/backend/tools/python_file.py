@@ -1,12 +1,111 @@
+import ast
+import hashlib
 import os
-import requests
+import stat
+import threading
+import uuid
+from collections import OrderedDict
+from typing import List
 
 from smolagents import Tool
+from smolagents.utils import BASE_BUILTIN_MODULES
+
+from backend.tools.python_tools import AUTHORIZED_IMPORTS, GENERATED_FILE_IMPORTS
+
+ALLOWED_IMPORTS = [*BASE_BUILTIN_MODULES, *AUTHORIZED_IMPORTS, *GENERATED_FILE_IMPORTS]
+
+# Validation results by content hash, so that a file is only checked once per version
+_validations: "OrderedDict[str, List[str]]" = OrderedDict()
+_validations_lock = threading.Lock()
+VALIDATION_CACHE_SIZE = 256
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def is_allowed_import(module: str) -> bool:
+    return any(module == allowed or module.startswith(allowed + ".") for allowed in ALLOWED_IMPORTS)
+
+
+def _check(content: str, filename: str) -> List[str]:
+    try:
+        # Compiling (as py_compile does) also catches the errors the AST parse lets through
+        tree = compile(content, filename, "exec", flags=ast.PyCF_ONLY_AST)
+        compile(tree, filename, "exec")
+    except SyntaxError as e:
+        return [f"line {e.lineno}: SyntaxError: {e.msg}"]
+    except ValueError as e:
+        return [f"ValueError: {str(e)}"]
+
+    errors = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            modules = ["." * node.level + (node.module or "")]
+        else:
+            continue
+        errors.extend(
+            f"line {node.lineno}: import of {module} is not allowed"
+            for module in modules if not is_allowed_import(module)
+        )
+    return errors
+
+
+def validate_source(content: str, filename: str = "<generated>") -> List[str]:
+    """Check that `content` compiles and only imports allowed modules.
+
+    Returns:
+        The errors found, with their line numbers (empty if the code is valid)
+    """
+    digest = content_hash(content)
+    with _validations_lock:
+        if digest in _validations:
+            _validations.move_to_end(digest)
+            return _validations[digest]
+    errors = _check(content, filename)
+    with _validations_lock:
+        _validations[digest] = errors
+        while len(_validations) > VALIDATION_CACHE_SIZE:
+            _validations.popitem(last=False)
+    return errors
+
+
+def write_if_changed(filepath: str, content: str) -> bool:
+    """Atomically write `content` to `filepath` unless the file already holds it. Returns whether it was written."""
+    data = content.encode()
+    # The file keeps its permissions; a new one gets the umask's, like any file opened for writing
+    mode = None
+    try:
+        with open(filepath, "rb") as f:
+            if hashlib.sha256(f.read()).hexdigest() == hashlib.sha256(data).hexdigest():
+                return False
+            mode = stat.S_IMODE(os.fstat(f.fileno()).st_mode)
+    except FileNotFoundError:
+        pass
+    directory = os.path.dirname(filepath) or "."
+    # A reader (e.g. a running Streamlit app) sees the old file or the new one, never a partial write
+    tmp = os.path.join(directory, f".{os.path.basename(filepath)}.{uuid.uuid4().hex}.tmp")
+    fd = os.open(tmp, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            if mode is not None:
+                os.fchmod(f.fileno(), mode)
+        os.replace(tmp, filepath)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    return True
 
 
 class PythonFileCreatorTool(Tool):
     name = "python_file_creator"
-    description = "Creates a Python file locally with the specified content"
+    description = (
+        "Creates a Python file locally with the specified content. The code is checked first "
+        "(syntax and allowed imports): invalid code is not written and the errors are returned."
+    )
     inputs = {
         "filename": {
             "type": "string",
@@ -26,23 +125,26 @@ class PythonFileCreatorTool(Tool):
     output_type = "string"
 
     def forward(self, filename: str, content: str, directory: str = ".") -> str:
-        import os
-        
+        directory = directory or "."
+
         # Ensure filename has .py extension
         if not filename.endswith('.py'):
             filename += '.py'
         
         # Create full path
         filepath = os.path.join(directory, filename)
+
+        errors = validate_source(content, filepath)
+        if errors:
+            return f"Error: {filepath} was not written, the code is invalid:\n" + "\n".join(errors)
         
         # Create directory if it doesn't exist
         os.makedirs(directory, exist_ok=True)
         
-        # Write content to file
-        with open(filepath, 'w') as f:
-            f.write(content)
-        
+        # An unchanged file is left as is, so that its running app is not reloaded
+        if not write_if_changed(filepath, content):
+            return f"Python file at {filepath} is unchanged"
         return f"Successfully created Python file at: {filepath}"
 
 # Create and test the tool
-file_creator = PythonFileCreatorTool()
\ No newline at end of file
+file_creator = PythonFileCreatorTool()
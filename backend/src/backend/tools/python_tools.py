@@ -32,3 +32,11 @@ AUTHORIZED_IMPORTS = [
     "huggingface_hub",
     "streamlit"
 ]
+
+# Modules the generated Python files (dashboards) may import besides `AUTHORIZED_IMPORTS`
+# and the builtin modules smolagents allows
+GENERATED_FILE_IMPORTS = [
+    "plotly",
+    "altair",
+    "backend.dashboard_data",
+]
@@ -0,0 +1,550 @@
+"""`backend.tools.python_workers` module.
+
+Runs the agents' code steps in a pool of worker processes instead of in the backend
+process, enabled with `PYTHON_EXECUTOR=workers`.
+
+Workers are forked from a forkserver that has imported the heavy modules of
+`AUTHORIZED_IMPORTS` (pandas, numpy, scipy...) once, so a code step starts without
+paying for their imports, and `PYTHON_WARM_WORKERS` workers (idle or lent) are
+kept started ahead of time. An agent session (its runs until one resets its memory)
+gets a worker of its own for the agent and each of its managed agents, holding the
+variables of its code steps from one step and one run to the next, so several
+agents execute in parallel on several cores. Tool and managed agent calls made by
+the code are sent back to the backend process, which runs them.
+
+Each code step is limited to `PYTHON_WORKER_CPU_SECONDS` of CPU time and each worker
+to `PYTHON_WORKER_MEMORY_MB` of memory. Workers are reused across sessions (with
+their variables dropped) until they have run `PYTHON_WORKER_MAX_EXECUTIONS` code
+steps, after which they are replaced by new ones at the end of their session.
+"""
+
+import contextvars
+import functools
+import importlib.util
+import multiprocessing
+import os
+import pickle
+import resource
+import signal
+import threading
+import uuid
+import weakref
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from smolagents.local_python_executor import (
+    BASE_BUILTIN_MODULES,
+    DEFAULT_MAX_LEN_OUTPUT,
+    InterpreterError,
+    LocalPythonInterpreter,
+)
+
+from backend.tools.python_tools import AUTHORIZED_IMPORTS
+
+EXECUTOR: str = os.environ.get("PYTHON_EXECUTOR", "local")
+WARM_WORKERS: int = int(os.environ.get("PYTHON_WARM_WORKERS", "2"))
+MAX_EXECUTIONS: int = int(os.environ.get("PYTHON_WORKER_MAX_EXECUTIONS", "100"))
+CPU_SECONDS: float = float(os.environ.get("PYTHON_WORKER_CPU_SECONDS", "60"))
+MEMORY_MB: int = int(os.environ.get("PYTHON_WORKER_MEMORY_MB", "4096"))
+
+# Modules worth importing once in the forkserver rather than in each code step
+HEAVY_MODULES = ("numpy", "pandas", "scipy", "sklearn", "torch")
+
+# The agent run the current code steps belong to
+_session: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("python_worker_session", default=None)
+
+
+def preload_modules() -> List[str]:
+    """Modules the forkserver imports: `PYTHON_WORKER_PRELOAD` (comma separated), else the installed heavy authorized ones."""
+    if os.environ.get("PYTHON_WORKER_PRELOAD") is not None:
+        modules = [module.strip() for module in os.environ["PYTHON_WORKER_PRELOAD"].split(",") if module.strip()]
+    else:
+        modules = [module for module in HEAVY_MODULES if module in AUTHORIZED_IMPORTS and importlib.util.find_spec(module)]
+    # The worker's own code, so that starting a worker imports nothing
+    return [*modules, "smolagents.local_python_executor", __name__]
+
+
+_context = None
+_context_lock = threading.Lock()
+
+
+def get_context():
+    """The forkserver context the workers are started from, its preload set on first use."""
+    global _context
+    with _context_lock:
+        if _context is None:
+            _context = multiprocessing.get_context("forkserver")
+            _context.set_forkserver_preload(preload_modules())
+        return _context
+
+
+# Worker process side
+
+class CPUTimeLimitExceeded(BaseException):
+    """Raised in a code step past its CPU time. A BaseException, so that the code's `except Exception` does not catch it."""
+
+
+def _on_cpu_limit(signum, frame):
+    raise CPUTimeLimitExceeded()
+
+
+def _tool_proxy(conn, name: str):
+    """Function standing for the tool `name` in the worker: the call is run by the backend process."""
+    def call(*args, **kwargs):
+        # The time spent waiting for the tool is not the code's CPU time
+        remaining, _ = signal.setitimer(signal.ITIMER_PROF, 0)
+        try:
+            conn.send(("call", name, args, kwargs))
+            kind, value = conn.recv()
+        finally:
+            if remaining:
+                signal.setitimer(signal.ITIMER_PROF, remaining)
+        if kind == "raise":
+            raise RuntimeError(value)
+        return value
+
+    call.__name__ = name
+    return call
+
+
+def _execute(interpreter: LocalPythonInterpreter, code: str, variables: Dict[str, Any], cpu_seconds: float) -> Tuple:
+    if interpreter is None:
+        return ("error", "The worker has no session", "")
+    if cpu_seconds > 0:
+        # Backstop for code stuck in C, where the timer's exception cannot be raised: the kernel kills the worker
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+        resource.setrlimit(resource.RLIMIT_CPU, (int(usage.ru_utime + usage.ru_stime + cpu_seconds) + 5, hard))
+        signal.setitimer(signal.ITIMER_PROF, cpu_seconds)
+    try:
+        output, logs, is_final_answer = interpreter(code, variables)
+    except CPUTimeLimitExceeded:
+        return ("error", f"Code execution exceeded the CPU time limit of {cpu_seconds:g}s", str(interpreter.state.get("_print_outputs", "")))
+    except Exception as e:
+        return ("error", str(e), str(interpreter.state.get("_print_outputs", "")))
+    finally:
+        signal.setitimer(signal.ITIMER_PROF, 0)
+    try:
+        pickle.dumps(output)
+    except Exception:
+        output = repr(output)
+    return ("done", output, logs, is_final_answer)
+
+
+def _worker_main(conn, cpu_seconds: float, memory_bytes: int) -> None:
+    """Serve the parent's messages: configure (new session), execute, reset, stop."""
+    if memory_bytes > 0:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+    signal.signal(signal.SIGPROF, _on_cpu_limit)
+    # Ctrl+C is for the backend process, which stops the workers itself
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    interpreter = None
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+        kind = message[0]
+        if kind == "configure":
+            _, authorized_imports, tool_names, max_print_outputs_length = message
+            interpreter = LocalPythonInterpreter(
+                authorized_imports,
+                {name: _tool_proxy(conn, name) for name in tool_names},
+                max_print_outputs_length=max_print_outputs_length,
+            )
+        elif kind == "reset":
+            interpreter = None
+        elif kind == "execute":
+            _, code, variables = message
+            conn.send(_execute(interpreter, code, variables, cpu_seconds))
+        elif kind == "stop":
+            return
+
+
+# Backend process side
+
+class WorkerExited(Exception):
+    """The worker process exited during a code step (limit exceeded or crash)."""
+
+
+class CodeError(Exception):
+    """The code step raised; carries what the code printed."""
+
+    def __init__(self, message: str, logs: str):
+        super().__init__(message)
+        self.logs = logs
+
+
+class PythonWorker:
+    """A worker process and the pipe it is driven through."""
+
+    def __init__(self, cpu_seconds: float = CPU_SECONDS, memory_mb: int = MEMORY_MB):
+        """Start the worker process.
+
+        Args:
+            cpu_seconds (float): CPU time limit of a code step (0 for none)
+            memory_mb (int): Address space limit of the worker, in MiB (0 for none)
+        """
+        context = get_context()
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(child_conn, cpu_seconds, memory_mb * 1024 * 1024),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.executions = 0
+        self.lock = threading.Lock()
+
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def exit_reason(self) -> str:
+        self.process.join(timeout=1)
+        code = self.process.exitcode
+        if code == -signal.SIGXCPU:
+            return "it exceeded its CPU time limit"
+        if code == -signal.SIGKILL:
+            return "it was killed (out of memory?)"
+        return f"exit code {code}"
+
+    def configure(self, authorized_imports: List[str], tool_names: List[str], max_print_outputs_length: int) -> None:
+        """Start a new session in the worker, without any variable."""
+        self.conn.send(("configure", authorized_imports, tool_names, max_print_outputs_length))
+
+    def execute(self, code: str, variables: Dict[str, Any], tools: Dict[str, Any]) -> Tuple[Any, str, bool]:
+        """Run a code step, running the tool calls it makes.
+
+        Returns:
+            The code's output, its print outputs and whether it gave the final answer
+
+        Raises:
+            CodeError: If the code raised
+            WorkerExited: If the worker exited meanwhile
+        """
+        try:
+            self.conn.send(("execute", code, variables))
+            self.executions += 1
+            while True:
+                message = self.conn.recv()
+                if message[0] == "call":
+                    _, name, args, kwargs = message
+                    try:
+                        reply = ("result", tools[name](*args, **kwargs))
+                    except Exception as e:
+                        reply = ("raise", f"{type(e).__name__}: {str(e)}")
+                    try:
+                        self.conn.send(reply)
+                    except (pickle.PicklingError, TypeError, AttributeError) as e:
+                        self.conn.send(("raise", f"The result of {name} cannot be sent to the code: {str(e)}"))
+                elif message[0] == "done":
+                    return message[1], message[2], message[3]
+                else:
+                    raise CodeError(message[1], message[2])
+        except (EOFError, OSError) as e:
+            if self.alive():
+                raise
+            raise WorkerExited(f"The Python worker exited during the code execution: {self.exit_reason()}") from e
+
+    def reset(self) -> None:
+        """Drop the session's variables."""
+        self.conn.send(("reset",))
+
+    def stop(self, timeout: float = 2.0) -> None:
+        if self.alive():
+            try:
+                self.conn.send(("stop",))
+            except OSError:
+                pass
+            self.process.join(timeout)
+            if self.alive():
+                self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+def stop_in_background(workers: List[PythonWorker]) -> None:
+    """Stop the workers without making the caller wait for their processes to exit."""
+    if workers:
+        threading.Thread(target=lambda: [worker.stop() for worker in workers], daemon=True).start()
+
+
+class WorkerPool:
+    """Idle workers, started ahead of time, lent to sessions.
+
+    Lent workers count toward `warm_workers`, so that a worker given back finds room
+    among the idle ones instead of being replaced by a new one meanwhile.
+    """
+
+    def __init__(self, warm_workers: int = WARM_WORKERS, max_executions: int = MAX_EXECUTIONS):
+        """Initialize the pool. No worker is started until `warm()` or the first `acquire()`.
+
+        Args:
+            warm_workers (int): Number of idle workers kept for the next sessions
+            max_executions (int): Code steps after which a worker is replaced at the end of its session
+        """
+        self.warm_workers = warm_workers
+        self.max_executions = max_executions
+        self.idle: List[PythonWorker] = []
+        self._leased = 0
+        self._starting = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _missing(self) -> int:
+        """Workers to start for `warm_workers` to be idle, lent or starting (called with the lock held)."""
+        self.idle = [worker for worker in self.idle if worker.alive()]
+        return self.warm_workers - len(self.idle) - self._leased - self._starting
+
+    def warm(self) -> None:
+        """Start workers until `warm_workers` are idle or lent."""
+        with self._lock:
+            if self._closed:
+                return
+            missing = max(0, self._missing())
+            self._starting += missing
+        # Forking takes a while: the pool stays available meanwhile
+        started = []
+        try:
+            for _ in range(missing):
+                started.append(PythonWorker())
+        finally:
+            with self._lock:
+                self._starting -= missing
+                if not self._closed:
+                    self.idle.extend(started)
+                    started = []
+            stop_in_background(started)
+
+    def acquire(self) -> PythonWorker:
+        """Take an idle worker (or start one), starting a replacement in the background if some are missing."""
+        with self._lock:
+            self.idle = [worker for worker in self.idle if worker.alive()]
+            worker = self.idle.pop(0) if self.idle else None
+            self._leased += 1
+        if worker is None:
+            try:
+                worker = PythonWorker()
+            except BaseException:
+                with self._lock:
+                    self._leased -= 1
+                raise
+        self._refill()
+        return worker
+
+    def release(self, worker: PythonWorker) -> None:
+        """Give back a worker at the end of its session: kept idle, or stopped (and replaced) if worn out or not needed."""
+        with self._lock:
+            self._leased -= 1
+            if not self._closed and worker.alive() and worker.executions < self.max_executions and len(self.idle) < self.warm_workers:
+                try:
+                    worker.reset()
+                    self.idle.append(worker)
+                    return
+                except OSError:
+                    pass
+        stop_in_background([worker])
+        self._refill()
+
+    def _refill(self) -> None:
+        """Start the missing workers in the background, if any."""
+        with self._lock:
+            missing = not self._closed and self._missing() > 0
+        if missing:
+            threading.Thread(target=self.warm, daemon=True).start()
+
+    def close(self) -> None:
+        """Stop the idle workers."""
+        with self._lock:
+            self._closed = True
+            workers, self.idle = self.idle, []
+        for worker in workers:
+            worker.stop()
+
+
+_pool: Optional[WorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> WorkerPool:
+    """Return the process-wide pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkerPool()
+        return _pool
+
+
+# Executors that have been lent workers, so that the end of a session reaches all of them
+_executors: "weakref.WeakSet[WorkerPythonExecutor]" = weakref.WeakSet()
+
+
+class WorkerPythonExecutor:
+    """Drop-in replacement of smolagents' `LocalPythonInterpreter` running the code in pool workers, one per session."""
+
+    def __init__(self, additional_authorized_imports: List[str], tools: Dict[str, Any], max_print_outputs_length: Optional[int] = None):
+        """Initialize the executor.
+
+        Args:
+            additional_authorized_imports (List[str]): Modules the code may import, besides the builtin ones
+            tools (Dict[str, Any]): Tools and managed agents the code may call, by name
+            max_print_outputs_length (int, optional): Maximum length of the print outputs returned
+        """
+        self.authorized_imports = list(set(BASE_BUILTIN_MODULES) | set(additional_authorized_imports))
+        self.tools = tools
+        self.max_print_outputs_length = max_print_outputs_length or DEFAULT_MAX_LEN_OUTPUT
+        # Read by the agent for the print outputs of a failed step
+        self.state: Dict[str, Any] = {}
+        self._leases: Dict[str, PythonWorker] = {}
+        self._lock = threading.Lock()
+
+    def _lease(self, session: str) -> PythonWorker:
+        with self._lock:
+            worker = self._leases.get(session)
+            if worker is None:
+                worker = get_pool().acquire()
+                worker.configure(self.authorized_imports, list(self.tools), self.max_print_outputs_length)
+                self._leases[session] = worker
+                _executors.add(self)
+            return worker
+
+    def release(self, session: str) -> None:
+        """Give back the worker of `session`, if any."""
+        with self._lock:
+            worker = self._leases.pop(session, None)
+        if worker is not None:
+            get_pool().release(worker)
+
+    def __call__(self, code_action: str, additional_variables: Dict[str, Any]) -> Tuple[Any, str, bool]:
+        session = _session.get()
+        if session is None:
+            # Not part of an agent run: the code runs in a session of its own, given back right after
+            with worker_session():
+                return self(code_action, additional_variables)
+        worker = self._lease(session)
+        try:
+            with worker.lock:
+                output, logs, is_final_answer = worker.execute(code_action, additional_variables, self.tools)
+        except CodeError as e:
+            self.state["_print_outputs"] = e.logs
+            raise InterpreterError(str(e)) from None
+        except WorkerExited as e:
+            # The session's variables are lost with the worker; the next step starts on a new one
+            self.state["_print_outputs"] = ""
+            self.release(session)
+            raise InterpreterError(str(e)) from None
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            raise InterpreterError(f"The agent's variables cannot be sent to the Python worker: {str(e)}") from None
+        self.state["_print_outputs"] = logs
+        return output, logs, is_final_answer
+
+
+def end_session(session: str) -> None:
+    """Give back the workers of `session` to the pool."""
+    for executor in list(_executors):
+        executor.release(session)
+
+
+@contextmanager
+def worker_session() -> Iterator[None]:
+    """Run the code steps of the block in workers of their own, given back at the end (nested blocks share the outer one's)."""
+    if _session.get() is not None:
+        yield
+        return
+    session = uuid.uuid4().hex
+    token = _session.set(session)
+    try:
+        yield
+    finally:
+        _session.reset(token)
+        end_session(session)
+
+
+_agent_sessions_lock = threading.Lock()
+
+
+def _agent_session(agent, reset: bool) -> str:
+    """The session of the agent's runs: kept while they carry on its memory, a new one (the previous one ended) when it is reset.
+
+    The session also ends when the agent is garbage collected.
+    """
+    with _agent_sessions_lock:
+        finalizer = getattr(agent, "_worker_session", None)
+        if finalizer is not None and finalizer.alive and not reset:
+            return finalizer.peek()[2][0]
+        if finalizer is not None:
+            finalizer()
+        session = uuid.uuid4().hex
+        agent._worker_session = weakref.finalize(agent, end_session, session)
+        return session
+
+
+def _stream_in_session(steps: Iterator[Any], session: str) -> Iterator[Any]:
+    """Iterate over a streamed run in `session`, whatever thread or context each step is pulled from."""
+    try:
+        while True:
+            token = _session.set(session)
+            try:
+                step = next(steps)
+            except StopIteration:
+                return
+            finally:
+                _session.reset(token)
+            yield step
+    finally:
+        steps.close()
+
+
+def use_worker_executor(agent) -> Any:
+    """Run the agent's code steps in pool workers when `PYTHON_EXECUTOR` is "workers". Idempotent.
+
+    The agent's runs share a session, holding the variables of their code steps, until
+    one resets the agent's memory (`reset=True`, the default) and starts a new one;
+    a run that is part of a session already (a managed agent called from its
+    manager's code) runs in that one.
+    """
+    if EXECUTOR != "workers" or isinstance(agent.python_executor, WorkerPythonExecutor):
+        return agent
+    agent.python_executor = WorkerPythonExecutor(
+        agent.additional_authorized_imports,
+        {**agent.tools, **agent.managed_agents},
+        max_print_outputs_length=agent.python_executor.max_print_outputs_length,
+    )
+    run = agent.run
+
+    @functools.wraps(run)
+    def run_in_session(task: str, *args, **kwargs):
+        if _session.get() is not None:
+            return run(task, *args, **kwargs)
+        session = _agent_session(agent, kwargs.get("reset", True))
+        if kwargs.get("stream"):
+            return _stream_in_session(run(task, *args, **kwargs), session)
+        token = _session.set(session)
+        try:
+            return run(task, *args, **kwargs)
+        finally:
+            _session.reset(token)
+
+    agent.run = run_in_session
+    return agent
+
+
+def warm() -> None:
+    """Start the forkserver (importing the heavy modules) and the idle workers, if workers are used."""
+    if EXECUTOR == "workers":
+        get_pool().warm()
+
+
+def close_pool() -> None:
+    """Stop the idle workers and the ones still lent."""
+    global _pool
+    for executor in list(_executors):
+        with executor._lock:
+            leases, executor._leases = list(executor._leases.values()), {}
+        for worker in leases:
+            worker.stop()
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
@@ -0,0 +1,247 @@
+"""`backend.tools.rerank` module.
+
+Reranking of documents (search results, scraped pages...) against a query, either
+locally or through the Jina AI API, chosen by `RERANK_ENGINE` (`local` by default).
+
+The local engine scores with BM25 over an inverted index held in NumPy arrays, so a
+batch of queries is scored against every document at once, without any network
+round trip. Indexes are kept per corpus and reused when the same documents are
+reranked again. An embedding backend (any function mapping texts to vectors) can be
+plugged in with `set_embedding_backend()`, its cosine similarities then being blended
+with the BM25 scores.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+from smolagents import Tool
+
+RERANK_ENGINES = ("local", "jina")
+DEFAULT_TOP_N: int = int(os.environ.get("RERANK_TOP_N", "3"))
+INDEX_CACHE_SIZE: int = int(os.environ.get("RERANK_INDEX_CACHE_SIZE", "32"))
+
+EmbeddingBackend = Callable[[List[str]], np.ndarray]
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(text.lower())
+
+
+def document_text(document: Any) -> str:
+    """Text of a document given as a string, or as a dict / list (e.g. a search result)."""
+    if isinstance(document, str):
+        return document
+    if isinstance(document, dict) and isinstance(document.get("text"), str):
+        return document["text"]
+    return json.dumps(document, default=str)
+
+
+class BM25Index:
+    """BM25 weights of a corpus, stored as an inverted index: per term, the documents containing it."""
+
+    def __init__(self, documents: Sequence[str], k1: float = 1.5, b: float = 0.75):
+        """Index the documents.
+
+        Args:
+            documents (Sequence[str]): Texts of the documents
+            k1 (float): Term frequency saturation
+            b (float): Document length normalization
+        """
+        self.documents = list(documents)
+        self.size = len(self.documents)
+        self.vocabulary: Dict[str, int] = {}
+        self._embeddings: Optional[np.ndarray] = None
+        self._embedded_with: Optional[EmbeddingBackend] = None
+
+        doc_ids, term_ids = [], []
+        lengths = np.zeros(self.size, dtype=np.float64)
+        for doc_id, text in enumerate(self.documents):
+            tokens = tokenize(text)
+            lengths[doc_id] = len(tokens)
+            doc_ids.extend([doc_id] * len(tokens))
+            term_ids.extend(self.vocabulary.setdefault(token, len(self.vocabulary)) for token in tokens)
+
+        vocabulary_size = max(len(self.vocabulary), 1)
+        # One entry per (term, document) pair, sorted by term, with its frequency in the document
+        pairs, frequencies = np.unique(
+            np.asarray(term_ids, dtype=np.int64) * self.size + np.asarray(doc_ids, dtype=np.int64),
+            return_counts=True,
+        )
+        terms, self.doc_ids = np.divmod(pairs, max(self.size, 1))
+        self.term_offsets = np.searchsorted(terms, np.arange(vocabulary_size + 1))
+
+        document_frequency = np.diff(self.term_offsets).astype(np.float64)
+        idf = np.log1p((self.size - document_frequency + 0.5) / (document_frequency + 0.5))
+        average_length = lengths.mean() if self.size and lengths.mean() > 0 else 1.0
+        tf = frequencies.astype(np.float64)
+        norm = k1 * (1 - b + b * lengths[self.doc_ids] / average_length)
+        self.weights = idf[terms] * tf * (k1 + 1) / (tf + norm)
+
+    def scores(self, queries: Sequence[str]) -> np.ndarray:
+        """BM25 scores of every document for every query, as a (queries, documents) array."""
+        rows, columns, values = [], [], []
+        for row, query in enumerate(queries):
+            query_terms = np.asarray([self.vocabulary.get(token, -1) for token in tokenize(query)], dtype=np.int64)
+            for term, count in zip(*np.unique(query_terms, return_counts=True)):
+                if term < 0:
+                    continue
+                start, end = self.term_offsets[term], self.term_offsets[term + 1]
+                rows.append(np.full(end - start, row))
+                columns.append(self.doc_ids[start:end])
+                values.append(self.weights[start:end] * count)
+        scores = np.zeros(len(queries) * self.size)
+        if rows:
+            flat = np.concatenate(rows) * self.size + np.concatenate(columns)
+            scores += np.bincount(flat, weights=np.concatenate(values), minlength=scores.size)
+        return scores.reshape(len(queries), self.size)
+
+    def embeddings(self, embed: EmbeddingBackend) -> np.ndarray:
+        """Unit-normalized embeddings of the documents, computed once per index and backend."""
+        if self._embeddings is None or self._embedded_with is not embed:
+            self._embeddings = _normalize(np.asarray(embed(self.documents), dtype=np.float64))
+            self._embedded_with = embed
+        return self._embeddings
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+_indexes: "OrderedDict[str, BM25Index]" = OrderedDict()
+_indexes_lock = threading.Lock()
+_embedding_backend: Optional[EmbeddingBackend] = None
+_embedding_weight: float = 0.5
+
+
+def get_index(documents: Sequence[str]) -> BM25Index:
+    """Return the index of `documents`, reusing the one built for the same corpus if still cached."""
+    key = hashlib.sha256("\x1f".join(documents).encode()).hexdigest()
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is not None:
+            _indexes.move_to_end(key)
+            return index
+    index = BM25Index(documents)
+    with _indexes_lock:
+        _indexes[key] = index
+        while len(_indexes) > INDEX_CACHE_SIZE:
+            _indexes.popitem(last=False)
+    return index
+
+
+def set_embedding_backend(embed: Optional[EmbeddingBackend], weight: float = 0.5) -> None:
+    """Blend the cosine similarities of `embed`'s vectors into the local scores (None to use BM25 only).
+
+    Args:
+        embed (Callable, optional): Maps a list of texts to a (texts, dimensions) array
+        weight (float): Share of the embedding similarity in the final score, between 0 and 1
+    """
+    global _embedding_backend, _embedding_weight
+    _embedding_backend, _embedding_weight = embed, weight
+
+
+def local_scores(queries: Sequence[str], documents: Sequence[str]) -> np.ndarray:
+    """Relevance of every document for every query, as a (queries, documents) array of scores in [0, 1]."""
+    index = get_index(documents)
+    scores = index.scores(queries)
+    # Min-max per query, so that scores are comparable across queries and with cosine similarities
+    low, high = scores.min(axis=1, keepdims=True), scores.max(axis=1, keepdims=True)
+    scores = np.where(high > low, (scores - low) / np.where(high > low, high - low, 1), 0.0)
+    if _embedding_backend is not None:
+        query_vectors = _normalize(np.asarray(_embedding_backend(list(queries)), dtype=np.float64))
+        similarity = (query_vectors @ index.embeddings(_embedding_backend).T + 1) / 2
+        scores = (1 - _embedding_weight) * scores + _embedding_weight * similarity
+    return scores
+
+
+def rerank_local(query: str, documents: Sequence[Any], top_n: int = DEFAULT_TOP_N) -> List[Dict[str, Any]]:
+    """Rank the documents by local relevance to the query.
+
+    Returns:
+        The `top_n` best documents, as dicts with their `index` in `documents`, `relevance_score` and `document`
+    """
+    if not documents:
+        return []
+    texts = [document_text(document) for document in documents]
+    scores = local_scores([query], texts)[0]
+    top_n = min(top_n, len(texts))
+    # Stable, so that ties keep the original order
+    order = np.argsort(-scores, kind="stable")[:top_n]
+    return [
+        {"index": int(i), "relevance_score": round(float(scores[i]), 6), "document": {"text": texts[i]}}
+        for i in order
+    ]
+
+
+class RerankTool(Tool):
+    name = "rerank"
+    description = (
+        "Reranks documents or links (e.g. search results or scraped pages) by relevance to a query "
+        "and returns the best ones with their relevance scores."
+    )
+    inputs = {
+        "query": {
+            "type": "string",
+            "description": "The query to rerank documents or links against."
+        },
+        "documents": {
+            "type": "array",
+            "description": "List of documents or links to rerank."
+        },
+        "top_n": {
+            "type": "integer",
+            "description": f"Number of documents to return. Defaults to {DEFAULT_TOP_N}.",
+            "nullable": True
+        },
+    }
+    output_type = "object"
+
+    def __init__(self, engine: Optional[str] = None, remote: Tool = None):
+        """Initialize the tool.
+
+        Args:
+            engine (str, optional): "local" or "jina". Defaults to `RERANK_ENGINE`, else "local".
+            remote (Tool, optional): Tool reranking through the Jina API. Defaults to a new `JinaRerank`.
+        """
+        super().__init__()
+        self.engine = engine or os.environ.get("RERANK_ENGINE", "local")
+        if self.engine not in RERANK_ENGINES:
+            raise ValueError(f"Unsupported rerank engine: {self.engine}. Use one of {', '.join(RERANK_ENGINES)}")
+        self.remote = remote
+        if self.engine == "jina" and self.remote is None:
+            from backend.tools.jina_rerank import JinaRerank
+
+            self.remote = JinaRerank()
+
+    def forward(self, query: str, documents: list, top_n: int = None) -> Dict[str, Any]:
+        """
+        Reranks the documents with the configured engine.
+
+        Returns:
+            Dict containing:
+                - engine (str): The engine used
+                - results (list): The best documents, as dicts with their `index`, `relevance_score` and `document`
+                - latency_ms (float): Time taken by the reranking
+        """
+        top_n = top_n or DEFAULT_TOP_N
+        start = time.perf_counter()
+        if self.engine == "jina":
+            response = self.remote(query=query, documents=documents, top_n=top_n)
+            results = response.get("results", []) if isinstance(response, dict) else response
+        else:
+            results = rerank_local(query, documents, top_n)
+        return {
+            "engine": self.engine,
+            "results": results,
+            "latency_ms": round((time.perf_counter() - start) * 1000, 3),
+        }
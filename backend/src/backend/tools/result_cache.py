@@ -0,0 +1,238 @@
+"""`backend.tools.result_cache` module.
+
+Process-wide LRU + TTL cache for database query results, invalidated by writes,
+and the hook through which the database tools announce their writes.
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+# Splits SQL into alternating unquoted text and quoted literals / identifiers
+_SQL_QUOTED = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")""")
+_SQL_TABLE = re.compile(
+    r"""\b(?:from|join|into|update|table|truncate)\s+(?:only\s+)?((?:"[^"]+"|[\w$]+)(?:\s*\.\s*(?:"[^"]+"|[\w$]+))?)""",
+    re.IGNORECASE,
+)
+
+
+def normalize_sql(query: str) -> str:
+    """Normalize SQL text so that trivially different spellings share a cache key.
+
+    Outside of string literals and quoted identifiers, whitespace is collapsed and
+    the text is lower-cased; a trailing semicolon is dropped.
+    """
+    parts = _SQL_QUOTED.split(query.strip().rstrip(";").strip())
+    for i in range(0, len(parts), 2):
+        parts[i] = re.sub(r"\s+", " ", parts[i]).lower()
+    return "".join(parts)
+
+
+def sql_tables(query: str) -> Set[str]:
+    """Return the (unqualified, lower-cased) table names referenced by a SQL query."""
+    tables = set()
+    for match in _SQL_TABLE.finditer(query):
+        name = match.group(1).split(".")[-1].strip()
+        if name.startswith('"'):
+            tables.add(name.strip('"').replace('""', '"'))
+        else:
+            tables.add(name.lower())
+    return tables
+
+
+def approx_size(value: Any) -> int:
+    """Estimate the memory footprint of a query result in bytes."""
+    if isinstance(value, np.ndarray):
+        size = value.nbytes
+        if value.dtype == object:
+            size += sum(approx_size(item) for item in value.flat)
+        return size
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(approx_size(k) + approx_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(approx_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+def detach(value: Any, read_only: bool = False) -> Any:
+    """Copy a query result so that changing the copy cannot change the original.
+
+    Dicts, lists and tuples are copied recursively, and NumPy arrays are copied (object
+    arrays with their items); with `read_only`, the array copies cannot be written to.
+    """
+    if isinstance(value, np.ndarray):
+        array = value.copy()
+        if value.dtype == object:
+            for i, item in enumerate(array.flat):
+                array.flat[i] = detach(item, read_only)
+        if read_only:
+            array.setflags(write=False)
+        return array
+    if isinstance(value, dict):
+        return {key: detach(item, read_only) for key, item in value.items()}
+    if isinstance(value, list):
+        return [detach(item, read_only) for item in value]
+    if isinstance(value, tuple):
+        return tuple(detach(item, read_only) for item in value)
+    return value
+
+
+class QueryResultCache:
+    """Thread-safe LRU cache of query results with a TTL and a size limit in bytes.
+
+    Entries are tagged with the database and the tables / collections they read,
+    so a write can drop exactly the results it may have made stale.
+    Results are stored as a read-only copy and handed out as copies, writable like
+    the result of the query itself, so a caller changing its result cannot change the cache.
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 64 * 1024 * 1024, ttl: float = 300.0):
+        """Initialize the cache.
+
+        Args:
+            max_entries (int): Maximum number of cached results
+            max_bytes (int): Maximum estimated size of all cached results
+            ttl (float): Seconds a result stays valid. 0 disables the cache.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float, int, str, Set[str]]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_entries > 0 and self.max_bytes > 0
+
+    @staticmethod
+    def make_key(database: str, query: Any, params: Any = None, **options: Any) -> Hashable:
+        """Build a cache key from the database, the query, its parameters and any result options."""
+        if isinstance(query, str):
+            query = normalize_sql(query)
+        else:
+            query = json.dumps(query, sort_keys=True, default=str)
+        return (
+            database,
+            query,
+            json.dumps(params, sort_keys=True, default=str),
+            json.dumps(options, sort_keys=True, default=str),
+        )
+
+    def _drop(self, key: Hashable) -> None:
+        _, _, size, _, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached result for `key`, or None on a miss."""
+        if not self.enabled:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            if entry[1] <= time.monotonic():
+                self._drop(key)
+                self._counters["expirations"] += 1
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+        return detach(entry[0])
+
+    def put(self, key: Hashable, value: Any, database: str, tags: Iterable[str]) -> None:
+        """Cache a result read from the `tags` tables / collections of `database`."""
+        if not self.enabled:
+            return
+        size = approx_size(value)
+        if size > self.max_bytes:
+            return
+        # The caller keeps using `value`: the cache holds its own, read-only copy
+        value = detach(value, read_only=True)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, time.monotonic() + self.ttl, size, database, set(tags))
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self._counters["evictions"] += 1
+
+    def invalidate(self, database: str, tags: Optional[Iterable[str]] = None) -> int:
+        """Drop the results of `database` that read any of `tags` (all of them if `tags` is None).
+
+        Returns:
+            Number of dropped entries
+        """
+        tags = None if tags is None else set(tags)
+        with self._lock:
+            stale = [
+                key for key, (_, _, _, entry_database, entry_tags) in self._entries.items()
+                if entry_database == database and (tags is None or not entry_tags or entry_tags & tags)
+            ]
+            for key in stale:
+                self._drop(key)
+            self._counters["invalidations"] += len(stale)
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the hit/miss counters and the current size of the cache."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats.update({
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl": self.ttl,
+            })
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+# Shared by every database tool instance in the process
+query_cache = QueryResultCache(
+    max_entries=int(os.environ.get("QUERY_CACHE_MAX_ENTRIES", "512")),
+    max_bytes=int(os.environ.get("QUERY_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    ttl=float(os.environ.get("QUERY_CACHE_TTL", "300")),
+)
+
+
+# Called as `listener(source, tables)` after every write through a database tool, where
+# `source` is the tool and `tables` the written tables / collections (None if unknown)
+WriteListener = Callable[[Any, Optional[Set[str]]], None]
+_write_listeners: List[WriteListener] = []
+
+
+def add_write_listener(listener: WriteListener) -> None:
+    """Subscribe to the writes of the database tools. Listeners must be cheap and must not raise."""
+    if listener not in _write_listeners:
+        _write_listeners.append(listener)
+
+
+def remove_write_listener(listener: WriteListener) -> None:
+    if listener in _write_listeners:
+        _write_listeners.remove(listener)
+
+
+def notify_write(source: Any, tables: Optional[Iterable[str]]) -> None:
+    """Announce a write to `tables` (all tables if None) made by the `source` tool."""
+    tables = None if tables is None else set(tables)
+    for listener in list(_write_listeners):
+        listener(source, tables)
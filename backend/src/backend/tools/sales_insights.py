@@ -0,0 +1,379 @@
+"""`backend.tools.sales_insights` module.
+
+Materialized sales aggregates of every client in `databases/consulting_database`:
+revenue by month and year, per-customer totals and the price distribution.
+
+The aggregates are built once from the client's sales CSV and then kept up to date
+incrementally: rows appended to the CSV are read from the last consumed offset, and
+rows inserted through the database tools into a table / collection named like the
+CSV (e.g. `sales`, `sales_client2`) are fetched past the highest sale id seen.
+A database that fails to answer is retried with an exponential backoff, from
+`SALES_INSIGHTS_RETRY_DELAY` up to `SALES_INSIGHTS_MAX_RETRY_DELAY` seconds.
+"""
+
+import csv
+import io
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from smolagents import Tool
+
+from backend.tools.local_data import DATA_DIR
+from backend.tools.result_cache import add_write_listener
+
+logger = logging.getLogger(__name__)
+
+RETRY_DELAY: float = float(os.environ.get("SALES_INSIGHTS_RETRY_DELAY", "5"))
+MAX_RETRY_DELAY: float = float(os.environ.get("SALES_INSIGHTS_MAX_RETRY_DELAY", "300"))
+
+METRICS = ("summary", "revenue_by_month", "revenue_by_year", "top_customers", "customers", "price_distribution")
+
+# Bytes before the consumed offset that must be unchanged for an append to be read incrementally
+_TAIL_BYTES = 4096
+
+
+class ClientSales:
+    """Aggregates of one client's sales, updated row by row."""
+
+    def __init__(self, client: str, sales_path: Path, customers_path: Path):
+        self.client = client
+        self.sales_path = sales_path
+        self.customers_path = customers_path
+        # Database table / collection mirroring the CSV
+        self.table = sales_path.stem.lower()
+
+        self._lock = threading.Lock()
+        self._pending: Dict[int, Any] = {}
+        # source key -> (consecutive failures, monotonic time before which it is not retried)
+        self._failures: Dict[int, Tuple[int, float]] = {}
+        self._customer_names: Dict[int, Dict[str, str]] = {}
+        self._customers_signature: Optional[Tuple[int, int]] = None
+        self._reset()
+
+    def _reset(self) -> None:
+        # period -> [sales, revenue, min price, max price]
+        self.months: Dict[str, List[float]] = {}
+        self.years: Dict[str, List[float]] = {}
+        # customer id -> [sales, revenue, first date, last date]
+        self.customers: Dict[int, List[Any]] = {}
+        self.prices: List[float] = []
+        self.seen_ids: Set[int] = set()
+        self.max_id = -1
+        self._prices_array: Optional[np.ndarray] = None
+        self._csv_signature: Optional[Tuple[int, int]] = None
+        self._header: Optional[List[str]] = None
+        self._offset = 0
+        self._tail = b""
+        self._db_sources: Dict[int, Any] = {}
+
+    def add(self, row: Dict[str, Any]) -> bool:
+        """Fold one sale into the aggregates; sales already seen (by id) are ignored."""
+        sale_id = int(row["id"])
+        if sale_id in self.seen_ids:
+            return False
+        self.seen_ids.add(sale_id)
+        self.max_id = max(self.max_id, sale_id)
+
+        date = str(row["date"])[:10]
+        price = float(row["price"])
+        for table, period in ((self.months, date[:7]), (self.years, date[:4])):
+            bucket = table.setdefault(period, [0, 0.0, price, price])
+            bucket[0] += 1
+            bucket[1] += price
+            bucket[2] = min(bucket[2], price)
+            bucket[3] = max(bucket[3], price)
+
+        customer = self.customers.setdefault(int(row["client_id"]), [0, 0.0, date, date])
+        customer[0] += 1
+        customer[1] += price
+        customer[2] = min(customer[2], date)
+        customer[3] = max(customer[3], date)
+
+        self.prices.append(price)
+        self._prices_array = None
+        return True
+
+    def on_write(self, source: Any) -> None:
+        """Remember that `source` wrote to this client's sales table; caught up on the next read."""
+        with self._lock:
+            self._pending[id(source)] = source
+            # The write went through, so the source is worth asking again right away
+            self._failures.pop(id(source), None)
+
+    def refresh(self) -> None:
+        """Bring the aggregates up to date with the CSV and the pending database writes."""
+        with self._lock:
+            self._refresh_csv()
+            self._refresh_customers()
+            now = time.monotonic()
+            pending, self._pending = self._pending, {}
+            for key, source in pending.items():
+                self._db_sources[key] = source
+                failures, retry_at = self._failures.get(key, (0, 0.0))
+                if now < retry_at:
+                    self._pending[key] = source
+                    continue
+                try:
+                    for row in source.rows_after(self.table, "id", self.max_id):
+                        self.add(row)
+                    self._failures.pop(key, None)
+                except Exception as e:
+                    # Database unreachable, or the table cannot be read: retry later, less and less often
+                    if not failures:
+                        logger.warning("Cannot read the new rows of %s for %s from %s: %s", self.table, self.client, type(source).__name__, e)
+                    self._failures[key] = (failures + 1, now + min(MAX_RETRY_DELAY, RETRY_DELAY * 2 ** failures))
+                    self._pending[key] = source
+
+    def _refresh_csv(self) -> None:
+        stat = self.sales_path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._csv_signature:
+            return
+
+        with open(self.sales_path, "rb") as f:
+            if self._header is not None and stat.st_size >= self._offset:
+                f.seek(self._offset - len(self._tail))
+                if f.read(len(self._tail)) == self._tail:
+                    # Appended (or only touched): read the new complete lines only
+                    self._consume(f.read(), self._header)
+                    self._csv_signature = signature
+                    return
+
+            # First load, or the file was rewritten: rebuild, then replay the database rows
+            db_sources = self._db_sources
+            self._reset()
+            content = f.read()
+            header_end = content.find(b"\n") + 1
+            self._header = next(csv.reader([content[:header_end].decode("utf-8-sig")]))
+            self._offset = header_end
+            self._consume(content[header_end:], self._header)
+            self._pending.update(db_sources)
+            self._csv_signature = signature
+
+    def _consume(self, data: bytes, header: List[str]) -> None:
+        """Fold the complete lines of `data`, read from the current offset, into the aggregates."""
+        end = data.rfind(b"\n") + 1
+        if end == 0:
+            return
+        for row in csv.DictReader(io.StringIO(data[:end].decode("utf-8")), fieldnames=header):
+            if row.get("id"):
+                self.add(row)
+        self._offset += end
+        with open(self.sales_path, "rb") as f:
+            start = max(0, self._offset - _TAIL_BYTES)
+            f.seek(start)
+            self._tail = f.read(self._offset - start)
+
+    def _refresh_customers(self) -> None:
+        stat = self.customers_path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._customers_signature:
+            return
+        with open(self.customers_path, newline="", encoding="utf-8-sig") as f:
+            self._customer_names = {
+                int(row["client_id"]): {key: value for key, value in row.items() if key != "client_id"}
+                for row in csv.DictReader(f)
+            }
+        self._customers_signature = signature
+
+    def _periods(self, table: Dict[str, List[float]], start: str = None, end: str = None) -> Dict[str, Any]:
+        rows = []
+        totals = [0, 0.0]
+        for period in sorted(table):
+            if (start and period[:len(start)] < start) or (end and period[:len(end)] > end):
+                continue
+            sales, revenue, low, high = table[period]
+            rows.append({
+                "period": period,
+                "sales": sales,
+                "revenue": round(revenue, 2),
+                "average_price": round(revenue / sales, 2),
+                "min_price": low,
+                "max_price": high,
+            })
+            totals[0] += sales
+            totals[1] += revenue
+        return {
+            "periods": rows,
+            "total": {
+                "sales": totals[0],
+                "revenue": round(totals[1], 2),
+                "average_price": round(totals[1] / totals[0], 2) if totals[0] else None,
+            },
+        }
+
+    def _customer_rows(self, top_n: Optional[int] = None) -> List[Dict[str, Any]]:
+        ranked = sorted(self.customers.items(), key=lambda item: item[1][1], reverse=True)
+        if top_n is not None:
+            ranked = ranked[:top_n]
+        return [
+            {
+                "client_id": customer_id,
+                **self._customer_names.get(customer_id, {}),
+                "sales": sales,
+                "revenue": round(revenue, 2),
+                "average_price": round(revenue / sales, 2),
+                "first_sale": first,
+                "last_sale": last,
+            }
+            for customer_id, (sales, revenue, first, last) in ranked
+        ]
+
+    def _price_distribution(self) -> Dict[str, Any]:
+        if self._prices_array is None:
+            self._prices_array = np.asarray(self.prices, dtype=np.float64)
+        prices = self._prices_array
+        if not len(prices):
+            return {"count": 0}
+        p25, median, p75, p90 = np.percentile(prices, [25, 50, 75, 90])
+        counts, edges = np.histogram(prices, bins=10)
+        return {
+            "count": int(len(prices)),
+            "mean": round(float(prices.mean()), 2),
+            "std": round(float(prices.std()), 2),
+            "min": float(prices.min()),
+            "p25": round(float(p25), 2),
+            "median": round(float(median), 2),
+            "p75": round(float(p75), 2),
+            "p90": round(float(p90), 2),
+            "max": float(prices.max()),
+            "histogram": [
+                {"from": round(float(low), 2), "to": round(float(high), 2), "sales": int(count)}
+                for low, high, count in zip(edges[:-1], edges[1:], counts)
+            ],
+        }
+
+    def query(self, metric: str, start: str = None, end: str = None, top_n: int = None) -> Any:
+        """Answer one metric from the aggregates, refreshing them first."""
+        self.refresh()
+        with self._lock:
+            if metric == "revenue_by_month":
+                return self._periods(self.months, start, end)
+            if metric == "revenue_by_year":
+                return self._periods(self.years, start, end)
+            if metric == "top_customers":
+                return self._customer_rows(top_n or 5)
+            if metric == "customers":
+                return self._customer_rows()
+            if metric == "price_distribution":
+                return self._price_distribution()
+
+            revenue = sum(bucket[1] for bucket in self.years.values())
+            count = len(self.prices)
+            best = self._customer_rows(1)
+            return {
+                "sales": count,
+                "revenue": round(revenue, 2),
+                "average_price": round(revenue / count, 2) if count else None,
+                "first_sale": min(self.months) if self.months else None,
+                "last_sale": max(self.months) if self.months else None,
+                "customers": len(self.customers),
+                "best_customer": best[0] if best else None,
+                "years": self._periods(self.years)["periods"],
+            }
+
+
+class SalesInsights:
+    """Registry of the clients' aggregates, discovered from the consulting database folders."""
+
+    def __init__(self, data_dir: Path = DATA_DIR):
+        self.data_dir = data_dir
+        self._clients: Dict[str, ClientSales] = {}
+        self._lock = threading.Lock()
+
+    def clients(self) -> Dict[str, ClientSales]:
+        """Return the clients that have a client list and a sales CSV, by folder name."""
+        with self._lock:
+            for directory in sorted(path for path in self.data_dir.iterdir() if path.is_dir()):
+                customers_path = directory / "client_list.csv"
+                sales_paths = sorted(directory.glob("sales*.csv"))
+                if directory.name not in self._clients and customers_path.exists() and sales_paths:
+                    self._clients[directory.name] = ClientSales(directory.name, sales_paths[0], customers_path)
+            return dict(self._clients)
+
+    def get(self, client: str) -> ClientSales:
+        clients = self.clients()
+        if client not in clients:
+            raise ValueError(f"Unknown client: {client}. Known clients: {', '.join(clients)}")
+        return clients[client]
+
+    def on_write(self, source: Any, tables: Optional[Set[str]]) -> None:
+        """Write listener: flag the clients whose sales table was written (all of them if unknown)."""
+        if not hasattr(source, "rows_after"):
+            return
+        for client in self.clients().values():
+            if tables is None or client.table in tables:
+                client.on_write(source)
+
+
+# Shared by every SalesInsightsTool instance, and kept current by the database tools' writes
+sales_insights = SalesInsights()
+add_write_listener(sales_insights.on_write)
+
+
+class SalesInsightsTool(Tool):
+    name = "sales_insights"
+    description = (
+        "Answers questions about a client's own sales from precomputed aggregates, without querying "
+        "raw sales rows: overall summary (including the best customer), revenue and average price by "
+        "month or year over a period, top customers by revenue, per-customer totals and the price distribution."
+    )
+    inputs = {
+        "client": {
+            "type": "string",
+            "description": "The client asking, for example 'client1'",
+        },
+        "metric": {
+            "type": "string",
+            "description": (
+                "One of 'summary', 'revenue_by_month', 'revenue_by_year', 'top_customers', 'customers' "
+                "or 'price_distribution'"
+            ),
+        },
+        "start": {
+            "type": "string",
+            "description": "First period included for the revenue metrics, 'YYYY' or 'YYYY-MM'",
+            "required": False,
+            "nullable": True
+        },
+        "end": {
+            "type": "string",
+            "description": "Last period included for the revenue metrics, 'YYYY' or 'YYYY-MM'",
+            "required": False,
+            "nullable": True
+        },
+        "top_n": {
+            "type": "integer",
+            "description": "Number of customers for 'top_customers' (default 5)",
+            "required": False,
+            "nullable": True
+        }
+    }
+    output_type = "object"
+
+    def __init__(self, insights: SalesInsights = None):
+        super().__init__()
+        self.insights = insights or sales_insights
+
+    def forward(self, client: str, metric: str, start: str = None, end: str = None, top_n: int = None) -> Dict[str, Any]:
+        """
+        Returns the requested metric of the client's sales.
+
+        Returns:
+            Dict containing:
+                - success (bool): Whether the metric was computed
+                - data (Dict | List[Dict]): The metric; period metrics include a `total` over the range
+                - error (str): Error message if the request failed
+        """
+        try:
+            if metric not in METRICS:
+                raise ValueError(f"Unsupported metric: {metric}. Use one of {', '.join(METRICS)}")
+            data = self.insights.get(client).query(metric, start=start, end=end, top_n=top_n)
+            return {"success": True, "data": data, "error": None}
+        except (ValueError, OSError) as e:
+            return {"success": False, "data": None, "error": str(e)}
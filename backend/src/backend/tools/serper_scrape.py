@@ -1,12 +1,14 @@
 """`backend.tools.google_search` module."""
 
 import os
-import json
-from typing import Dict, Any
+from typing import Dict, Any, List
 
-import requests
 from smolagents import Tool
 
+from backend.lazy import lazy_attributes
+from backend.tools.http_client import BATCH_CONCURRENCY, map_concurrently, post, response_text
+from backend.tools.web_cache import cached, normalize_url
+
 
 class SerperScrape(Tool):
     name = "serper_scrape"
@@ -21,20 +23,71 @@ class SerperScrape(Tool):
 
     def __init__(self):
         super().__init__()
-        self.url = "https://scrape.serper.dev"
+        # Overridable to point the tool at a local stand-in of the API
+        self.url = os.environ.get("SERPER_SCRAPE_URL", "https://scrape.serper.dev")
         self.headers = {
             'X-API-KEY': os.environ["SERPER_API"],
             'Content-Type': 'application/json'
         }
 
     def forward(self, url: str) -> str:
-        """Executes the Serper.dev website scrape."""
-        payload = json.dumps({
+        """Executes the Serper.dev website scrape, or returns the cached scrape of the same page.
+
+        Raises:
+            requests.HTTPError: If the API answers with an error status
+        """
+        payload = {
             "url": url,
             "includeMarkdown": True
-        })
+        }
+
+        def fetch():
+            response = post(self.url, headers=self.headers, json=payload)
+            return response_text(response), True
+
+        # Identical pages under different URLs share their markdown; metadata and credits stay per URL
+        return cached(self.name, normalize_url(url), fetch, content_field="markdown")
+
+
+class SerperBatchScrape(Tool):
+    name = "serper_scrape_batch"
+    description = (
+        "Scrapes several websites at once with the Serper.dev API, running the scrapes concurrently. "
+        "Prefer it to successive serper_scrape calls."
+    )
+    inputs = {
+        "urls": {
+            "type": "array",
+            "description": "The URLs or website names to scrape."
+        },
+    }
+    output_type = "array"
+
+    def __init__(self, scrape: Tool = None, max_workers: int = BATCH_CONCURRENCY):
+        """Initialize the tool.
+
+        Args:
+            scrape (Tool, optional): Tool scraping a single website. Defaults to a new `SerperScrape`.
+            max_workers (int): Maximum number of scrapes running at once
+        """
+        super().__init__()
+        self.scrape = scrape or SerperScrape()
+        self.max_workers = max_workers
+
+    def forward(self, urls: List[str]) -> List[Dict[str, Any]]:
+        """
+        Executes the scrapes concurrently. A failing scrape does not affect the others.
+
+        Returns:
+            One dict per URL, in order, containing:
+                - url (str): The scraped URL
+                - success (bool): Whether the scrape succeeded
+                - data (str): The scraped content
+                - error (str): Error message if the scrape failed
+        """
+        results = map_concurrently(lambda url: self.scrape(url=url), urls, self.max_workers)
+        return [{"url": url, **result} for url, result in zip(urls, results)]
+
 
-        response = requests.request("POST", self.url, headers=self.headers, data=payload)
-        return response.text
-    
-serper_scrape = SerperScrape()
+# Built on first access, so that importing this module reads no API key
+__getattr__ = lazy_attributes(__name__, {"serper_scrape": lambda module: SerperScrape()})
@@ -0,0 +1,67 @@
+"""`backend.tools.streamlit_bootstrap` module.
+
+Entry point of a pre-warmed Streamlit worker:
+`python streamlit_bootstrap.py PORT POINTER_FILE`.
+
+It imports the libraries dashboards use before starting the Streamlit server in this
+same process, so a dashboard's first run finds them in `sys.modules`. The server runs
+the host script, which runs whichever dashboard the pointer file names. While a page
+is open on the server, the pointer file is touched every `HEARTBEAT_INTERVAL` seconds,
+so the manager does not take the dashboard for idle.
+"""
+
+import importlib
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+PRELOAD = ("pandas", "numpy", "pyarrow", "plotly.express", "plotly.graph_objects", "altair")
+
+HOST_SCRIPT = Path(__file__).with_name("streamlit_host.py")
+HEARTBEAT_INTERVAL = 30.0
+
+
+def heartbeat(pointer: str) -> None:
+    """Touch the pointer file every `HEARTBEAT_INTERVAL` seconds while a browser session is connected."""
+    from streamlit.runtime import Runtime
+
+    while True:
+        time.sleep(HEARTBEAT_INTERVAL)
+        try:
+            if Runtime.exists() and Runtime.instance()._session_mgr.num_active_sessions():
+                os.utime(pointer)
+        except Exception:
+            # The session manager is not public API: the dashboard runs still count as activity
+            return
+
+
+def main() -> None:
+    port, pointer = sys.argv[1], sys.argv[2]
+    # Lets dashboards import `backend.dashboard_data` even when the backend is not installed
+    source_dir = str(Path(__file__).resolve().parents[2])
+    if source_dir not in sys.path:
+        sys.path.append(source_dir)
+    for module in PRELOAD:
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass
+
+    from streamlit.web import cli
+
+    threading.Thread(target=heartbeat, args=(pointer,), daemon=True).start()
+    sys.argv = [
+        "streamlit", "run", str(HOST_SCRIPT),
+        "--server.port", port,
+        "--server.headless", "true",
+        "--server.fileWatcherType", "none",
+        "--browser.gatherUsageStats", "false",
+        "--", pointer,
+    ]
+    sys.exit(cli.main())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+"""`backend.tools.streamlit_host` module.
+
+Script served by every Streamlit worker: runs the dashboard named in the pointer file
+given as its argument. Pointing the file at another dashboard swaps the app without
+restarting the worker; the next page load runs it. Each run touches the pointer file,
+marking the worker as active.
+"""
+
+import os
+import runpy
+import sys
+from pathlib import Path
+
+pointer = Path(sys.argv[1])
+# Each run is activity: the manager stops the workers whose pointer file is left untouched
+os.utime(pointer)
+target = Path(pointer.read_text().strip())
+if str(target.parent) not in sys.path:
+    sys.path.insert(0, str(target.parent))
+runpy.run_path(str(target), run_name="__main__")
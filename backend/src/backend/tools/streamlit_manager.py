@@ -0,0 +1,303 @@
+"""`backend.tools.streamlit_manager` module.
+
+Serves the generated Streamlit dashboards from long-lived worker processes.
+
+Workers are started ahead of time (`STREAMLIT_WARM_WORKERS` of them wait idle) with
+pandas and plotly already imported, each on a free port, and are only handed out once
+their `/_stcore/health` endpoint answers. Deploying a dashboard points a worker at the
+script, so it goes live as soon as the pointer file is written; deploying the same
+script again reuses its worker. At most `STREAMLIT_MAX_APPS` dashboards are served at
+once, the least recently active being stopped beyond that, and dashboards neither
+redeployed nor viewed for `STREAMLIT_IDLE_TIMEOUT` seconds are stopped (checked in
+the background). A worker records its activity by touching its pointer file while
+a page is open on it and whenever the dashboard runs.
+"""
+
+import itertools
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from backend.paths import cache_path
+
+WARM_WORKERS: int = int(os.environ.get("STREAMLIT_WARM_WORKERS", "1"))
+MAX_APPS: int = int(os.environ.get("STREAMLIT_MAX_APPS", "4"))
+IDLE_TIMEOUT: float = float(os.environ.get("STREAMLIT_IDLE_TIMEOUT", "1800"))
+READY_TIMEOUT: float = float(os.environ.get("STREAMLIT_READY_TIMEOUT", "60"))
+
+BOOTSTRAP = Path(__file__).with_name("streamlit_bootstrap.py")
+
+
+def stop_in_background(workers: List["StreamlitWorker"]) -> None:
+    """Stop the workers without making the caller wait for their processes to exit."""
+    if workers:
+        threading.Thread(target=lambda: [worker.stop() for worker in workers], daemon=True).start()
+
+
+def free_port() -> int:
+    """Return a port nothing listens on (the OS picks it)."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("", 0))
+        return sock.getsockname()[1]
+
+
+def port_in_use(port: int) -> bool:
+    """Whether something listens on `port` (binding like the Streamlit server does, with SO_REUSEADDR)."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            sock.bind(("", port))
+        except OSError:
+            return True
+        return False
+
+
+class StreamlitWorker:
+    """A Streamlit server process serving the dashboard its pointer file names."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, port: Optional[int] = None, directory: Optional[Path] = None):
+        """Start the worker process. It is ready once `wait_ready()` returns True.
+
+        Args:
+            port (int, optional): Port to serve on. Defaults to a free port.
+            directory (Path, optional): Where the pointer and log files go. Defaults to the backend cache directory.
+        """
+        self.id = next(self._ids)
+        self.port = port or free_port()
+        directory = directory or cache_path("streamlit")
+        directory.mkdir(parents=True, exist_ok=True)
+        self.pointer = directory / f"worker-{os.getpid()}-{self.id}.target"
+        self.pointer.write_text("")
+        self.log_path = directory / f"worker-{os.getpid()}-{self.id}.log"
+        self.script: Optional[Path] = None
+        self.deployed_at = 0.0
+        # Output goes to a file rather than a pipe nobody reads, which would eventually block the server
+        with open(self.log_path, "ab") as log:
+            self.process = subprocess.Popen(
+                [sys.executable, str(BOOTSTRAP), str(self.port), str(self.pointer)],
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                stdin=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+        self._ready = False
+
+    @property
+    def url(self) -> str:
+        return f"http://localhost:{self.port}"
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def wait_ready(self, timeout: float = READY_TIMEOUT) -> bool:
+        """Poll the health endpoint until it answers "ok", the process exits or `timeout` elapses."""
+        if self._ready:
+            return self.alive()
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and self.alive():
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{self.port}/_stcore/health", timeout=1) as response:
+                    if response.status == 200:
+                        # A server that is not ours may answer on the port while our process fails to bind it
+                        self._ready = self.alive()
+                        return self._ready
+            except OSError:
+                pass
+            time.sleep(0.05)
+        return False
+
+    def deploy(self, script: Path) -> None:
+        """Serve `script` from now on: pages loaded from now run it."""
+        tmp = self.pointer.with_suffix(".tmp")
+        tmp.write_text(str(script))
+        os.replace(tmp, self.pointer)
+        self.script = script
+        self.deployed_at = time.time()
+
+    def last_active(self) -> float:
+        """Time of the last deployment or page activity (the pointer file's modification time)."""
+        try:
+            return max(self.deployed_at, self.pointer.stat().st_mtime)
+        except OSError:
+            return self.deployed_at
+
+    def log_tail(self, size: int = 2000) -> str:
+        try:
+            return self.log_path.read_text(errors="replace")[-size:]
+        except OSError:
+            return ""
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Terminate the worker's process group, killing it if it does not exit in `timeout` seconds."""
+        if self.alive():
+            try:
+                os.killpg(self.process.pid, signal.SIGTERM)
+                self.process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                os.killpg(self.process.pid, signal.SIGKILL)
+                self.process.wait()
+            except ProcessLookupError:
+                pass
+        else:
+            self.process.wait()
+        for path in (self.pointer, self.log_path):
+            path.unlink(missing_ok=True)
+
+
+class StreamlitManager:
+    """Pool of warm workers plus the workers serving dashboards, by script."""
+
+    def __init__(self, warm_workers: int = WARM_WORKERS, max_apps: int = MAX_APPS, idle_timeout: float = IDLE_TIMEOUT):
+        """Initialize the manager. No worker is started until `warm()` or the first `deploy()`.
+
+        Args:
+            warm_workers (int): Number of idle, ready workers kept for the next dashboards
+            max_apps (int): Maximum number of dashboards served at once
+            idle_timeout (float): Seconds after which a dashboard not redeployed is stopped
+        """
+        self.warm_workers = warm_workers
+        self.max_apps = max(1, max_apps)
+        self.idle_timeout = idle_timeout
+        self.idle: List[StreamlitWorker] = []
+        self.apps: Dict[Path, StreamlitWorker] = {}
+        self._lock = threading.RLock()
+        self._closed = False
+        self._closing = threading.Event()
+        # Checks often enough to stop a dashboard within a quarter of the timeout after it goes idle
+        interval = min(60.0, max(1.0, idle_timeout / 4))
+        threading.Thread(target=self._evict_periodically, args=(interval,), daemon=True).start()
+
+    def _evict_periodically(self, interval: float) -> None:
+        while not self._closing.wait(interval):
+            self.evict_idle()
+
+    def warm(self) -> None:
+        """Start workers until `warm_workers` are idle (or starting), without waiting for them."""
+        with self._lock:
+            if self._closed:
+                return
+            self.idle = [worker for worker in self.idle if worker.alive()]
+            while len(self.idle) < self.warm_workers:
+                self.idle.append(StreamlitWorker())
+
+    def evict_idle(self) -> None:
+        """Stop the dashboards neither redeployed nor viewed for `idle_timeout` seconds, and the dead workers."""
+        now = time.time()
+        with self._lock:
+            stale = [
+                script for script, worker in self.apps.items()
+                if not worker.alive() or now - worker.last_active() > self.idle_timeout
+            ]
+            workers = [self.apps.pop(script) for script in stale]
+        stop_in_background(workers)
+
+    def deploy(self, script: Path, port: Optional[int] = None) -> StreamlitWorker:
+        """Serve `script` and return its worker, ready.
+
+        The script's current worker is reused if it has one; otherwise a warm worker is
+        taken (or one is started on `port` when a specific port is asked for, after
+        stopping the other dashboard's worker serving on it).
+
+        Raises:
+            RuntimeError: If the worker does not become ready, or `port` is used by another process
+        """
+        script = Path(script).resolve()
+        self.evict_idle()
+        if port is not None:
+            self._free_port(script, port)
+        evicted = []
+        with self._lock:
+            worker = self.apps.get(script)
+            if worker is not None and port is not None and worker.port != port:
+                evicted.append(self.apps.pop(script))
+                worker = None
+            if worker is None:
+                if port is None:
+                    self.idle = [idle for idle in self.idle if idle.alive()]
+                    worker = self.idle.pop(0) if self.idle else StreamlitWorker()
+                else:
+                    worker = StreamlitWorker(port)
+                while len(self.apps) >= self.max_apps:
+                    oldest = min(self.apps, key=lambda s: self.apps[s].last_active())
+                    evicted.append(self.apps.pop(oldest))
+                self.apps[script] = worker
+            worker.deploy(script)
+        stop_in_background(evicted)
+
+        # Replace the worker just taken in the background, so that the next dashboard finds one warm
+        threading.Thread(target=self.warm, daemon=True).start()
+
+        if not worker.wait_ready():
+            with self._lock:
+                if self.apps.get(script) is worker:
+                    self.apps.pop(script)
+            tail = worker.log_tail()
+            worker.stop()
+            raise RuntimeError(f"Streamlit worker on port {worker.port} did not start: {tail}")
+        return worker
+
+    def _free_port(self, script: Path, port: int) -> None:
+        """Stop the workers, other than `script`'s, holding `port` and wait for them to exit.
+
+        Raises:
+            RuntimeError: If `port` is still used, by a process that is not one of our workers
+        """
+        with self._lock:
+            holders = [other for other, worker in self.apps.items() if worker.port == port and other != script]
+            workers = [self.apps.pop(other) for other in holders]
+            workers += [worker for worker in self.idle if worker.port == port]
+            self.idle = [worker for worker in self.idle if worker.port != port]
+            current = self.apps.get(script)
+        for worker in workers:
+            worker.stop()
+        if (current is None or current.port != port) and port_in_use(port):
+            raise RuntimeError(f"Port {port} is already in use")
+
+    def stop(self, script: Path) -> bool:
+        """Stop serving `script`. Returns whether it was served."""
+        with self._lock:
+            worker = self.apps.pop(Path(script).resolve(), None)
+        if worker is not None:
+            worker.stop()
+        return worker is not None
+
+    def close(self) -> None:
+        """Stop every worker."""
+        self._closing.set()
+        with self._lock:
+            self._closed = True
+            workers = [*self.idle, *self.apps.values()]
+            self.idle, self.apps = [], {}
+        for worker in workers:
+            worker.stop()
+
+
+_manager: Optional[StreamlitManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_manager() -> StreamlitManager:
+    """Return the process-wide manager, creating it on first use."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = StreamlitManager()
+        return _manager
+
+
+def close_all() -> None:
+    """Stop every worker started in this process."""
+    global _manager
+    with _manager_lock:
+        if _manager is not None:
+            _manager.close()
+            _manager = None
@@ -1,14 +1,16 @@
 import os
-import json
-from typing import Dict, Any
+import time
+from pathlib import Path
 
-import requests
 from smolagents import Tool
 
+from backend.tools.python_file import validate_source
+from backend.tools.streamlit_manager import get_manager
+
 
 class StreamlitRunnerTool(Tool):
     name = "streamlit_runner"
-    description = "Runs a Streamlit application from a Python file"
+    description = "Runs a Streamlit application from a Python file. Running the same file again updates the running app."
     inputs = {
         "filepath": {
             "type": "string",
@@ -16,17 +18,13 @@ class StreamlitRunnerTool(Tool):
         },
         "port": {
             "type": "integer",
-            "description": "Port to run the Streamlit app on",
-            "default": 8501,
+            "description": "Port to run the Streamlit app on. Defaults to a free port.",
             "nullable": True
         }
     }
     output_type = "string"
 
-    def forward(self, filepath: str, port: int = 8501) -> str:
-        import subprocess
-        import os
-        
+    def forward(self, filepath: str, port: int = None) -> str:
         # Verify file exists
         if not os.path.exists(filepath):
             return f"Error: File {filepath} does not exist"
@@ -34,31 +32,18 @@ class StreamlitRunnerTool(Tool):
         # Verify file is a Python file
         if not filepath.endswith('.py'):
             return f"Error: {filepath} is not a Python file"
+
+        # Reject code that cannot run before a worker is used for it (checked once per content)
+        with open(filepath) as f:
+            errors = validate_source(f.read(), filepath)
+        if errors:
+            return f"Error: {filepath} is invalid:\n" + "\n".join(errors)
         
         try:
-            # Construct the command
-            command = f"streamlit run {filepath} --server.port {port}"
-            
-            # Run the streamlit command in a subprocess
-            process = subprocess.Popen(
-                command,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
-            
-            # Wait a bit for the server to start
-            import time
-            time.sleep(2)
-            
-            # Check if process is running
-            if process.poll() is None:
-                return f"Streamlit app is running at http://localhost:{port}"
-            else:
-                _, error = process.communicate()
-                return f"Error starting Streamlit app: {error}"
-                
+            # Served by a warm worker (or the app's current one), returned once it answers its health check
+            start = time.perf_counter()
+            worker = get_manager().deploy(Path(filepath), port=port)
+            return f"Streamlit app is running at {worker.url} (live in {time.perf_counter() - start:.2f}s)"
         except Exception as e:
             return f"Failed to run Streamlit app: {str(e)}"
 
@@ -0,0 +1,291 @@
+"""`backend.tools.web_cache` module.
+
+On-disk cache of the web tools' responses (Google searches, page scrapes), so that a
+question asked again in another session does not pay for the same API calls.
+
+Responses are keyed on the tool and its normalized input (query or URL) and expire
+after a per-tool TTL, set by `WEB_CACHE_TTL_<TOOL>` in seconds (e.g.
+`WEB_CACHE_TTL_GOOGLE_SEARCH`). Bodies are stored zlib-compressed, once per distinct
+content (SHA-256). For JSON responses, a tool may name the field holding the content
+(the markdown of a page scrape), the rest of the response (metadata, credits) being
+kept per request, so identical pages reached through different URLs share their
+storage. The total stored size is capped by `WEB_CACHE_MAX_BYTES`, evicting the least
+recently used responses; `WEB_CACHE_ENABLED=0` turns the cache off.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from backend.paths import cache_path
+
+# Default time to live of the responses of each tool, in seconds
+DEFAULT_TTLS: Dict[str, float] = {
+    "google_search": 24 * 3600,
+    "serper_scrape": 7 * 24 * 3600,
+}
+DEFAULT_TTL: float = 24 * 3600
+
+# Query parameters that only track where a visit came from
+_TRACKING_PARAMETERS = re.compile(r"^(utm_.*|fbclid|gclid|mc_cid|mc_eid|ref)$")
+
+
+def normalize_query(query: str) -> str:
+    """Case and whitespace insensitive form of a search query."""
+    return " ".join(query.lower().split())
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL: https scheme by default, lowercase host, no fragment,
+    sorted query parameters without tracking ones, no trailing slash."""
+    url = url.strip()
+    if "://" not in url:
+        url = "https://" + url
+    parts = urlsplit(url)
+    query = urlencode(sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _TRACKING_PARAMETERS.match(name)
+    ))
+    netloc = parts.netloc.lower()
+    for default_port in (":80", ":443"):
+        if netloc.endswith(default_port):
+            netloc = netloc[: -len(default_port)]
+    return urlunsplit((parts.scheme.lower(), netloc, parts.path.rstrip("/") or "", query, ""))
+
+
+def split_content(body: str, field: str) -> Tuple[str, Optional[str]]:
+    """Split a JSON response into its `field`, the content, and the rest, the envelope (None if `field` is not a string)."""
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return body, None
+    if not isinstance(data, dict) or not isinstance(data.get(field), str):
+        return body, None
+    content, data[field] = data[field], None
+    return content, json.dumps(data, ensure_ascii=False)
+
+
+def ttl_for(tool: str) -> float:
+    """TTL of `tool`'s responses: `WEB_CACHE_TTL_<TOOL>`, else its default."""
+    value = os.environ.get(f"WEB_CACHE_TTL_{tool.upper()}")
+    return float(value) if value is not None else DEFAULT_TTLS.get(tool, DEFAULT_TTL)
+
+
+class WebCache:
+    """SQLite store of web responses, with per-entry expiry, content dedup and LRU eviction."""
+
+    def __init__(self, path: Path, max_bytes: int = 128 * 1024 * 1024):
+        """Initialize the cache, creating its tables if needed.
+
+        Args:
+            path (Path): SQLite database file
+            max_bytes (int): Maximum total size of the stored (compressed) bodies and envelopes
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS contents (
+                hash TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                tool TEXT NOT NULL,
+                request TEXT NOT NULL,
+                content_hash TEXT NOT NULL REFERENCES contents (hash),
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_used_at REAL NOT NULL,
+                content_field TEXT,
+                envelope BLOB,
+                envelope_size INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used_at);
+            CREATE INDEX IF NOT EXISTS responses_content ON responses (content_hash);
+            """
+        )
+        # Caches created before responses could keep their envelope apart
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(responses)")}
+        for column, definition in (
+            ("content_field", "TEXT"),
+            ("envelope", "BLOB"),
+            ("envelope_size", "INTEGER NOT NULL DEFAULT 0"),
+        ):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE responses ADD COLUMN {column} {definition}")
+
+    @staticmethod
+    def key(tool: str, request: str) -> str:
+        return hashlib.sha256(f"{tool}\n{request}".encode()).hexdigest()
+
+    def get(self, tool: str, request: str) -> Optional[str]:
+        """Return the cached body for the normalized `request` of `tool`, or None if missing or expired."""
+        key, now = self.key(tool, request), time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT c.body, r.expires_at, r.content_field, r.envelope FROM responses r "
+                "JOIN contents c ON c.hash = r.content_hash WHERE r.key = ?",
+                (key,),
+            ).fetchone()
+            if row is None or row[1] <= now:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET last_used_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        content = zlib.decompress(row[0]).decode()
+        if row[3] is None:
+            return content
+        data = json.loads(zlib.decompress(row[3]).decode())
+        data[row[2]] = content
+        return json.dumps(data, ensure_ascii=False)
+
+    def put(self, tool: str, request: str, body: str, ttl: Optional[float] = None, content_field: Optional[str] = None) -> None:
+        """Store a response, then evict the least recently used ones beyond `max_bytes`.
+
+        With `content_field`, only that field of the JSON response is deduplicated, the rest being stored with the response.
+        """
+        content, envelope = split_content(body, content_field) if content_field else (body, None)
+        compressed_envelope = zlib.compress(envelope.encode()) if envelope is not None else None
+        content_hash = hashlib.sha256(content.encode()).hexdigest()
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                if self._conn.execute("SELECT 1 FROM contents WHERE hash = ?", (content_hash,)).fetchone() is None:
+                    compressed = zlib.compress(content.encode())
+                    self._conn.execute(
+                        "INSERT INTO contents VALUES (?, ?, ?)", (content_hash, compressed, len(compressed))
+                    )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        self.key(tool, request), tool, request, content_hash,
+                        now, now + (ttl_for(tool) if ttl is None else ttl), now,
+                        content_field if envelope is not None else None,
+                        compressed_envelope, len(compressed_envelope or b""),
+                    ),
+                )
+                self._evict(now)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _evict(self, now: float) -> None:
+        """Drop expired responses and, past `max_bytes`, the least recently used ones; then orphan bodies."""
+        self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+        self._delete_orphans()
+        total = self._total_size()
+        if total > self.max_bytes:
+            # Evict down to 90% of the cap so that eviction does not run on every insert
+            excess = total - int(self.max_bytes * 0.9)
+            for key, content_hash, envelope_size in self._conn.execute(
+                "SELECT key, content_hash, envelope_size FROM responses ORDER BY last_used_at"
+            ).fetchall():
+                if excess <= 0:
+                    break
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                freed = envelope_size + self._delete_orphans(content_hash)
+                excess -= freed
+
+    def _total_size(self) -> int:
+        """Size of the stored bodies and envelopes."""
+        contents = self._conn.execute("SELECT coalesce(sum(size), 0) FROM contents").fetchone()[0]
+        return contents + self._conn.execute("SELECT coalesce(sum(envelope_size), 0) FROM responses").fetchone()[0]
+
+    def _delete_orphans(self, content_hash: Optional[str] = None) -> int:
+        """Delete the bodies no response refers to (only `content_hash` if given). Returns the bytes freed."""
+        condition = "NOT EXISTS (SELECT 1 FROM responses WHERE content_hash = contents.hash)"
+        params: Tuple[Any, ...] = ()
+        if content_hash is not None:
+            condition += " AND hash = ?"
+            params = (content_hash,)
+        freed = self._conn.execute(f"SELECT coalesce(sum(size), 0) FROM contents WHERE {condition}", params).fetchone()[0]
+        self._conn.execute(f"DELETE FROM contents WHERE {condition}", params)
+        return freed
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            responses = self._conn.execute("SELECT count(*) FROM responses").fetchone()[0]
+            contents = self._conn.execute("SELECT count(*) FROM contents").fetchone()[0]
+            size = self._total_size()
+        return {
+            "responses": responses,
+            "contents": contents,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "path": str(self.path),
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.execute("DELETE FROM contents")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_cache: Optional[WebCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> Optional[WebCache]:
+    """Return the process-wide cache, at `WEB_CACHE_PATH` (default: in the backend cache directory), or None if disabled."""
+    global _cache
+    if os.environ.get("WEB_CACHE_ENABLED", "1") == "0":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            path = os.environ.get("WEB_CACHE_PATH")
+            _cache = WebCache(
+                Path(path) if path else cache_path("web_cache.sqlite3"),
+                max_bytes=int(os.environ.get("WEB_CACHE_MAX_BYTES", str(128 * 1024 * 1024))),
+            )
+        return _cache
+
+
+def close_cache() -> None:
+    global _cache
+    with _cache_lock:
+        if _cache is not None:
+            _cache.close()
+            _cache = None
+
+
+def cached(tool: str, request: str, fetch: Callable[[], Tuple[str, bool]], content_field: Optional[str] = None) -> str:
+    """Return the cached response of `tool` for the normalized `request`, or fetch it.
+
+    Args:
+        tool (str): Name of the tool
+        request (str): Normalized input of the tool (see `normalize_query` / `normalize_url`)
+        fetch (Callable): Returns the response body and whether it may be cached (e.g. a 2xx status)
+        content_field (str, optional): Field of the JSON response deduplicated by content, the whole body if None
+    """
+    cache = get_cache()
+    if cache is not None:
+        body = cache.get(tool, request)
+        if body is not None:
+            return body
+    body, cacheable = fetch()
+    if cache is not None and cacheable:
+        cache.put(tool, request, body, content_field=content_field)
+    return body
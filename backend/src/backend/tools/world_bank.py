@@ -0,0 +1,385 @@
+"""`backend.tools.world_bank` module.
+
+Dense country x indicator x year store of the World Bank indicator exports
+(`API_<country>_DS2_*.csv` and their `Metadata_*` files) under `global_information`.
+
+The wide CSVs are parsed once into a float64 array (NaN for missing values), with
+interned indexes mapping country and indicator codes to array positions, so a
+series lookup is a dictionary lookup plus a slice. The array and the indexes are
+snapshotted to `.npy` / JSON files under the backend cache directory and reused
+while the source files are unchanged.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from smolagents import Tool
+
+from backend.paths import cache_path
+from backend.tools.local_data import DATA_DIR, file_sha256
+
+WORLD_BANK_DIR: Path = DATA_DIR / "global_information"
+TRANSFORMS = ("values", "growth_rate", "rolling_mean")
+
+_YEAR = re.compile(r"^\d{4}$")
+
+
+def growth_rate(values: np.ndarray) -> np.ndarray:
+    """Year-over-year growth in percent along the last axis; the first year and gaps are NaN."""
+    values = np.asarray(values, dtype=np.float64)
+    result = np.full(values.shape, np.nan)
+    previous = values[..., :-1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result[..., 1:] = np.where(previous != 0, (values[..., 1:] / previous - 1.0) * 100.0, np.nan)
+    return result
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over `window` years along the last axis, NaN unless the whole window is present."""
+    if window < 1:
+        raise ValueError(f"Invalid window: {window}")
+    values = np.asarray(values, dtype=np.float64)
+    present = ~np.isnan(values)
+    pad = [(0, 0)] * (values.ndim - 1) + [(1, 0)]
+    sums = np.pad(np.cumsum(np.where(present, values, 0.0), axis=-1), pad)
+    counts = np.pad(np.cumsum(present, axis=-1), pad)
+    result = np.full(values.shape, np.nan)
+    if values.shape[-1] >= window:
+        window_sums = sums[..., window:] - sums[..., :-window]
+        window_counts = counts[..., window:] - counts[..., :-window]
+        result[..., window - 1:] = np.where(window_counts == window, window_sums / window, np.nan)
+    return result
+
+
+def _read_rows(path: Path) -> List[Dict[str, str]]:
+    """Read a World Bank CSV (BOM-prefixed, trailing empty column) into row dicts."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return [{key: value for key, value in row.items() if key} for row in csv.DictReader(f)]
+
+
+class WorldBankStore:
+    """Indicator values of every `API_*.csv` export found in a directory, as one dense array."""
+
+    def __init__(self, directory: Path = WORLD_BANK_DIR):
+        self.directory = directory
+        self.values: Optional[np.ndarray] = None
+        self.years: List[int] = []
+        self.countries: List[str] = []
+        self.indicators: List[str] = []
+        self.country_index: Dict[str, int] = {}
+        self.indicator_index: Dict[str, int] = {}
+        self.country_metadata: Dict[str, Dict[str, str]] = {}
+        self.indicator_metadata: Dict[str, Dict[str, str]] = {}
+        self._signature: Optional[List[Tuple[str, int, int]]] = None
+        self._lock = threading.Lock()
+
+    def sources(self) -> List[Path]:
+        """Return the data files and their metadata files, in a stable order."""
+        return sorted(self.directory.glob("API_*.csv")) + sorted(self.directory.glob("Metadata_*_API_*.csv"))
+
+    def _stat_signature(self) -> List[Tuple[str, int, int]]:
+        signature = []
+        for path in self.sources():
+            stat = path.stat()
+            signature.append((path.name, stat.st_mtime_ns, stat.st_size))
+        return signature
+
+    def _snapshot_files(self) -> Tuple[Path, Path]:
+        key = hashlib.sha256(str(self.directory.resolve()).encode()).hexdigest()[:16]
+        return cache_path("world_bank", f"{key}.npy"), cache_path("world_bank", f"{key}.json")
+
+    def load(self) -> "WorldBankStore":
+        """Load the store, from memory, the `.npy` snapshot or the CSVs, in that order."""
+        signature = self._stat_signature()
+        with self._lock:
+            if self.values is not None and signature == self._signature:
+                return self
+            if not signature:
+                raise ValueError(f"No World Bank export found in {self.directory}")
+
+            array_path, index_path = self._snapshot_files()
+            if not self._load_snapshot(array_path, index_path, signature):
+                self._build()
+                self._save_snapshot(array_path, index_path, signature)
+            self._signature = signature
+            return self
+
+    def _load_snapshot(self, array_path: Path, index_path: Path, signature: List[Tuple[str, int, int]]) -> bool:
+        try:
+            with open(index_path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if not array_path.exists():
+            return False
+
+        stored = [tuple(source) for source in snapshot["sources"]]
+        if stored != signature:
+            # Only mtimes moved (e.g. a fresh checkout): the content hashes decide
+            if [(name, size) for name, _, size in stored] != [(name, size) for name, _, size in signature]:
+                return False
+            hashes = [file_sha256(self.directory / name) for name, _, _ in signature]
+            if hashes != snapshot["sha256"]:
+                return False
+            snapshot["sources"] = signature
+            self._write_index(index_path, snapshot)
+
+        self.values = np.load(array_path, mmap_mode="r")
+        self.years = snapshot["years"]
+        self.countries = snapshot["countries"]
+        self.indicators = snapshot["indicators"]
+        self.country_metadata = snapshot["country_metadata"]
+        self.indicator_metadata = snapshot["indicator_metadata"]
+        self.country_index = {code: i for i, code in enumerate(self.countries)}
+        self.indicator_index = {code: i for i, code in enumerate(self.indicators)}
+        return True
+
+    def _build(self) -> None:
+        """Parse the wide CSVs: one row per (country, indicator), one column per year."""
+        rows = []
+        for path in sorted(self.directory.glob("API_*.csv")):
+            rows.extend(_read_rows(path))
+
+        years = sorted({int(key) for row in rows for key in row if _YEAR.match(key)})
+        countries: Dict[str, int] = {}
+        indicators: Dict[str, int] = {}
+        country_metadata: Dict[str, Dict[str, str]] = {}
+        indicator_metadata: Dict[str, Dict[str, str]] = {}
+        for row in rows:
+            country = countries.setdefault(row["Country Code"], len(countries))
+            indicator = indicators.setdefault(row["Indicator Code"], len(indicators))
+            country_metadata.setdefault(row["Country Code"], {"name": row["Country Name"]})
+            indicator_metadata.setdefault(row["Indicator Code"], {"name": row["Indicator Name"]})
+            row["_position"] = (country, indicator)
+
+        values = np.full((len(countries), len(indicators), len(years)), np.nan)
+        year_columns = [str(year) for year in years]
+        for row in rows:
+            country, indicator = row["_position"]
+            values[country, indicator] = [float(row[year]) if row.get(year) else np.nan for year in year_columns]
+
+        for path in sorted(self.directory.glob("Metadata_Country_API_*.csv")):
+            for row in _read_rows(path):
+                if row["Country Code"] in country_metadata:
+                    country_metadata[row["Country Code"]].update({
+                        "region": row.get("Region", ""),
+                        "income_group": row.get("IncomeGroup", ""),
+                        "notes": row.get("SpecialNotes", ""),
+                    })
+        for path in sorted(self.directory.glob("Metadata_Indicator_API_*.csv")):
+            for row in _read_rows(path):
+                if row["INDICATOR_CODE"] in indicator_metadata:
+                    indicator_metadata[row["INDICATOR_CODE"]].update({
+                        "description": row.get("SOURCE_NOTE", ""),
+                        "source": row.get("SOURCE_ORGANIZATION", ""),
+                    })
+
+        self.values = values
+        self.years = years
+        self.countries = list(countries)
+        self.indicators = list(indicators)
+        self.country_index = countries
+        self.indicator_index = indicators
+        self.country_metadata = country_metadata
+        self.indicator_metadata = indicator_metadata
+
+    def _save_snapshot(self, array_path: Path, index_path: Path, signature: List[Tuple[str, int, int]]) -> None:
+        tmp_path = array_path.with_suffix(f".{os.getpid()}.tmp.npy")
+        np.save(tmp_path, self.values)
+        os.replace(tmp_path, array_path)
+        self._write_index(index_path, {
+            "sources": signature,
+            "sha256": [file_sha256(self.directory / name) for name, _, _ in signature],
+            "years": self.years,
+            "countries": self.countries,
+            "indicators": self.indicators,
+            "country_metadata": self.country_metadata,
+            "indicator_metadata": self.indicator_metadata,
+        })
+
+    @staticmethod
+    def _write_index(path: Path, snapshot: Dict[str, Any]) -> None:
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, path)
+
+    def _year_slice(self, start_year: Optional[int], end_year: Optional[int]) -> slice:
+        """Positions of the years in [start_year, end_year]; years are contiguous."""
+        first = self.years[0]
+        start = 0 if start_year is None else max(0, start_year - first)
+        stop = len(self.years) if end_year is None else max(0, min(len(self.years), end_year - first + 1))
+        return slice(start, stop)
+
+    def series(
+        self,
+        countries: Sequence[str],
+        indicators: Sequence[str],
+        start_year: int = None,
+        end_year: int = None,
+    ) -> Tuple[List[int], np.ndarray]:
+        """Return the years and the (countries, indicators, years) block of values.
+
+        Raises:
+            ValueError: If a country or indicator code is unknown
+        """
+        self.load()
+        try:
+            country_positions = [self.country_index[code.upper()] for code in countries]
+        except KeyError as e:
+            raise ValueError(f"Unknown country code: {e.args[0]}")
+        try:
+            indicator_positions = [self.indicator_index[code] for code in indicators]
+        except KeyError as e:
+            raise ValueError(f"Unknown indicator code: {e.args[0]}")
+
+        years = self._year_slice(start_year, end_year)
+        block = self.values[np.ix_(country_positions, indicator_positions)][..., years]
+        return self.years[years], block
+
+    def search(self, text: str, limit: int = 20) -> List[Dict[str, str]]:
+        """Find indicators whose code or name contains every word of `text`, with their coverage."""
+        self.load()
+        words = text.lower().split()
+        matches = []
+        for code in self.indicators:
+            name = self.indicator_metadata[code]["name"]
+            haystack = f"{code} {name}".lower()
+            if all(word in haystack for word in words):
+                present = ~np.isnan(self.values[:, self.indicator_index[code]]).all(axis=0)
+                covered = [year for year, ok in zip(self.years, present) if ok]
+                matches.append({
+                    "code": code,
+                    "name": name,
+                    "years": f"{covered[0]}-{covered[-1]}" if covered else "no data",
+                })
+                if len(matches) >= limit:
+                    break
+        return matches
+
+
+# Shared by every WorldBankTool instance in the process
+world_bank_store = WorldBankStore()
+
+
+class WorldBankTool(Tool):
+    name = "world_bank_indicators"
+    description = (
+        "Looks up World Bank development indicators (economy, population, environment, health...) "
+        "by country and year from a preloaded local copy. Use `search` to find indicator codes, then "
+        "request a series, optionally as year-over-year growth rates or a rolling mean."
+    )
+    inputs = {
+        "search": {
+            "type": "string",
+            "description": "Keywords to find indicator codes, for example 'gdp per capita'. Ignores the other inputs",
+            "required": False,
+            "nullable": True
+        },
+        "indicators": {
+            "type": "array",
+            "description": "Indicator codes, for example ['NY.GDP.PCAP.CD']",
+            "required": False,
+            "nullable": True
+        },
+        "countries": {
+            "type": "array",
+            "description": "ISO3 country codes, for example ['NOR']. Defaults to every loaded country",
+            "required": False,
+            "nullable": True
+        },
+        "start_year": {
+            "type": "integer",
+            "description": "First year of the series",
+            "required": False,
+            "nullable": True
+        },
+        "end_year": {
+            "type": "integer",
+            "description": "Last year of the series",
+            "required": False,
+            "nullable": True
+        },
+        "transform": {
+            "type": "string",
+            "description": "'values' (default), 'growth_rate' (year-over-year, in percent) or 'rolling_mean'",
+            "required": False,
+            "nullable": True
+        },
+        "window": {
+            "type": "integer",
+            "description": "Window in years of the rolling mean (default 3)",
+            "required": False,
+            "nullable": True
+        }
+    }
+    output_type = "object"
+
+    def __init__(self, store: WorldBankStore = None):
+        super().__init__()
+        self.store = store or world_bank_store
+
+    def forward(
+        self,
+        search: str = None,
+        indicators: List[str] = None,
+        countries: List[str] = None,
+        start_year: int = None,
+        end_year: int = None,
+        transform: str = None,
+        window: int = None,
+    ) -> Dict[str, Any]:
+        """
+        Searches the indicators, or returns the requested series.
+
+        Returns:
+            Dict containing:
+                - success (bool): Whether the lookup succeeded
+                - data (List[Dict]): Matching indicators, or one entry per (country, indicator)
+                  with its metadata and a {year: value} series (missing years omitted)
+                - error (str): Error message if the lookup failed
+        """
+        transform = transform or "values"
+        try:
+            if search:
+                return {"success": True, "data": self.store.search(search), "error": None}
+            if not indicators:
+                raise ValueError("Provide `search` keywords or a list of `indicators`")
+            if transform not in TRANSFORMS:
+                raise ValueError(f"Unsupported transform: {transform}")
+
+            store = self.store.load()
+            countries = countries or store.countries
+            # Transforms look back in time, so they are computed before cutting at start_year
+            years, block = store.series(countries, indicators, None, end_year)
+            if transform == "growth_rate":
+                block = growth_rate(block)
+            elif transform == "rolling_mean":
+                block = rolling_mean(block, window or 3)
+            keep = slice(0 if start_year is None else max(0, start_year - store.years[0]), None)
+            years, block = years[keep], block[..., keep]
+
+            data = []
+            for i, country in enumerate(countries):
+                for j, indicator in enumerate(indicators):
+                    data.append({
+                        "country": country.upper(),
+                        "country_name": store.country_metadata[country.upper()]["name"],
+                        "indicator": indicator,
+                        "indicator_name": store.indicator_metadata[indicator]["name"],
+                        "transform": transform,
+                        "series": {
+                            year: round(float(value), 6)
+                            for year, value in zip(years, block[i, j]) if not np.isnan(value)
+                        },
+                    })
+            return {"success": True, "data": data, "error": None}
+        except ValueError as e:
+            return {"success": False, "data": None, "error": str(e)}
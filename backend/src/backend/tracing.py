@@ -0,0 +1,339 @@
+"""`backend.tracing` module.
+
+Lightweight tracing of the agents: spans for agent runs, agent steps, LLM calls and
+tool calls, nested through a context variable and exported as JSON lines shaped like
+OTLP spans (trace / span / parent ids, nanosecond timestamps, attributes, status).
+
+Tracing is off unless `TRACE_FILE` is set or `configure()` is called; the
+instrumentation installed by `instrument_agent()` / `instrument_tool()` then costs
+a single check per call.
+
+`python -m backend.tracing TRACE_FILE` prints the p50 / p95 / p99 latency summary of a trace file.
+"""
+
+import atexit
+import contextvars
+import functools
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+SPAN_KINDS = ("agent", "step", "llm", "tool")
+
+
+class Span:
+    """A timed operation, with its attributes and outcome."""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, name: str, kind: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent else None
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = dict(attributes)
+        self.error: Optional[str] = None
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    @property
+    def duration(self) -> float:
+        """Duration in seconds."""
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e9
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize like an OTLP/JSON span."""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": round(self.duration * 1000, 3),
+            "attributes": {key: value for key, value in self.attributes.items() if value is not None},
+            "status": {"code": "ERROR", "message": self.error} if self.error else {"code": "OK"},
+        }
+
+
+class Tracer:
+    """Collects finished spans in memory and appends them to a JSON lines file."""
+
+    def __init__(self, path: Optional[Path] = None, keep: int = 100000):
+        """Initialize the tracer.
+
+        Args:
+            path (Path, optional): JSON lines file the spans are appended to
+            keep (int): Number of finished spans kept in memory for `summary()`
+        """
+        self.path = path
+        self.keep = keep
+        self.spans: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._file = None
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(path, "a", buffering=1)
+
+    def export(self, span: Span) -> None:
+        record = span.to_dict()
+        line = json.dumps(record, default=str)
+        with self._lock:
+            self.spans.append(record)
+            if len(self.spans) > self.keep:
+                del self.spans[: len(self.spans) - self.keep]
+            if self._file is not None:
+                self._file.write(line + "\n")
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            spans = list(self.spans)
+        return summarize(spans)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+_tracer: Optional[Tracer] = None
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+
+def configure(path: Optional[Path] = None) -> Tracer:
+    """Turn tracing on, exporting to `path` (in memory only if None). Replaces the current tracer."""
+    global _tracer
+    if _tracer is not None:
+        _tracer.close()
+    _tracer = Tracer(Path(path) if path else None)
+    return _tracer
+
+
+def disable() -> None:
+    """Turn tracing off."""
+    global _tracer
+    if _tracer is not None:
+        _tracer.close()
+    _tracer = None
+
+
+def get_tracer() -> Optional[Tracer]:
+    return _tracer
+
+
+atexit.register(disable)
+
+if os.environ.get("TRACE_FILE"):
+    configure(Path(os.environ["TRACE_FILE"]))
+
+
+@contextmanager
+def span(name: str, kind: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Time the `with` block as a child of the current span; yields None when tracing is off.
+
+    An exception escaping the block marks the span as failed and is re-raised.
+    """
+    tracer = _tracer
+    if tracer is None:
+        yield None
+        return
+    current = Span(name, kind, _current.get(), attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {str(e)}"
+        raise
+    finally:
+        _current.reset(token)
+        current.end_ns = time.time_ns()
+        tracer.export(current)
+
+
+def _stream_in_span(steps: Iterator[Any], name: str, kind: str, on_end=None, **attributes: Any) -> Iterator[Any]:
+    """Iterate over `steps` (a streamed run) inside one span, whatever thread or context each item is pulled from.
+
+    The span opens on the first item pulled and ends when the stream is exhausted, fails
+    or is closed; `on_end(span, last_item)` may add attributes just before it ends.
+    """
+    tracer = _tracer
+    if tracer is None:
+        yield from steps
+        return
+    current, last = None, None
+    try:
+        while True:
+            if current is None:
+                current = Span(name, kind, _current.get(), attributes)
+            token = _current.set(current)
+            try:
+                item = next(steps)
+            except StopIteration:
+                return
+            except BaseException as e:
+                current.error = f"{type(e).__name__}: {str(e)}"
+                raise
+            finally:
+                _current.reset(token)
+            last = item
+            yield item
+    finally:
+        steps.close()
+        if current is not None:
+            if on_end is not None:
+                on_end(current, last)
+            current.end_ns = time.time_ns()
+            tracer.export(current)
+
+
+def payload_size(value: Any) -> int:
+    """Size in bytes of a value serialized as JSON."""
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return len(str(value))
+
+
+def _result_attributes(result: Any) -> Dict[str, Any]:
+    """Row counts and error of the tools' result dicts."""
+    if not isinstance(result, dict):
+        return {}
+    attributes = {}
+    data = result.get("data")
+    if isinstance(data, list):
+        attributes["rows"] = len(data)
+    elif isinstance(data, dict) and "num_rows" in data:
+        attributes["rows"] = data["num_rows"]
+    for key in ("row_count", "affected_rows", "affected_count"):
+        if isinstance(result.get(key), int):
+            attributes[key] = result[key]
+    if result.get("truncated"):
+        attributes["truncated"] = True
+    if result.get("success") is False:
+        attributes["tool_error"] = str(result.get("error"))
+    return attributes
+
+
+def instrument_tool(tool) -> Any:
+    """Trace every call of the tool's `forward`, with payload sizes and row counts. Idempotent."""
+    if getattr(tool, "_traced", False):
+        return tool
+    forward = tool.forward
+
+    @functools.wraps(forward)
+    def traced_forward(*args, **kwargs):
+        if _tracer is None:
+            return forward(*args, **kwargs)
+        with span(tool.name, "tool", input_bytes=payload_size(kwargs or args)) as current:
+            result = forward(*args, **kwargs)
+            current.set(output_bytes=payload_size(result), **_result_attributes(result))
+            return result
+
+    tool.forward = traced_forward
+    tool._traced = True
+    return tool
+
+
+def instrument_agent(agent) -> Any:
+    """Trace the agent's runs (including managed agent invocations), its steps and its tools. Idempotent."""
+    if getattr(agent, "_traced", False):
+        return agent
+    run, step = agent.run, agent.step
+    name = agent.name or type(agent).__name__
+
+    @functools.wraps(run)
+    def traced_run(task: str, *args, **kwargs):
+        if _tracer is None:
+            return run(task, *args, **kwargs)
+        if kwargs.get("stream"):
+            # Streamed runs (the UI's) get their span too, so that their steps share one trace
+            return _stream_in_span(
+                run(task, *args, **kwargs), name, "agent",
+                on_end=lambda current, last: current.set(steps=agent.step_number, answer_bytes=payload_size(last)),
+                task_bytes=len(task),
+            )
+        with span(name, "agent", task_bytes=len(task)) as current:
+            result = run(task, *args, **kwargs)
+            current.set(steps=agent.step_number, answer_bytes=payload_size(result))
+            return result
+
+    @functools.wraps(step)
+    def traced_step(memory_step):
+        if _tracer is None:
+            return step(memory_step)
+        with span(f"{name}.step", "step", step_number=memory_step.step_number) as current:
+            try:
+                return step(memory_step)
+            finally:
+                current.set(
+                    input_tokens=getattr(agent.model, "last_input_token_count", None),
+                    output_tokens=getattr(agent.model, "last_output_token_count", None),
+                )
+
+    agent.run, agent.step = traced_run, traced_step
+    agent._traced = True
+    for tool_name, tool in agent.tools.items():
+        if tool_name != "final_answer":
+            instrument_tool(tool)
+    return agent
+
+
+def summarize(spans: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Aggregate spans by kind and name: count, errors, total and p50 / p95 / p99 / max durations in ms."""
+    durations: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    for record in spans:
+        key = f"{record['kind']}:{record['name']}"
+        durations.setdefault(key, []).append(record["durationMs"])
+        errors[key] = errors.get(key, 0) + (record["status"]["code"] == "ERROR")
+
+    summary = {}
+    for key in sorted(durations, key=lambda k: (SPAN_KINDS.index(k.split(":")[0]) if k.split(":")[0] in SPAN_KINDS else 99, k)):
+        values = np.asarray(durations[key])
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        summary[key] = {
+            "count": int(len(values)),
+            "errors": errors[key],
+            "total_ms": round(float(values.sum()), 3),
+            "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3),
+            "p99_ms": round(float(p99), 3),
+            "max_ms": round(float(values.max()), 3),
+        }
+    return summary
+
+
+def read_spans(path: Path) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def format_summary(summary: Dict[str, Dict[str, Any]]) -> str:
+    """Render a summary as a fixed-width table."""
+    lines = [f"{'span':48} {'count':>6} {'errors':>6} {'total ms':>10} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}"]
+    for key, stats in summary.items():
+        lines.append(
+            f"{key[:48]:48} {stats['count']:6d} {stats['errors']:6d} {stats['total_ms']:10.1f} "
+            f"{stats['p50_ms']:9.1f} {stats['p95_ms']:9.1f} {stats['p99_ms']:9.1f} {stats['max_ms']:9.1f}"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python -m backend.tracing TRACE_FILE")
+    print(format_summary(summarize(read_spans(Path(sys.argv[1])))))